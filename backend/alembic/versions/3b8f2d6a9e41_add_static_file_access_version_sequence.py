@@ -0,0 +1,24 @@
+"""add static file access version sequence
+
+Revision ID: 3b8f2d6a9e41
+Revises: 9d4a7e3c1b58
+Create Date: 2025-03-21 09:41:17.520318
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "3b8f2d6a9e41"
+down_revision: str | None = "9d4a7e3c1b58"
+branch_labels: str | None = None
+depends_on: str | None = None
+
+
+def upgrade() -> None:
+    op.execute(sa.schema.CreateSequence(sa.Sequence("static_file_access_version")))
+
+
+def downgrade() -> None:
+    op.execute(sa.schema.DropSequence(sa.Sequence("static_file_access_version")))
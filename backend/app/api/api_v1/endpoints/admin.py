@@ -1,5 +1,4 @@
 import logging
-import os
 from typing import Any, cast, Dict, List, Union
 from uuid import UUID
 
@@ -9,8 +8,8 @@ from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
-from app.api.utils import get_static_dir, get_user_name_and_email
-from app.crud.crud_admin import get_site_statistics, get_static_directory_size
+from app.api.utils import get_user_name_and_email
+from app.crud.crud_admin import get_site_statistics
 
 router = APIRouter()
 
@@ -36,15 +35,12 @@ def read_project_data_usage(
     """
     projects = crud.project.get_multi(db, limit=10000)
 
-    static_dir = get_static_dir()
-
     result: Dict[str, Dict[str, Union[int, str]]] = {}
 
     for project in projects:
         user_id = str(project.owner_id)
-        project_storage = get_static_directory_size(
-            os.path.join(static_dir, "projects", str(project.id))
-        )
+        # disk usage is updated as files are added and removed
+        project_storage = project.disk_usage or 0
         if user_id in result:
             if isinstance(result[user_id]["total_projects"], int):
                 result[user_id]["total_projects"] = (
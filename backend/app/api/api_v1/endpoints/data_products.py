@@ -1,15 +1,19 @@
+import asyncio
 import json
 import logging
 import os
 import shutil
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Annotated, Any, Optional, Sequence, Union
 from urllib.parse import urlparse, parse_qs
 from uuid import UUID, uuid4
 
 import httpx
+from celery.result import AsyncResult
 from geojson_pydantic import Feature, FeatureCollection, Polygon, MultiPolygon
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel, UUID4
 from sqlalchemy import func, select
@@ -21,19 +25,34 @@ from app.core import security
 from app.core.config import settings
 from app.models.vector_layer import VectorLayer
 from app.schemas.data_product_metadata import ZonalStatisticsProps
-from app.schemas.job import Status
+from app.schemas.job import State, Status
 from app.tasks.toolbox_tasks import (
     calculate_zonal_statistics,
     calculate_bulk_zonal_statistics,
+    get_zones_window_pixels,
     run_toolbox,
 )
 from app.schemas.shortened_url import ShortenedUrlApiResponse, UrlPayload
 from app.utils.job_manager import JobManager
+from app.utils.toolbox import band_math, point_cloud_grid
 from app.utils.tusd.post_processing import process_data_product_uploaded_to_tusd
 
 
 router = APIRouter()
 
+# max pixels (per band) covered by a zone before its zonal statistics are sent to
+# the celery task queue instead of being calculated by the API worker
+MAX_INLINE_ZONAL_PIXELS = 4096 * 4096
+
+# seconds between checks for a zonal statistics task result
+ZONAL_TASK_POLL_INTERVAL = 0.1
+
+
+class ZonalStatisticsJob(BaseModel):
+    task_id: str
+    status: str
+    stats: Optional[ZonalStatisticsProps] = None
+
 
 logger = logging.getLogger("__name__")
 
@@ -45,6 +64,23 @@ def get_static_dir() -> str:
         return settings.STATIC_DIR
 
 
+async def wait_for_task_result(
+    result: AsyncResult, poll_interval: float = ZONAL_TASK_POLL_INTERVAL
+) -> Any:
+    """Waits for a celery task result without blocking the event loop.
+
+    Args:
+        result (AsyncResult): Pending celery task result.
+        poll_interval (float, optional): Seconds between checks for the result.
+
+    Returns:
+        Any: Task return value.
+    """
+    while not await run_in_threadpool(result.ready):
+        await asyncio.sleep(poll_interval)
+    return result.get()
+
+
 def update_feature_properties(
     zonal_feature: Feature[Polygon, ZonalStatisticsProps],
 ) -> Feature[Polygon, ZonalStatisticsProps]:
@@ -407,8 +443,17 @@ def process_data_product_from_external_storage(
     crud.user.remove_single_use_token(db, db_obj=token_db_obj)
 
 
+# data product data types for rasters gridded from point clouds
+POINT_CLOUD_DATA_TYPES = {"chm": "CHM", "dsm": "dsm", "dtm": "DTM"}
+
+
 class ProcessingRequest(BaseModel):
-    chm: bool
+    bandMath: bool = False
+    bandMathExpression: str = ""
+    chm: bool = False
+    dsm: bool = False
+    dtm: bool = False
+    pointCloudResolution: Optional[float] = None
     exg: bool
     exgRed: int
     exgGreen: int
@@ -436,13 +481,34 @@ async def run_processing_tool(
         )
     # verify at least one processing tool was selected
     if (
-        toolbox_in.exg is False
+        toolbox_in.bandMath is False
+        and toolbox_in.chm is False
+        and toolbox_in.dsm is False
+        and toolbox_in.dtm is False
+        and toolbox_in.exg is False
         and toolbox_in.ndvi is False
         and toolbox_in.zonal is False
     ):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="No product selected"
         )
+    # verify band math expression can be compiled before queueing tool
+    if toolbox_in.bandMath:
+        try:
+            band_math.validate_params({"expression": toolbox_in.bandMathExpression})
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # verify point cloud grid resolution before queueing tool
+    point_cloud_products = [
+        product for product in POINT_CLOUD_DATA_TYPES if getattr(toolbox_in, product)
+    ]
+    for product in point_cloud_products:
+        try:
+            point_cloud_grid.validate_params(
+                {"product": product, "resolution": toolbox_in.pointCloudResolution}
+            )
+        except (TypeError, ValueError) as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     # get upload_dir
     if os.environ.get("RUNNING_TESTS") == "1":
         upload_dir = Path(settings.TEST_STATIC_DIR)
@@ -460,6 +526,12 @@ async def run_processing_tool(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Data product not found"
         )
+    # verify input is a point cloud if a point cloud product was selected
+    if point_cloud_products and data_product.data_type != "point_cloud":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="DSM, DTM, and CHM require a point cloud data product",
+        )
     # ndvi
     if toolbox_in.ndvi and not os.environ.get("RUNNING_TESTS") == "1":
         # create new data product record
@@ -528,6 +600,70 @@ async def run_processing_tool(
                 current_user.id,
             )
         )
+    # band math
+    if toolbox_in.bandMath and not os.environ.get("RUNNING_TESTS") == "1":
+        # create new data product record
+        band_math_data_product: models.DataProduct = (
+            crud.data_product.create_with_flight(
+                db,
+                schemas.DataProductCreate(
+                    data_type="BandMath",
+                    filepath="null",
+                    original_filename=data_product.original_filename,
+                ),
+                flight_id=flight.id,
+            )
+        )
+        # get path for band math tool output raster
+        data_product_dir = utils.get_data_product_dir(
+            str(project.id), str(flight.id), str(band_math_data_product.id)
+        )
+        band_math_filename: str = str(uuid4()) + ".tif"
+        out_raster = data_product_dir / band_math_filename
+        # run band math tool in background
+        tool_params = {"expression": toolbox_in.bandMathExpression}
+        run_toolbox.apply_async(
+            args=(
+                "band_math",
+                data_product.filepath,
+                str(out_raster),
+                tool_params,
+                band_math_data_product.id,
+                current_user.id,
+            )
+        )
+    # point cloud products (dsm, dtm, chm)
+    for product in point_cloud_products:
+        if os.environ.get("RUNNING_TESTS") == "1":
+            continue
+        # create new data product record
+        grid_data_product: models.DataProduct = crud.data_product.create_with_flight(
+            db,
+            schemas.DataProductCreate(
+                data_type=POINT_CLOUD_DATA_TYPES[product],
+                filepath="null",
+                original_filename=data_product.original_filename,
+            ),
+            flight_id=flight.id,
+        )
+        # get path for point cloud grid tool output raster
+        data_product_dir = utils.get_data_product_dir(
+            str(project.id), str(flight.id), str(grid_data_product.id)
+        )
+        grid_filename: str = str(uuid4()) + ".tif"
+        out_raster = data_product_dir / grid_filename
+        # run point cloud grid tool in background
+        tool_params = {"resolution": toolbox_in.pointCloudResolution}
+        run_toolbox.apply_async(
+            args=(
+                product,
+                data_product.filepath,
+                str(out_raster),
+                tool_params,
+                grid_data_product.id,
+                current_user.id,
+            )
+        )
     # zonal
     if toolbox_in.zonal and not os.environ.get("RUNNING_TESTS") == "1":
         features = crud.vector_layer.get_vector_layer_by_id(
@@ -619,13 +755,22 @@ async def create_zonal_statistics(
                     # missing one or more stats, remove record and recalculate
                     crud.data_product_metadata.remove(db, id=metadata[0].id)
 
-    # send request to celery task queue
-    result = calculate_zonal_statistics.apply_async(
-        args=(data_product.filepath, {"features": [zone_in.model_dump()]})
+    # small zones are calculated in a worker thread, larger zones are sent to the
+    # celery task queue and awaited without blocking the event loop
+    feature_collection = {"features": [zone_in.model_dump()]}
+    window_pixels = await run_in_threadpool(
+        get_zones_window_pixels, data_product.filepath, feature_collection
     )
-
-    # task returns list of zonal stats
-    zonal_stats = result.get()
+    if window_pixels <= MAX_INLINE_ZONAL_PIXELS:
+        zonal_stats = await run_in_threadpool(
+            calculate_zonal_statistics, data_product.filepath, feature_collection
+        )
+    else:
+        result = calculate_zonal_statistics.apply_async(
+            args=(data_product.filepath, feature_collection)
+        )
+        # task returns list of zonal stats
+        zonal_stats = await wait_for_task_result(result)
 
     if len(zonal_stats) != 1:
         # result either has no features or too many features
@@ -659,6 +804,125 @@ async def create_zonal_statistics(
     return update_feature_properties(Feature(**vector_layer_geojson_dict))
 
 
+@router.post(
+    "/{data_product_id}/zonal_statistics/jobs",
+    response_model=ZonalStatisticsJob,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+def create_zonal_statistics_job(
+    data_product_id: UUID,
+    zone_in: Feature,
+    current_user: models.User = Depends(deps.get_current_approved_user),
+    flight: models.Flight = Depends(deps.can_read_flight),
+    db: Session = Depends(deps.get_db),
+) -> Any:
+    """Sends zonal statistics for a (large) zone to the celery task queue and
+    returns the task ID right away. Poll the job endpoint for the result. Stats for
+    vector layer features are also saved as data product metadata."""
+    data_product = crud.data_product.get_single_by_id(
+        db,
+        data_product_id=data_product_id,
+        upload_dir=get_static_dir(),
+        user_id=current_user.id,
+    )
+    if not data_product or data_product.flight_id != flight.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Data product not found"
+        )
+
+    if not zone_in.properties:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Zone feature missing properties",
+        )
+
+    # record task against data product and user so only they can read its result
+    task_id = str(uuid4())
+    job_in = schemas.job.JobCreate(
+        extra={"task_id": task_id, "user_id": str(current_user.id)},
+        name="zonal",
+        state=State.PENDING,
+        status=Status.WAITING,
+        start_time=datetime.now(tz=timezone.utc),
+        data_product_id=data_product.id,
+    )
+    job = crud.job.create_job(db, job_in)
+
+    vector_layer_feature_id = zone_in.properties.get("feature_id", None)
+    feature_collection = {"features": [zone_in.model_dump()]}
+    if vector_layer_feature_id and utils.is_valid_uuid(vector_layer_feature_id):
+        result = calculate_bulk_zonal_statistics.apply_async(
+            args=(
+                data_product.filepath,
+                data_product.id,
+                jsonable_encoder(feature_collection),
+            ),
+            kwargs={"job_id": job.id},
+            task_id=task_id,
+        )
+    else:
+        result = calculate_zonal_statistics.apply_async(
+            args=(data_product.filepath, feature_collection),
+            kwargs={"job_id": job.id},
+            task_id=task_id,
+        )
+
+    return ZonalStatisticsJob(task_id=result.id, status=result.state)
+
+
+@router.get(
+    "/{data_product_id}/zonal_statistics/jobs/{task_id}",
+    response_model=ZonalStatisticsJob,
+)
+def read_zonal_statistics_job(
+    data_product_id: UUID,
+    task_id: UUID,
+    current_user: models.User = Depends(deps.get_current_approved_user),
+    flight: models.Flight = Depends(deps.can_read_flight),
+    db: Session = Depends(deps.get_db),
+) -> Any:
+    """Returns the state of a zonal statistics job and, once it has finished, the
+    zonal statistics for its zone. Only the user that queued the job can read it."""
+    data_product = crud.data_product.get_single_by_id(
+        db,
+        data_product_id=data_product_id,
+        upload_dir=get_static_dir(),
+        user_id=current_user.id,
+    )
+    if not data_product or data_product.flight_id != flight.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Data product not found"
+        )
+
+    job = crud.job.get_by_task_id(
+        db, task_id=task_id, data_product_id=data_product.id, user_id=current_user.id
+    )
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Zonal statistics job not found",
+        )
+
+    result = calculate_zonal_statistics.AsyncResult(str(task_id))
+    if not result.ready():
+        return ZonalStatisticsJob(task_id=result.id, status=result.state)
+
+    if (
+        not result.successful()
+        or not isinstance(result.result, list)
+        or len(result.result) != 1
+    ):
+        # task failed or result either has no features or too many features
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Unable to calculate zonal statistics",
+        )
+
+    return ZonalStatisticsJob(
+        task_id=result.id, status=result.state, stats=result.result[0]
+    )
+
+
 @router.get(
     "/{data_product_id}/zonal_statistics",
     response_model=Optional[
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.utils.cache import invalidate_static_file_access
 
 
 router = APIRouter()
@@ -33,4 +34,5 @@ def update_file_permission(
     updated_file_permission = crud.file_permission.update(
         db, db_obj=current_file_permission, obj_in=file_permission_in
     )
+    invalidate_static_file_access(db, data_product_id=data_product_id)
     return updated_file_permission
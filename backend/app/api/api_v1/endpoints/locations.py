@@ -18,6 +18,7 @@ from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps
 from app.api.utils import create_project_field_preview
+from app.tasks.post_upload_tasks import render_project_previews
 
 
 router = APIRouter()
@@ -74,7 +75,13 @@ def update_location(
             status_code=status.HTTP_404_NOT_FOUND, detail="Location not found"
         )
     # Update project map preview
-    create_project_field_preview(features=[location], project_id=project_id)
+    if os.environ.get("RUNNING_TESTS") == "1":
+        create_project_field_preview(features=[location], project_id=project_id)
+    else:
+        try:
+            render_project_previews.apply_async(args=([str(project_id)],))
+        except Exception:
+            logger.exception("Unable to queue preview map")
 
     return location
 
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
+from app.utils.cache import invalidate_static_file_access
 
 
 router = APIRouter()
@@ -125,4 +126,5 @@ def remove_project_member(
             detail="Project creator cannot be removed",
         )
     removed_project_member = crud.project_member.remove(db, id=project_member_id)
+    invalidate_static_file_access(db, project_id=project.id)
     return removed_project_member
@@ -4,13 +4,13 @@ from datetime import date
 from typing import Any, List, Optional, Union
 from uuid import UUID
 
-from geojson_pydantic import Feature, FeatureCollection
+from geojson_pydantic import FeatureCollection
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
-from app.api.utils import create_project_field_preview
+from app.tasks.post_upload_tasks import render_project_previews
 
 
 logger = logging.getLogger("__name__")
@@ -50,18 +50,12 @@ def create_project(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Unable to create project",
         )
-    # Create preview image for project field boundary - skip if running tests
+    # Queue preview image for project field boundary - skip if running tests
     if os.environ.get("RUNNING_TESTS") != "1":
-        project_in_db = crud.project.get_user_project(
-            db, user_id=current_user.id, project_id=project["result"].id
-        )
-        if project_in_db["result"]:
-            coordinates = project_in_db["result"].field["geometry"]["coordinates"]
-            features = [Feature(**project_in_db["result"].field)]
-            try:
-                create_project_field_preview(project["result"].id, features)
-            except Exception:
-                logger.exception("Unable to create preview map")
+        try:
+            render_project_previews.apply_async(args=([str(project["result"].id)],))
+        except Exception:
+            logger.exception("Unable to queue preview map")
     return project["result"]
 
 
@@ -1,12 +1,12 @@
 import os
 import urllib.parse
-from io import BytesIO
 from typing import Annotated, Any, List, Optional
 
 import httpx
 import rasterio
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import RedirectResponse
 from pydantic import UUID4
 from rasterio.warp import transform_bounds
 from sqlalchemy.orm import Session
@@ -14,6 +14,8 @@ from sqlalchemy.orm import Session
 from app import crud, models, schemas
 from app.api import deps
 from app.core.config import settings
+from app.utils.tile_cache import TileKey, etag_matches, tile_cache
+from app.utils.tile_proxy import fetch_tile, get_http_client, stream_tile
 
 
 router = APIRouter()
@@ -63,13 +65,15 @@ def read_shared_data_product_with_user_access(
 
 @router.get("/vectortiles")
 async def get_vector_tiles_for_vector_layer(
+    request: Request,
     x: int,
     y: int,
     z: int,
     layer_id: str,
     current_user: models.User = Depends(deps.get_current_approved_user),
     db: Session = Depends(deps.get_db),
-) -> StreamingResponse:
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+) -> Response:
     if os.environ.get("RUNNING_TESTS") == "1":
         upload_dir = settings.TEST_STATIC_DIR
     else:
@@ -86,24 +90,20 @@ async def get_vector_tiles_for_vector_layer(
 
     filter_param = urllib.parse.quote(f"layer_id = '{layer_id}'")
     # request vector tile from pg_tileserv
-    async with httpx.AsyncClient() as client:
-        tile_url = (
-            f"http://varnish/public.vector_layers/{z}/{x}/{y}.pbf?filter={filter_param}"
-        )
-        # timeout request after 30 seconds
-        response = await client.get(tile_url, timeout=30.0)
-    if response.status_code == 200:
-        return StreamingResponse(
-            BytesIO(response.content), media_type="application/vnd.mapbox-vector-tile"
-        )
-    else:
-        raise HTTPException(
-            status_code=response.status_code, detail=f"Error: {response.text}"
-        )
+    tile_url = (
+        f"http://varnish/public.vector_layers/{z}/{x}/{y}.pbf?filter={filter_param}"
+    )
+    return await stream_tile(
+        http_client,
+        tile_url,
+        media_type="application/vnd.mapbox-vector-tile",
+        request=request,
+    )
 
 
 @router.get("/maptiles")
 async def get_map_tiles_for_data_product(
+    request: Request,
     x: float,
     y: float,
     z: int,
@@ -114,7 +114,8 @@ async def get_map_tiles_for_data_product(
     colormap_name: Annotated[Optional[str], Query()] = None,
     current_user: models.User = Depends(deps.get_optional_current_user),
     db: Session = Depends(deps.get_db),
-) -> StreamingResponse:
+    http_client: httpx.AsyncClient = Depends(get_http_client),
+) -> Response:
     if os.environ.get("RUNNING_TESTS") == "1":
         upload_dir = settings.TEST_STATIC_DIR
     else:
@@ -145,20 +146,31 @@ async def get_map_tiles_for_data_product(
     if colormap_name:
         query_params += f"&colormap_name={colormap_name}"
 
-    # request map tile from titiler
-    async with httpx.AsyncClient() as client:
+    # return cached tile if available, otherwise request map tile from titiler
+    tile_key = TileKey(
+        data_product_id=data_product.id,
+        z=z,
+        x=x,
+        y=y,
+        scale=scale,
+        bidx=tuple(bidx or []),
+        rescale=tuple(rescale or []),
+        colormap_name=colormap_name,
+    )
+    tile = await run_in_threadpool(tile_cache.get, tile_key)
+    if tile is None:
         tile_url = (
             f"http://varnish/cog/tiles/WebMercatorQuad/{z}/{x}/{y}@{scale}x"
             f"?url={data_product.filepath}{query_params}"
         )
-        # timeout request after 30 seconds
-        response = await client.get(tile_url, timeout=30.0)
-    if response.status_code == 200:
-        return StreamingResponse(BytesIO(response.content), media_type="image/png")
-    else:
-        raise HTTPException(
-            status_code=response.status_code, detail=f"Error: {response.text}"
-        )
+        content = await fetch_tile(http_client, tile_url)
+        tile = await run_in_threadpool(tile_cache.set, tile_key, content)
+
+    # browser revalidates cached tiles, tiles are unchanged unless invalidated
+    headers = {"Cache-Control": "private, no-cache", "ETag": tile.etag}
+    if etag_matches(request.headers.get("if-none-match"), tile.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=tile.content, media_type="image/png", headers=headers)
 
 
 @router.get("/bounds", response_model=schemas.data_product.DataProductBoundingBox)
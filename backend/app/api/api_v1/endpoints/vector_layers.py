@@ -1,4 +1,3 @@
-import json
 import logging
 import os
 import shutil
@@ -6,9 +5,9 @@ import tempfile
 import zipfile
 from pathlib import Path
 from typing import Any, Sequence, Union
+from urllib.parse import quote
 from uuid import UUID
 
-import geopandas as gpd
 from fastapi import (
     APIRouter,
     BackgroundTasks,
@@ -18,21 +17,30 @@ from fastapi import (
     status,
     UploadFile,
 )
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from app import crud, models, schemas
 from app.api import deps
 from app.api.utils import sanitize_file_name, get_tile_url_with_signed_payload
 from app.core.config import settings
+from app.tasks.post_upload_tasks import queue_missing_vector_layer_previews
 from app.tasks.upload_tasks import upload_vector_layer
 from app.utils.job_manager import JobManager
+from app.utils.vector_export import EXPORT_FORMATS, write_vector_layer
 
 router = APIRouter()
 
 
 logger = logging.getLogger("__name__")
 
+# Media types for vector layers exported to files
+EXPORT_MEDIA_TYPES = {
+    "fgb": "application/vnd.flatgeobuf",
+    "gpkg": "application/geopackage+sqlite3",
+    "shp": "application/zip",
+}
+
 
 def cleanup_temp(temp_path: str) -> None:
     """Delete temp file or temp dir once no longer in use.
@@ -216,6 +224,23 @@ def read_vector_layers(
         vector_layers = crud.vector_layer.get_multi_by_project(
             db, project_id=project.id
         )
+        preview_statuses = crud.vector_layer.get_preview_statuses(
+            db, project_id=project.id
+        )
+        # Layers uploaded before previews were queued do not have a preview status
+        missing_layer_ids = [
+            layer[0] for layer in vector_layers if layer[0] not in preview_statuses
+        ]
+        if len(missing_layer_ids) > 0:
+            try:
+                queue_missing_vector_layer_previews(
+                    db, project_id=project.id, layer_ids=missing_layer_ids
+                )
+            except Exception:
+                logger.exception("Unable to queue vector layer previews")
+            preview_statuses = crud.vector_layer.get_preview_statuses(
+                db, project_id=project.id
+            )
 
         payload = [
             {
@@ -224,6 +249,11 @@ def read_vector_layers(
                 "geom_type": layer[2],
                 "signed_url": get_tile_url_with_signed_payload(layer[0]),
                 "preview_url": get_preview_url(str(project.id), layer[0]),
+                "preview_status": (
+                    preview_statuses[layer[0]].value
+                    if layer[0] in preview_statuses
+                    else None
+                ),
             }
             for layer in vector_layers
         ]
@@ -235,96 +265,77 @@ def read_vector_layers(
 def download_vector_layer(
     layer_id: str,
     background_tasks: BackgroundTasks,
-    format: str = Query("json", pattern="^(json|shp)$"),
+    format: str = Query("json", pattern="^(json|fgb|gpkg|shp)$"),
     project: models.Project = Depends(deps.can_read_project),
     db: Session = Depends(deps.get_db),
 ) -> Any:
-    # Fetch GeoJSON features for vector layer
-    features = crud.vector_layer.get_vector_layer_by_id(
-        db, project_id=project.id, layer_id=layer_id
-    )
-    feature_collection = {
-        "type": "FeatureCollection",
-        "features": [feature.model_dump() for feature in features],
-    }
-
-    # Get original filename from first feature's properties
+    # Get original filename for vector layer
     layer_name = (
-        features[0].properties.get("layer_name", "feature_collection")
-        if features and features[0].properties
-        else "feature_collection"
+        crud.vector_layer.get_layer_name(db, project_id=project.id, layer_id=layer_id)
+        or "feature_collection"
     )
 
-    if format == "shp":
-        # Convert GeoJSON dict to GeoDataFrame
-        gdf = gpd.GeoDataFrame.from_features(features)
-
-        # Create temporary directory for shapefile zip
-        temp_dir = tempfile.mkdtemp()
-        shp_file_path = os.path.join(temp_dir, Path(layer_name).stem + ".shp")
-
-        try:
-            # Export GeoDataFrame to shapefile
-            gdf.to_file(shp_file_path, driver="ESRI Shapefile")
-
-            # Zip exported shapefile
-            zip_file_path = tempfile.NamedTemporaryFile(
-                delete=False, suffix=".zip"
-            ).name
-            try:
-                with zipfile.ZipFile(zip_file_path, "w") as zipf:
-                    for file_name in os.listdir(temp_dir):
-                        file_path = os.path.join(temp_dir, file_name)
-                        zipf.write(file_path, arcname=file_name)
-            except Exception:
-                logger.exception("Failed to zip shapefile")
-                cleanup_temp(zip_file_path)
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Unable to create shapefile",
-                )
-        except Exception:
-            logger.exception("Failed to convert vector layer to shapefile")
-            cleanup_temp(temp_dir)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Unable to create shapefile",
-            )
+    if format == "json":
+        # Stream GeoJSON features from the database without loading the layer
+        return StreamingResponse(
+            crud.vector_layer.stream_vector_layer_geojson(
+                db, project_id=project.id, layer_id=layer_id
+            ),
+            media_type="application/geo+json",
+            headers={
+                "Content-Disposition": "attachment; filename*=utf-8''"
+                + quote(Path(layer_name).stem + ".geojson")
+            },
+        )
 
-        # Clean up temporary zip file and temporary directory after request finishes
-        background_tasks.add_task(cleanup_temp, zip_file_path)
-        background_tasks.add_task(cleanup_temp, temp_dir)
+    # Create temporary directory for exported vector layer
+    temp_dir = tempfile.mkdtemp()
+    _, extension = EXPORT_FORMATS[format]
+    out_path = os.path.join(temp_dir, Path(layer_name).stem + extension)
 
-        return FileResponse(
-            zip_file_path,
-            media_type="application/zip",
-            filename=Path(layer_name).stem + ".zip",
+    try:
+        # Write features to file in batches
+        write_vector_layer(
+            db,
+            project_id=project.id,
+            layer_id=layer_id,
+            out_path=out_path,
+            format=format,
         )
-    else:
-        # Create FeatureCollection with GeoJSON features
-        temp_file = tempfile.NamedTemporaryFile(
-            mode="w", delete=False, suffix=".geojson"
+    except Exception:
+        logger.exception(f"Failed to convert vector layer to {format}")
+        cleanup_temp(temp_dir)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Unable to create {EXPORT_FORMATS[format][0]}",
         )
-        temp_file_path = temp_file.name
 
+    if format == "shp":
+        # Zip exported shapefile
+        zip_file_path = os.path.join(temp_dir, Path(layer_name).stem + ".zip")
         try:
-            json.dump(feature_collection, temp_file)
+            with zipfile.ZipFile(zip_file_path, "w") as zipf:
+                for file_name in os.listdir(temp_dir):
+                    file_path = os.path.join(temp_dir, file_name)
+                    if file_path != zip_file_path:
+                        zipf.write(file_path, arcname=file_name)
         except Exception:
-            logger.exception("Failed to serialize feature collection")
-            cleanup_temp(temp_file_path)
+            logger.exception("Failed to zip shapefile")
+            cleanup_temp(temp_dir)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Unable to create GeoJSON",
+                detail="Unable to create shapefile",
             )
+        out_path = zip_file_path
 
-        # Clean up temporary file after request finishes
-        background_tasks.add_task(cleanup_temp, temp_file_path)
+    # Clean up temporary directory after request finishes
+    background_tasks.add_task(cleanup_temp, temp_dir)
 
-        return FileResponse(
-            temp_file_path,
-            media_type="application/geo+json",
-            filename=Path(layer_name).stem + ".geojson",
-        )
+    return FileResponse(
+        out_path,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        filename=Path(out_path).name,
+    )
 
 
 @router.delete("/{layer_id}", status_code=status.HTTP_200_OK)
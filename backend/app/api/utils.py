@@ -7,6 +7,8 @@ from typing import List, Tuple
 from urllib.parse import urlencode, quote_plus
 
 from geojson_pydantic import Feature
+import pandas as pd
+from PIL import Image
 from pydantic import UUID4
 from sqlalchemy.orm import Session
 
@@ -16,6 +18,10 @@ from app.core.security import sign_map_tile_payload
 from app.utils.MapMaker import MapMaker
 
 
+# Background color of placeholder preview images
+PREVIEW_PLACEHOLDER_COLOR = "#e5e7eb"
+
+
 def create_project_field_preview(project_id: uuid.UUID, features: List[Feature]) -> str:
     """Create preview image of project field boundary.
 
@@ -42,18 +48,15 @@ def create_project_field_preview(project_id: uuid.UUID, features: List[Feature])
     return project_map.preview_img
 
 
-def create_vector_layer_preview(
-    project_id: uuid.UUID, layer_id: str, features: List[Feature]
-) -> str:
-    """Create preview image of vector layer.
+def get_vector_layer_preview_dir(project_id: uuid.UUID, layer_id: str) -> str:
+    """Returns directory for vector layer preview image, creating it if needed.
 
     Args:
         project_id (uuid.UUID4): Project ID.
         layer_id (str): Unique layer ID for FeatureCollection.
-        features (list[Feature]): GeoJSON features that represent vector layer shapes.
 
     Returns:
-        str: Path to generated preview image.
+        str: Path to preview image directory.
     """
     # Set output path for preview image
     if os.environ.get("RUNNING_TESTS") == "1":
@@ -62,17 +65,60 @@ def create_vector_layer_preview(
         )
     else:
         preview_path = f"{settings.STATIC_DIR}/projects/{project_id}/vector/{layer_id}"
-    # Create vector directory if needed, remove any existing preview for this layer
+    # Create vector directory if needed
     if not os.path.exists(preview_path):
         os.makedirs(preview_path)
+    return preview_path
+
+
+def create_vector_layer_preview(
+    project_id: uuid.UUID,
+    layer_id: str,
+    features: List[Feature],
+    overwrite: bool = False,
+) -> str:
+    """Create preview image of vector layer.
+
+    Args:
+        project_id (uuid.UUID4): Project ID.
+        layer_id (str): Unique layer ID for FeatureCollection.
+        features (list[Feature]): GeoJSON features that represent vector layer shapes.
+        overwrite (bool, optional): Replace existing preview. Defaults to False.
+
+    Returns:
+        str: Path to generated preview image.
+    """
+    preview_path = get_vector_layer_preview_dir(project_id, layer_id)
     # Full path to preview image
     preview_img = os.path.join(preview_path, "preview.png")
     # Skip creating preview image if one already exists
-    if not os.path.exists(os.path.join(preview_path, "preview.png")):
-        # Generate preview with provided coordinates
+    if overwrite or not os.path.exists(preview_img):
+        # Generate preview with provided coordinates, then replace any existing
+        # preview (e.g., placeholder) so a partial image is never served
         vector_layer_preview = MapMaker(features=features, outpath=preview_path)
-        vector_layer_preview.save(outname="preview.png")
+        vector_layer_preview.save(outname="preview.tmp.png")
+        os.replace(vector_layer_preview.preview_img, preview_img)
+
+    return preview_img
+
+
+def create_vector_layer_preview_placeholder(
+    project_id: uuid.UUID, layer_id: str
+) -> str:
+    """Create placeholder served in place of a vector layer preview image until
+    the preview has been rendered.
+
+    Args:
+        project_id (uuid.UUID4): Project ID.
+        layer_id (str): Unique layer ID for FeatureCollection.
 
+    Returns:
+        str: Path to placeholder preview image.
+    """
+    preview_path = get_vector_layer_preview_dir(project_id, layer_id)
+    preview_img = os.path.join(preview_path, "preview.png")
+    if not os.path.exists(preview_img):
+        Image.new("RGB", (128, 128), PREVIEW_PLACEHOLDER_COLOR).save(preview_img)
     return preview_img
 
 
@@ -268,6 +314,21 @@ def is_geometry_match(expected_geometry: str, actual_geometry: str) -> bool:
     return False
 
 
+def is_geometry_type_consistent(geometry_types: pd.Series) -> bool:
+    """Return True if every geometry type matches the other geometry types when
+    multi and non-multi types are considered matches. Vectorized version of
+    is_geometry_match for all features in a layer.
+
+    Args:
+        geometry_types (pd.Series): Geometry type of each feature.
+
+    Returns:
+        bool: True if geometry types are consistent.
+    """
+    base_types = geometry_types.str.lower().str.removeprefix("multi")
+    return base_types.nunique(dropna=False) <= 1
+
+
 def get_tile_url_with_signed_payload(layer_id: str) -> str:
     """Returns pg_tileserv URL with signed payload.
 
@@ -28,6 +28,22 @@ class Settings(BaseSettings):
     TEST_STATIC_DIR: str = "/tmp/static"
     STATIC_DIR: str = "/static"
     POTREE_DIR: str = "/app/potree"
+    # Seconds a static file access decision is reused for a client (0 disables),
+    # invalidation reaches every worker through a shared version in the database
+    STATIC_FILE_ACCESS_CACHE_TTL: int = 30
+    STATIC_FILE_ACCESS_CACHE_SIZE: int = 10000
+    # Seconds between checks of the shared version that invalidates cached static
+    # file access decisions in every worker
+    STATIC_FILE_ACCESS_VERSION_CHECK_INTERVAL: float = 1
+    # Seconds API key usage is aggregated in memory before it is saved
+    API_KEY_USAGE_FLUSH_INTERVAL: int = 60
+    # Map tiles and bytes of tile content kept in memory by each worker, seconds
+    # before cached tiles expire, and optional directory for sharing cached tiles
+    # between workers
+    TILE_CACHE_SIZE: int = 2048
+    TILE_CACHE_BYTES: int = 64 * 1024 * 1024
+    TILE_CACHE_TTL: int = 60 * 60 * 24
+    TILE_CACHE_DIR: str | None = None
 
     API_LOGDIR: str = "/app/logs"
 
@@ -45,6 +61,10 @@ class Settings(BaseSettings):
 
     # Provide mapbox token for worldwide satellite imagery (optional)
     MAPBOX_ACCESS_TOKEN: str | None = None
+    # Directory of cached basemap tiles for map previews (can be pre-seeded) and
+    # whether previews are rendered only from cached tiles
+    BASEMAP_TILE_CACHE_DIR: str | None = None
+    BASEMAP_OFFLINE: bool = False
 
     # Database
     POSTGRES_HOST: str = ""
@@ -16,6 +16,8 @@ logger = logging.getLogger("__name__")
 
 def get_static_directory_size(static_directory: str) -> int:
     """Walk down static directory and calculate total disk usage by static files.
+    Uses os.scandir so file sizes come from the directory entries already read
+    instead of a separate stat call per path.
 
     Args:
         static_directory (str): Path to static directory.
@@ -24,12 +26,19 @@ def get_static_directory_size(static_directory: str) -> int:
         int: Total disk usage in bytes.
     """
     total_size = 0
-    for dirpath, dirnames, filenames in os.walk(static_directory):
-        for f in filenames:
-            fp = os.path.join(dirpath, f)
-            # skip if symbolic link
-            if not os.path.islink(fp):
-                total_size += os.path.getsize(fp)
+    directories = [static_directory]
+    while directories:
+        try:
+            with os.scandir(directories.pop()) as entries:
+                for entry in entries:
+                    # skip if symbolic link
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+        except (FileNotFoundError, NotADirectoryError):
+            # directory removed while walking
+            continue
     return total_size
 
 
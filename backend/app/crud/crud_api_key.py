@@ -1,7 +1,9 @@
+from datetime import datetime
 from secrets import token_urlsafe
+from typing import Dict
 from uuid import UUID
 
-from sqlalchemy import and_, select, update
+from sqlalchemy import and_, bindparam, func, select, update
 from sqlalchemy.orm import joinedload, Session
 
 from app import crud
@@ -9,6 +11,7 @@ from app.crud.base import CRUDBase
 from app.models.api_key import APIKey
 from app.models.utils.utcnow import utcnow
 from app.schemas.api_key import APIKeyCreate, APIKeyUpdate
+from app.utils.cache import invalidate_static_file_access
 
 
 class CRUDAPIKey(CRUDBase[APIKey, APIKeyCreate, APIKeyUpdate]):
@@ -49,6 +52,33 @@ class CRUDAPIKey(CRUDBase[APIKey, APIKeyCreate, APIKeyUpdate]):
             api_key = session.scalar(statement)
             return api_key
 
+    def increment_usage(
+        self, db: Session, counts: Dict[UUID, int], last_used: Dict[UUID, datetime]
+    ) -> None:
+        # add request counts in the database so concurrent updates are not lost
+        statement = (
+            update(APIKey.__table__)
+            .where(APIKey.id == bindparam("key_id"))
+            .values(
+                total_requests=APIKey.total_requests + bindparam("key_count"),
+                last_used_at=func.greatest(
+                    func.coalesce(APIKey.last_used_at, bindparam("key_last_used_at")),
+                    bindparam("key_last_used_at"),
+                ),
+            )
+        )
+        usage = [
+            {
+                "key_id": api_key_id,
+                "key_count": count,
+                "key_last_used_at": last_used[api_key_id],
+            }
+            for api_key_id, count in counts.items()
+        ]
+        with db as session:
+            session.execute(statement, usage)
+            session.commit()
+
     def deactivate(self, db: Session, user_id: UUID) -> APIKey | None:
         # query to update existing api key is_active property
         active_api_key = self.get_by_user(db, user_id=user_id)
@@ -61,6 +91,7 @@ class CRUDAPIKey(CRUDBase[APIKey, APIKeyCreate, APIKeyUpdate]):
             with db as session:
                 session.execute(statement)
                 session.commit()
+            invalidate_static_file_access(db, api_key=active_api_key.api_key)
 
             return crud.api_key.get(db, id=active_api_key.id)
         else:
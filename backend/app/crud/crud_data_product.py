@@ -5,16 +5,20 @@ from uuid import UUID
 
 import rasterio
 from fastapi.encoders import jsonable_encoder
+from geoalchemy2.shape import from_shape
 from rasterio.errors import CRSError
-from rasterio.warp import transform_bounds
+from rasterio.warp import transform_bounds, transform_geom
+from shapely.geometry import box, mapping, shape
 from sqlalchemy import and_, func, select, update
-from sqlalchemy.orm import joinedload, Session
+from sqlalchemy.orm import contains_eager, joinedload, selectinload, Session
 
 from app import crud
 from app.api.utils import get_signature_for_data_product
 from app.core.config import settings
 from app.crud.base import CRUDBase
+from app.crud.crud_admin import get_static_directory_size
 from app.models.data_product import DataProduct
+from app.models.flight import Flight
 from app.models.job import Job
 from app.models.utils.utcnow import utcnow
 from app.schemas.data_product import (
@@ -22,6 +26,8 @@ from app.schemas.data_product import (
     DataProductUpdate,
 )
 from app.schemas.job import Status
+from app.utils.cache import invalidate_static_file_access
+from app.utils.tile_cache import invalidate_tiles
 from app.models.user_style import UserStyle
 
 logger = logging.getLogger("__name__")
@@ -117,26 +123,28 @@ class CRUDDataProduct(CRUDBase[DataProduct, DataProductCreate, DataProductUpdate
         data_products_query = (
             select(DataProduct)
             .join(DataProduct.file_permission)
-            .join(DataProduct.jobs)
             .where(and_(DataProduct.flight_id == flight_id, DataProduct.is_active))
+            .where(DataProduct.jobs.any())
+            .options(contains_eager(DataProduct.file_permission))
+            .options(selectinload(DataProduct.jobs))
         )
         with db as session:
-            data_products = (
-                session.execute(data_products_query).scalars().unique().all()
+            data_products = session.execute(data_products_query).scalars().all()
+            # find user style settings for all data products in a single query
+            user_styles = get_user_styles(
+                session,
+                data_product_ids=[
+                    data_product.id
+                    for data_product in data_products
+                    if data_product.data_type != "point_cloud"
+                ],
+                user_id=user_id,
             )
             updated_data_products = []
             for data_product in data_products:
-                # if not a point cloud, find user style settings for data product
-                if data_product.data_type != "point_cloud":
-                    user_style_query = select(UserStyle).where(
-                        and_(
-                            UserStyle.data_product_id == data_product.id,
-                            UserStyle.user_id == user_id,
-                        )
-                    )
-                    user_style = session.execute(user_style_query).scalar_one_or_none()
-                    if user_style:
-                        set_user_style_attr(data_product, user_style.settings)
+                # if not a point cloud, set user style settings for data product
+                if data_product.id in user_styles:
+                    set_user_style_attr(data_product, user_styles[data_product.id])
 
                 # Set additional attributes to be returned by API
                 set_bbox_attr(data_product)
@@ -151,6 +159,80 @@ class CRUDDataProduct(CRUDBase[DataProduct, DataProductCreate, DataProductUpdate
 
             return updated_data_products
 
+    def update_raster_extent(
+        self, db: Session, data_product_id: UUID
+    ) -> Optional[DataProduct]:
+        """Reads the WGS84 bounding box, native CRS, resolution, and WGS84 footprint
+        from a raster data product and stores them with the data product, so
+        listing data products does not need to open the raster.
+
+        Args:
+            db (Session): Database session.
+            data_product_id (UUID): ID of raster data product.
+
+        Returns:
+            Optional[DataProduct]: Updated data product.
+        """
+        data_product = crud.data_product.get(db, id=data_product_id)
+        if not data_product or not is_raster(data_product):
+            return None
+
+        raster_extent = get_raster_extent(data_product.filepath)
+        update_data_product_sql = (
+            update(DataProduct)
+            .values(**raster_extent)
+            .where(DataProduct.id == data_product_id)
+        )
+        with db as session:
+            session.execute(update_data_product_sql)
+            session.commit()
+
+        return crud.data_product.get(db, id=data_product_id)
+
+    def update_disk_usage(self, db: Session, data_product_id: UUID) -> Optional[int]:
+        """Measures the data product's directory and stores its size with the data
+        product. The change from the previously stored size is added to the
+        project's disk usage.
+
+        Args:
+            db (Session): Database session.
+            data_product_id (UUID): ID of data product.
+
+        Returns:
+            Optional[int]: Size of data product directory in bytes.
+        """
+        get_data_product_sql = (
+            select(DataProduct.filepath, DataProduct.disk_usage, Flight.project_id)
+            .join(DataProduct.flight)
+            .where(DataProduct.id == data_product_id)
+        )
+        with db as session:
+            data_product = session.execute(get_data_product_sql).one_or_none()
+        if not data_product:
+            return None
+
+        # data products are stored in a directory named after the data product
+        data_product_dir = Path(data_product.filepath).parent
+        if data_product_dir.name != str(data_product_id):
+            return None
+
+        disk_usage = get_static_directory_size(str(data_product_dir))
+        update_data_product_sql = (
+            update(DataProduct)
+            .values(disk_usage=disk_usage)
+            .where(DataProduct.id == data_product_id)
+        )
+        with db as session:
+            session.execute(update_data_product_sql)
+            session.commit()
+        crud.project.add_disk_usage(
+            db,
+            project_id=data_product.project_id,
+            delta=disk_usage - (data_product.disk_usage or 0),
+        )
+
+        return disk_usage
+
     def update_bands(
         self, db: Session, data_product_id: UUID, updated_metadata: Dict
     ) -> Optional[DataProduct]:
@@ -162,6 +244,7 @@ class CRUDDataProduct(CRUDBase[DataProduct, DataProductCreate, DataProductUpdate
         with db as session:
             session.execute(update_data_product_sql)
             session.commit()
+        invalidate_tiles(data_product_id)
 
         return crud.data_product.get(db, id=data_product_id)
 
@@ -194,10 +277,39 @@ class CRUDDataProduct(CRUDBase[DataProduct, DataProductCreate, DataProductUpdate
         with db as session:
             session.execute(update_data_product_sql)
             session.commit()
+        invalidate_static_file_access(db, data_product_id=data_product_id)
+        invalidate_tiles(data_product_id)
 
         return crud.data_product.get(db, id=data_product_id)
 
 
+def get_user_styles(
+    session: Session, data_product_ids: List[UUID], user_id: UUID
+) -> Dict[UUID, Dict]:
+    """Fetches a user's style settings for multiple data products in one query.
+
+    Args:
+        session (Session): Database session.
+        data_product_ids (List[UUID]): IDs of data products.
+        user_id (UUID): ID of user.
+
+    Returns:
+        Dict[UUID, Dict]: Style settings keyed by data product ID.
+    """
+    if len(data_product_ids) == 0:
+        return {}
+    user_style_query = select(UserStyle.data_product_id, UserStyle.settings).where(
+        and_(
+            UserStyle.data_product_id.in_(data_product_ids),
+            UserStyle.user_id == user_id,
+        )
+    )
+    return {
+        data_product_id: style_settings
+        for data_product_id, style_settings in session.execute(user_style_query)
+    }
+
+
 def set_status_attr(data_product_obj: DataProduct, jobs: List[Job]) -> bool:
     """Sets current status of the upload process to the "status" attribute.
 
@@ -226,17 +338,54 @@ def set_status_attr(data_product_obj: DataProduct, jobs: List[Job]) -> bool:
         return True
 
 
+def is_raster(data_product: DataProduct) -> bool:
+    """Return True if data product is a GeoTIFF raster."""
+    return (
+        data_product.data_type != "point_cloud"
+        and Path(data_product.filepath).suffix == ".tif"
+    )
+
+
+def get_raster_extent(filepath: str) -> Dict:
+    """Returns WGS84 bounding box, native CRS, resolution, and WGS84 footprint
+    (raster extent as a polygon) for a raster.
+
+    Args:
+        filepath (str): Path to raster.
+
+    Returns:
+        Dict: Raster extent values for the data product columns.
+    """
+    with rasterio.open(filepath) as src:
+        bounds = src.bounds
+        # Project bounds from original crs to WGS84 (EPSG:4326)
+        wgs84_bbox = transform_bounds(
+            src.crs,
+            "EPSG:4326",
+            bounds.left,
+            bounds.bottom,
+            bounds.right,
+            bounds.top,
+        )
+        footprint = transform_geom(src.crs, "EPSG:4326", mapping(box(*bounds)))
+        return {
+            "bbox": list(wgs84_bbox),
+            "crs": src.crs.to_string(),
+            "resolution": list(src.res),
+            "footprint": from_shape(shape(footprint), srid=4326),
+        }
+
+
 def set_bbox_attr(data_product: DataProduct) -> None:
-    """Sets WGS84 bounding box as an attribute on the data product object.
+    """Sets WGS84 bounding box as an attribute on the data product object. The
+    stored bounding box is used when it has been set, otherwise it is read from the
+    raster.
 
     Args:
         data_product (DataProduct): Data product object.
     """
-    # Skip if not a raster data product
-    if (
-        data_product.data_type != "point_cloud"
-        and Path(data_product.filepath).suffix == ".tif"
-    ):
+    # Skip if not a raster data product or bounding box already stored
+    if is_raster(data_product) and not data_product.bbox:
         try:
             with rasterio.open(data_product.filepath) as src:
                 # Get bounds in original crs
@@ -251,7 +400,7 @@ def set_bbox_attr(data_product: DataProduct) -> None:
                     bounds.top,
                 )
                 # Set bounding box as attribute on data product object
-                setattr(data_product, "bbox", wgs84_bbox)
+                setattr(data_product, "bbox", list(wgs84_bbox))
         except CRSError:
             logger.exception(
                 f"Unable to transform bounds for data product: {data_product.id}"
@@ -3,6 +3,7 @@ from uuid import UUID
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy import and_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app import crud
@@ -29,6 +30,45 @@ class CRUDDataProductMetadata(
             session.refresh(metadata)
         return metadata
 
+    def upsert_multi_with_data_product(
+        self,
+        db: Session,
+        objs_in: Sequence[DataProductMetadataCreate],
+        data_product_id: UUID,
+    ) -> int:
+        """Creates or updates (on the unique data product/feature/category
+        constraint) metadata for many vector layer features with a single
+        INSERT ... ON CONFLICT DO UPDATE statement in one transaction.
+
+        Args:
+            db (Session): Database session.
+            objs_in (Sequence[DataProductMetadataCreate]): Metadata to write.
+            data_product_id (UUID): ID of data product for metadata.
+
+        Returns:
+            int: Number of metadata records created or updated.
+        """
+        # a statement cannot update the same row twice, last metadata for a
+        # feature and category is kept
+        rows = {}
+        for obj_in in objs_in:
+            obj_in_json = jsonable_encoder(obj_in)
+            key = (obj_in_json["category"], obj_in_json["vector_layer_feature_id"])
+            rows[key] = {**obj_in_json, "data_product_id": data_product_id}
+        if len(rows) == 0:
+            return 0
+
+        statement = insert(DataProductMetadata)
+        statement = statement.on_conflict_do_update(
+            constraint="unique_metadata",
+            set_={"properties": statement.excluded.properties},
+        )
+        with db as session:
+            # executemany form, rows are sent in batches of multiple VALUES
+            session.execute(statement, list(rows.values()))
+            session.commit()
+        return len(rows)
+
     def get_by_data_product(
         self,
         db: Session,
@@ -5,12 +5,13 @@ from uuid import UUID
 
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import and_, or_, select, update
-from sqlalchemy.orm import joinedload, Session
+from sqlalchemy import and_, select, update
+from sqlalchemy.orm import joinedload, selectinload, Session
 
 from app import crud
 from app.crud.base import CRUDBase
 from app.crud.crud_data_product import (
+    get_user_styles,
     set_bbox_attr,
     set_public_attr,
     set_signature_attr,
@@ -19,15 +20,16 @@ from app.crud.crud_data_product import (
 )
 from app.models.data_product import DataProduct
 from app.models.flight import Flight
-from app.models.job import Job
 from app.models.project import Project
 from app.models.raw_data import RawData
-from app.models.user_style import UserStyle
 from app.models.utils.utcnow import utcnow
 from app.models.vector_layer import VectorLayer
 from app.schemas.flight import FlightCreate, FlightUpdate
 from app.schemas.job import State, Status
 
+# jobs that create a data product during its initial processing
+INITIAL_PROCESSING_JOB_NAMES = ["upload-data-product", "exg-process", "ndvi-process"]
+
 
 class ReadFlight(TypedDict):
     response_code: int
@@ -89,10 +91,25 @@ class CRUDFlight(CRUDBase[Flight, FlightCreate, FlightUpdate]):
             select(Flight)
             .where(and_(Flight.project_id == project_id, Flight.is_active))
             .join(Flight.project.and_(Project.is_active))
-            .options(joinedload(Flight.data_products.and_(DataProduct.is_active)))
+            .options(
+                selectinload(Flight.data_products.and_(DataProduct.is_active)).options(
+                    joinedload(DataProduct.file_permission),
+                    selectinload(DataProduct.jobs),
+                )
+            )
         )
         with db as session:
             flights_with_data = session.execute(statement).scalars().unique().all()
+            # find user style settings for all data products in a single query
+            user_styles = get_user_styles(
+                session,
+                data_product_ids=[
+                    data_product.id
+                    for flight in flights_with_data
+                    for data_product in flight.data_products
+                ],
+                user_id=user_id,
+            )
             # flights returned by crud
             final_flights = []
             for flight in flights_with_data:
@@ -101,17 +118,14 @@ class CRUDFlight(CRUDBase[Flight, FlightCreate, FlightUpdate]):
                 if not include_all:
                     keep_data_products: List[DataProduct] = []
                     for data_product in flight.data_products:
-                        job_query = select(Job).where(
-                            and_(
-                                Job.data_product_id == data_product.id,
-                                or_(
-                                    Job.name == "upload-data-product",
-                                    Job.name == "exg-process",
-                                    Job.name == "ndvi-process",
-                                ),
-                            )
+                        job = next(
+                            (
+                                job
+                                for job in data_product.jobs
+                                if job.name in INITIAL_PROCESSING_JOB_NAMES
+                            ),
+                            None,
                         )
-                        job = session.execute(job_query).scalar_one_or_none()
                         if (
                             job
                             and job.state == State.COMPLETED
@@ -138,16 +152,10 @@ class CRUDFlight(CRUDBase[Flight, FlightCreate, FlightUpdate]):
                             set_signature_attr(data_product)
                             set_url_attr(data_product, upload_dir)
                             # check for saved user style
-                            user_style_query = (
-                                select(UserStyle)
-                                .where(UserStyle.data_product_id == data_product.id)
-                                .where(UserStyle.user_id == user_id)
-                            )
-                            user_style = session.execute(
-                                user_style_query
-                            ).scalar_one_or_none()
-                            if user_style:
-                                set_user_style_attr(data_product, user_style.settings)
+                            if data_product.id in user_styles:
+                                set_user_style_attr(
+                                    data_product, user_styles[data_product.id]
+                                )
                             if has_raster and data_product.data_type != "point_cloud":
                                 has_required_data_type = True
                 flight.data_products = available_data_products
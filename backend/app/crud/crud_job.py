@@ -23,6 +23,30 @@ class CRUDJob(CRUDBase[Job, JobCreate, JobUpdate]):
             session.refresh(job)
         return job
 
+    def get_by_task_id(
+        self, db: Session, task_id: UUID, data_product_id: UUID, user_id: UUID
+    ) -> Optional[Job]:
+        """Returns job for a celery task queued by a user for a data product.
+
+        Args:
+            db (Session): Database session.
+            task_id (UUID): ID of celery task.
+            data_product_id (UUID): ID of data product the task was queued for.
+            user_id (UUID): ID of user that queued the task.
+
+        Returns:
+            Optional[Job]: Job matching task, data product, and user, or None.
+        """
+        select_statement = select(Job).where(
+            and_(
+                Job.data_product_id == data_product_id,
+                Job.extra["task_id"].astext == str(task_id),
+                Job.extra["user_id"].astext == str(user_id),
+            )
+        )
+        with db as session:
+            return session.scalars(select_statement).first()
+
     def get_multi_by_flight(
         self, db: Session, flight_id: UUID, incomplete: bool = False
     ) -> Sequence[Job]:
@@ -1,16 +1,17 @@
 import logging
 import json
-from typing import List, Sequence, TypedDict
+from typing import Dict, List, Sequence, Tuple, TypedDict
 from uuid import UUID
 
 from fastapi import status
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import and_, func, select, update
+from sqlalchemy import and_, bindparam, func, select, update
 from sqlalchemy.exc import MultipleResultsFound
 from sqlalchemy.orm import joinedload, Session
 
 from app import crud, schemas
 from app.crud.base import CRUDBase
+from app.models.data_product import DataProduct
 from app.models.location import Location
 from app.models.project import Project
 from app.models.project_member import ProjectMember
@@ -18,6 +19,7 @@ from app.models.team_member import TeamMember
 from app.models.user import User
 from app.models.utils.utcnow import utcnow
 from app.schemas.project import Centroid, ProjectCreate, ProjectUpdate, Projects
+from app.utils.cache import invalidate_static_file_access
 
 
 logger = logging.getLogger("__name__")
@@ -325,6 +327,7 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
         with db as session:
             session.execute(update_project_sql)
             session.commit()
+        invalidate_static_file_access(db, project_id=project_id)
 
         # get deactivated project that will be deactivated
         get_project_sql = (
@@ -347,6 +350,85 @@ class CRUDProject(CRUDBase[Project, ProjectCreate, ProjectUpdate]):
 
             return deactivated_project
 
+    def add_disk_usage(self, db: Session, project_id: UUID, delta: int) -> None:
+        """Adds bytes written to (or removed from, if negative) a project's
+        directory to the project's disk usage without walking the directory.
+        Projects that have not been measured yet (null disk usage) are left for
+        reconciliation, since a delta alone would under-report their usage.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): ID of project.
+            delta (int): Change in disk usage in bytes.
+        """
+        if delta == 0:
+            return None
+        update_project_sql = (
+            update(Project)
+            .where(and_(Project.id == project_id, Project.disk_usage.is_not(None)))
+            .values(disk_usage=func.greatest(Project.disk_usage + delta, 0))
+        )
+        with db as session:
+            session.execute(update_project_sql)
+            session.commit()
+
+    def set_disk_usage(
+        self,
+        db: Session,
+        project_id: UUID,
+        disk_usage: int,
+        data_product_disk_usage: Dict[UUID, int],
+    ) -> None:
+        """Replaces a project's disk usage, and the disk usage of its data
+        products, with sizes measured from the file system.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): ID of project.
+            disk_usage (int): Size of project directory in bytes.
+            data_product_disk_usage (Dict[UUID, int]): Size of each data product
+                directory in bytes.
+        """
+        update_project_sql = (
+            update(Project)
+            .where(Project.id == project_id)
+            .values(disk_usage=disk_usage)
+        )
+        update_data_product_sql = (
+            update(DataProduct.__table__)
+            .where(DataProduct.id == bindparam("data_product_id"))
+            .values(disk_usage=bindparam("data_product_disk_usage"))
+        )
+        data_product_params = [
+            {"data_product_id": dp_id, "data_product_disk_usage": dp_size}
+            for dp_id, dp_size in data_product_disk_usage.items()
+        ]
+        with db as session:
+            session.execute(update_project_sql)
+            if len(data_product_params) > 0:
+                session.execute(update_data_product_sql, data_product_params)
+            session.commit()
+
+    def get_total_disk_usage(self, db: Session) -> Tuple[int, List[UUID]]:
+        """Returns the total disk usage of all projects and the IDs of projects
+        whose disk usage has not been measured yet.
+
+        Args:
+            db (Session): Database session.
+
+        Returns:
+            Tuple[int, List[UUID]]: Total disk usage in bytes and unmeasured projects.
+        """
+        total_disk_usage_query = select(func.coalesce(func.sum(Project.disk_usage), 0))
+        unmeasured_projects_query = select(Project.id).where(
+            Project.disk_usage.is_(None)
+        )
+        with db as session:
+            total_disk_usage = session.scalar(total_disk_usage_query)
+            unmeasured_project_ids = session.scalars(unmeasured_projects_query).all()
+
+        return int(total_disk_usage or 0), list(unmeasured_project_ids)
+
 
 def get_flight_count_and_most_recent_flight(project: Project) -> int:
     """Calculate total number of active flights in a project and
@@ -16,6 +16,7 @@ from app.models.project_member import ProjectMember
 from app.models.team import Team
 from app.models.user import User
 from app.schemas.project_member import ProjectMemberCreate, ProjectMemberUpdate
+from app.utils.cache import invalidate_static_file_access
 
 
 class UpdateProjectMember(TypedDict):
@@ -56,6 +57,7 @@ class CRUDProjectMember(
                 session.add(db_obj)
                 session.commit()
                 session.refresh(db_obj)
+        invalidate_static_file_access(db, project_id=project_id)
         return db_obj
 
     def create_multi_with_project(
@@ -73,6 +75,7 @@ class CRUDProjectMember(
             with db as session:
                 session.execute(insert(ProjectMember).values(project_members))
                 session.commit()
+            invalidate_static_file_access(db, project_id=project_id)
         return self.get_list_of_project_members(db, project_id=project_id)
 
     def get_by_project_and_member_id(
@@ -143,6 +146,7 @@ class CRUDProjectMember(
         updated_project_member = crud.project_member.update(
             db, db_obj=project_member_obj, obj_in=project_member_in
         )
+        invalidate_static_file_access(db, project_id=project_member_obj.project_id)
         return {
             "response_code": status.HTTP_200_OK,
             "message": "Project member updated",
@@ -166,6 +170,8 @@ class CRUDProjectMember(
                 for project_member in project_members:
                     session.delete(project_member)
                 session.commit()
+        if len(project_members) > 0:
+            invalidate_static_file_access(db, project_id=project_id)
         return project_members
 
 
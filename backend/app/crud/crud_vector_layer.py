@@ -1,23 +1,41 @@
+import csv
+import io
 import json
 from collections import defaultdict
-from uuid import UUID
-from typing import List, Tuple
+from uuid import UUID, uuid4
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import geopandas as gpd
+import shapely
 from geojson_pydantic import Feature
-from fastapi.encoders import jsonable_encoder
-from sqlalchemy import and_, delete, func, select, text, update
+from sqlalchemy import and_, case, cast, delete, func, Numeric, select, true, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
 from app import crud
-from app.api.utils import create_vector_layer_preview
 from app.crud.base import CRUDBase
 from app.models.data_product_metadata import DataProductMetadata
 from app.models.vector_layer import VectorLayer
+from app.models.vector_layer_preview import VectorLayerPreview
+from app.models.utils.utcnow import utcnow
+from app.schemas.job import Status
 from app.schemas.vector_layer import VectorLayerCreate, VectorLayerUpdate
 from app.utils.unique_id import generate_unique_id
 
 
+# Max features sent with each COPY statement when creating a vector layer
+VECTOR_LAYER_COPY_BATCH_SIZE = 10000
+
+VECTOR_LAYER_COPY_STATEMENT = (
+    "COPY vector_layers "
+    "(feature_id, layer_name, layer_id, geom, properties, is_active, project_id) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+# Max features fetched from the server-side cursor at a time when exporting
+VECTOR_LAYER_EXPORT_BATCH_SIZE = 1000
+
+
 class CRUDVectorLayer(CRUDBase[VectorLayer, VectorLayerCreate, VectorLayerUpdate]):
     def create_with_project(
         self,
@@ -27,6 +45,8 @@ class CRUDVectorLayer(CRUDBase[VectorLayer, VectorLayerCreate, VectorLayerUpdate
         project_id: UUID,
     ) -> List[Feature]:
         """Creates new vector layer records for features in a feature collection.
+        Geometries and properties are converted for all features at once and rows
+        are streamed into the vector layers table with COPY.
 
         Args:
             db (Session): Database session.
@@ -39,31 +59,39 @@ class CRUDVectorLayer(CRUDBase[VectorLayer, VectorLayerCreate, VectorLayerUpdate
         """
         # Unique ID for feature collection
         layer_id = generate_unique_id()
-        # List of vector layer objects
-        vector_layers = []
-        # Create record in database for each feature
-        for _, row in gdf.iterrows():
-            # Get geometry in WKT format
-            wkt_geometry = row.geometry.wkt
-            # Convert to postgis compatible geometry
-            geom = func.ST_Force2D(
-                func.ST_GeomFromText(text(f"'{wkt_geometry}'"), 4326)
+        # Geometries as 2D hex EWKB (SRID 4326), converted in one vectorized call
+        geometries = shapely.set_srid(shapely.force_2d(gdf.geometry.values), 4326)
+        wkb_geometries = shapely.to_wkb(geometries, hex=True, include_srid=True)
+        # Properties serialized by pandas in one call (NaN values become null)
+        properties = json.loads(
+            gdf.drop(columns=gdf.geometry.name).to_json(
+                orient="records", date_format="iso"
             )
-            properties = jsonable_encoder(row.drop("geometry").to_dict())
-            # Layer ID will be same for each feature from the feature collection
-            vector_layer = VectorLayer(
-                layer_name=file_name,
-                layer_id=layer_id,
-                geom=geom,
-                properties=properties,
-                project_id=project_id,
-            )
-            # Add vector layer object to list
-            vector_layers.append(vector_layer)
+        )
 
-        # Add and commit all vector layers
+        # Stream features into vector layers table with COPY, in batches
         with db as session:
-            session.add_all(vector_layers)
+            cursor = session.connection().connection.cursor()
+            for start in range(0, len(gdf), VECTOR_LAYER_COPY_BATCH_SIZE):
+                stop = start + VECTOR_LAYER_COPY_BATCH_SIZE
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for wkb_geometry, feature_properties in zip(
+                    wkb_geometries[start:stop], properties[start:stop]
+                ):
+                    writer.writerow(
+                        [
+                            uuid4(),
+                            file_name,
+                            layer_id,
+                            wkb_geometry,
+                            json.dumps(feature_properties),
+                            True,
+                            project_id,
+                        ]
+                    )
+                buffer.seek(0)
+                cursor.copy_expert(VECTOR_LAYER_COPY_STATEMENT, buffer)
             session.commit()
 
         return self.get_vector_layer_by_id(db, project_id=project_id, layer_id=layer_id)
@@ -90,20 +118,155 @@ class CRUDVectorLayer(CRUDBase[VectorLayer, VectorLayerCreate, VectorLayerUpdate
         )
         with db as session:
             vector_layers = session.scalars(statement).all()
-            if len(vector_layers) > 0:
-                features: List[Feature] = [
-                    Feature(**json.loads(feature)) for feature in vector_layers
-                ]
-                # Create preview image (if one does not exist)
-                create_vector_layer_preview(
-                    project_id=project_id,
-                    layer_id=layer_id,
-                    features=features,
+            # Deserialize features and create Feature objects for each feature
+            return [Feature(**json.loads(feature)) for feature in vector_layers]
+
+    def get_layer_name(
+        self, db: Session, project_id: UUID, layer_id: str
+    ) -> Optional[str]:
+        """Returns the original file name for a feature collection.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): Project ID for feature collection.
+            layer_id (str): Layer ID for feature collection.
+
+        Returns:
+            Optional[str]: Layer name or None if layer has no active features.
+        """
+        statement = (
+            select(VectorLayer.layer_name)
+            .where(
+                and_(
+                    VectorLayer.layer_id == layer_id,
+                    VectorLayer.project_id == project_id,
+                    VectorLayer.is_active,
                 )
-                # Deserialize features and create Feature objects for each feature
-                return features
-            else:
-                return []
+            )
+            .limit(1)
+        )
+        with db as session:
+            return session.scalar(statement)
+
+    def stream_vector_layer_geojson(
+        self, db: Session, project_id: UUID, layer_id: str
+    ) -> Iterator[str]:
+        """Yields a feature collection as GeoJSON text in chunks. Features are
+        serialized by Postgres and read from a server-side cursor, so memory use
+        does not grow with the size of the layer.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): Project ID for feature collection.
+            layer_id (str): Layer ID for feature collection.
+
+        Yields:
+            Iterator[str]: Chunks of GeoJSON FeatureCollection.
+        """
+        statement = (
+            select(func.ST_AsGeoJSON(VectorLayer))
+            .where(
+                and_(
+                    VectorLayer.layer_id == layer_id,
+                    VectorLayer.project_id == project_id,
+                    VectorLayer.is_active,
+                )
+            )
+            .execution_options(yield_per=VECTOR_LAYER_EXPORT_BATCH_SIZE)
+        )
+        with db as session:
+            yield '{"type": "FeatureCollection", "features": ['
+            separator = ""
+            for features in session.scalars(statement).partitions():
+                yield separator + ",".join(features)
+                separator = ","
+            yield "]}"
+
+    def get_vector_layer_schema(
+        self, db: Session, project_id: UUID, layer_id: str
+    ) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Returns the geometry types and property value types found in a feature
+        collection. Types are collected in Postgres without reading the features.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): Project ID for feature collection.
+            layer_id (str): Layer ID for feature collection.
+
+        Returns:
+            Tuple[List[str], List[Tuple[str, str]]]: Geometry types (e.g., POLYGON)
+            and (property name, JSON type) pairs. Integral numbers have the type
+            "integer".
+        """
+        layer_filter = and_(
+            VectorLayer.layer_id == layer_id,
+            VectorLayer.project_id == project_id,
+            VectorLayer.is_active,
+        )
+        geometry_types_statement = (
+            select(func.GeometryType(VectorLayer.geom)).where(layer_filter).distinct()
+        )
+        properties = (
+            func.jsonb_each(VectorLayer.properties)
+            .table_valued("key", "value")
+            .render_derived()
+        )
+        value_type = case(
+            (
+                func.jsonb_typeof(properties.c.value) != "number",
+                func.jsonb_typeof(properties.c.value),
+            ),
+            (
+                func.trunc(cast(properties.c.value, Numeric))
+                == cast(properties.c.value, Numeric),
+                "integer",
+            ),
+            else_="number",
+        )
+        property_types_statement = (
+            select(properties.c.key, value_type)
+            .select_from(VectorLayer)
+            .join(properties, true())
+            .where(layer_filter)
+            .distinct()
+        )
+        with db as session:
+            geometry_types = session.scalars(geometry_types_statement).all()
+            property_types = session.execute(property_types_statement).all()
+
+        return list(geometry_types), [tuple(row) for row in property_types]
+
+    def iter_vector_layer_features(
+        self, db: Session, project_id: UUID, layer_id: str
+    ) -> Iterator[List[Tuple[Dict[str, Any], Dict[str, Any]]]]:
+        """Yields the geometry and original properties of features in batches read
+        from a server-side cursor.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): Project ID for feature collection.
+            layer_id (str): Layer ID for feature collection.
+
+        Yields:
+            Iterator[List[Tuple[Dict[str, Any], Dict[str, Any]]]]: Batches of
+            (GeoJSON geometry, properties) pairs.
+        """
+        statement = (
+            select(func.ST_AsGeoJSON(VectorLayer.geom), VectorLayer.properties)
+            .where(
+                and_(
+                    VectorLayer.layer_id == layer_id,
+                    VectorLayer.project_id == project_id,
+                    VectorLayer.is_active,
+                )
+            )
+            .execution_options(yield_per=VECTOR_LAYER_EXPORT_BATCH_SIZE)
+        )
+        with db as session:
+            for rows in session.execute(statement).partitions():
+                yield [
+                    (json.loads(geometry), properties) for geometry, properties in rows
+                ]
 
     def get_vector_layer_by_id_with_metadata(
         self,
@@ -216,13 +379,6 @@ class CRUDVectorLayer(CRUDBase[VectorLayer, VectorLayerCreate, VectorLayerUpdate
             ):
                 feature = Feature(**json.loads(feature[0]))
                 vector_layers[feature.properties["layer_id"]].append(feature)
-        for layer_id in vector_layers.keys():
-            # Create preview image (if one does not exist)
-            preview_img = create_vector_layer_preview(
-                project_id=project_id,
-                layer_id=layer_id,
-                features=vector_layers[layer_id],
-            )
         # Each list element is a list of features from a feature collection
         return list(vector_layers.values())
 
@@ -260,6 +416,55 @@ class CRUDVectorLayer(CRUDBase[VectorLayer, VectorLayerCreate, VectorLayerUpdate
             )
             db.execute(delete_statement)
 
+            # Step 4: Delete preview state for feature collection
+            delete_preview_statement = delete(VectorLayerPreview).where(
+                VectorLayerPreview.layer_id == layer_id
+            )
+            db.execute(delete_preview_statement)
+
+    def set_preview_status(
+        self, db: Session, project_id: UUID, layer_id: str, status: Status
+    ) -> None:
+        """Creates or updates the preview image state for a feature collection.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): Project ID for feature collection.
+            layer_id (str): Layer ID for feature collection.
+            status (Status): Preview image status.
+        """
+        statement = insert(VectorLayerPreview).values(
+            layer_id=layer_id, project_id=project_id, status=status
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[VectorLayerPreview.layer_id],
+            set_={"status": status, "updated_at": utcnow()},
+        )
+        with db as session:
+            session.execute(statement)
+            session.commit()
+
+    def get_preview_statuses(self, db: Session, project_id: UUID) -> Dict[str, Status]:
+        """Returns the preview image state for each feature collection in a
+        project. Feature collections created before preview state was tracked
+        are not included.
+
+        Args:
+            db (Session): Database session.
+            project_id (UUID): Project ID.
+
+        Returns:
+            Dict[str, Status]: Preview status for each layer ID.
+        """
+        statement = select(
+            VectorLayerPreview.layer_id, VectorLayerPreview.status
+        ).where(VectorLayerPreview.project_id == project_id)
+        with db as session:
+            return {
+                layer_id: status
+                for layer_id, status in session.execute(statement).all()
+            }
+
     def verify_user_access_to_vector_layer_by_id(
         self, db: Session, layer_id: str, user_id: UUID
     ) -> bool:
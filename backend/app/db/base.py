@@ -17,6 +17,7 @@ from app.models.project_member import ProjectMember
 from app.models.raw_data import RawData
 from app.models.shortened_url import ShortenedUrl
 from app.models.single_use_token import SingleUseToken
+from app.models.static_file_access_version import static_file_access_version
 from app.models.team import Team
 from app.models.team_extension import TeamExtension
 from app.models.team_member import TeamMember
@@ -25,3 +26,4 @@ from app.models.user import User
 from app.models.user_extension import UserExtension
 from app.models.user_style import UserStyle
 from app.models.vector_layer import VectorLayer
+from app.models.vector_layer_preview import VectorLayerPreview
@@ -1,8 +1,11 @@
+import asyncio
 import logging
 import time
-from typing import Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable
 
 from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
@@ -12,10 +15,32 @@ from app.api.api_v1.api import api_router
 from app.api.extras import extra_router
 from app.core.config import settings
 from app.core.logging import get_http_info, setup_logger
+from app.utils.api_key_usage import flush_api_key_usage
 from app.utils.ProtectedStaticFiles import ProtectedStaticFiles
+from app.utils.tile_proxy import create_http_client
+
+
+async def flush_api_key_usage_periodically() -> None:
+    """Saves API key usage aggregated in memory at the flush interval."""
+    while True:
+        await asyncio.sleep(settings.API_KEY_USAGE_FLUSH_INTERVAL)
+        await run_in_threadpool(flush_api_key_usage)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # shared client with connection pool for upstream tile servers
+    app.state.http_client = create_http_client()
+    flush_task = asyncio.create_task(flush_api_key_usage_periodically())
+    yield
+    flush_task.cancel()
+    await app.state.http_client.aclose()
+    # save usage recorded since the last flush
+    await run_in_threadpool(flush_api_key_usage)
 
 
 app = FastAPI(
+    lifespan=lifespan,
     docs_url="/developer/api",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     redoc_url="/developer/docs",
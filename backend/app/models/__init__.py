@@ -22,3 +22,4 @@ from .user import User
 from .user_extension import UserExtension
 from .user_style import UserStyle
 from .vector_layer import VectorLayer
+from .vector_layer_preview import VectorLayerPreview
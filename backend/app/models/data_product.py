@@ -2,8 +2,9 @@ import uuid
 from datetime import datetime
 from typing import List, TYPE_CHECKING
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, String
-from sqlalchemy.dialects.postgresql import JSONB, UUID
+from geoalchemy2 import Geometry
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, String
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base_class import Base
@@ -37,6 +38,16 @@ class DataProduct(Base):
     deactivated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # raster extent, set once after processing so rasters are not opened to list
+    # data products (null for point clouds). footprint is only loaded on access.
+    bbox: Mapped[List[float]] = mapped_column(ARRAY(Float), nullable=True)
+    crs: Mapped[str] = mapped_column(String, nullable=True)
+    resolution: Mapped[List[float]] = mapped_column(ARRAY(Float), nullable=True)
+    footprint: Mapped[str] = mapped_column(
+        Geometry("POLYGON", srid=4326), nullable=True, deferred=True
+    )
+    # bytes used by data product directory (null until measured)
+    disk_usage: Mapped[int] = mapped_column(BigInteger, nullable=True)
     # foreign keys
     flight_id: Mapped[uuid.UUID] = mapped_column(
         ForeignKey("flights.id"), nullable=False
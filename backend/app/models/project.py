@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING
 
 from datetime import date
 
-from sqlalchemy import Boolean, Date, DateTime, ForeignKey, String
+from sqlalchemy import BigInteger, Boolean, Date, DateTime, ForeignKey, String
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -20,6 +20,7 @@ if TYPE_CHECKING:
     from .team import Team
     from .user import User
     from .vector_layer import VectorLayer
+    from .vector_layer_preview import VectorLayerPreview
 
 
 class Project(Base):
@@ -43,6 +44,10 @@ class Project(Base):
     deactivated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), nullable=True
     )
+    # bytes used by project directory, updated as files are added and removed
+    # and reconciled against the file system (null until measured, new projects
+    # start at zero)
+    disk_usage: Mapped[int] = mapped_column(BigInteger, default=0, nullable=True)
 
     members: Mapped[list["ProjectMember"]] = relationship(
         back_populates="project", cascade="all, delete"
@@ -64,6 +69,9 @@ class Project(Base):
     vector_layer: Mapped[list["VectorLayer"]] = relationship(
         back_populates="project", cascade="all, delete"
     )
+    vector_layer_previews: Mapped[list["VectorLayerPreview"]] = relationship(
+        back_populates="project", cascade="all, delete"
+    )
 
     def __repr__(self) -> str:
         return (
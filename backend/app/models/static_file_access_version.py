@@ -0,0 +1,10 @@
+from sqlalchemy import Sequence
+
+from app.db.base_class import Base
+
+
+# incremented when static file access decisions cached by any process must be
+# discarded (e.g., a project member is removed or a file is made private)
+static_file_access_version = Sequence(
+    "static_file_access_version", metadata=Base.metadata
+)
@@ -0,0 +1,43 @@
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING
+
+from sqlalchemy import DateTime, ForeignKey, String
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.base_class import Base
+from app.models.utils.utcnow import utcnow
+from app.schemas.job import Status
+
+
+if TYPE_CHECKING:
+    from .project import Project
+
+
+class VectorLayerPreview(Base):
+    __tablename__ = "vector_layer_previews"
+
+    # columns
+    layer_id: Mapped[str] = mapped_column(String(12), primary_key=True)
+    status: Mapped[Status] = mapped_column(
+        ENUM(Status, name="job_status"), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=utcnow(),
+        onupdate=utcnow(),
+        nullable=False,
+    )
+    # foreign keys
+    project_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("projects.id"), nullable=False
+    )
+    # relationships
+    project: Mapped["Project"] = relationship(back_populates="vector_layer_previews")
+
+    def __repr__(self) -> str:
+        return (
+            f"VectorLayerPreview(layer_id={self.layer_id!r}, status={self.status!r}, "
+            f"updated_at={self.updated_at!r}, project_id={self.project_id!r})"
+        )
@@ -56,6 +56,8 @@ class DataProductSignature(BaseModel):
 
 class DataProduct(DataProductInDBBase):
     bbox: Optional[List[float]] = None
+    crs: Optional[str] = None
+    resolution: Optional[List[float]] = None
     public: bool = False
     signature: Optional[DataProductSignature] = None
     status: Optional[str] = None
@@ -53,3 +53,4 @@ class VectorLayerPayload(BaseModel):
     geom_type: str
     signed_url: AnyHttpUrl
     preview_url: AnyHttpUrl
+    preview_status: Optional[str] = None
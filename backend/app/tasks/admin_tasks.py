@@ -5,8 +5,8 @@ from app import crud
 from app.api.deps import get_db
 from app.core.celery_app import celery_app
 from app.core.config import settings
-from app.crud.crud_admin import get_disk_usage
 from app.schemas.disk_usage_stats import DiskUsageStatsCreate
+from app.utils.disk_usage import get_static_dir_usage, reconcile_disk_usage
 from app.utils.job_manager import JobManager, Status
 
 logger = get_task_logger(__name__)
@@ -19,6 +19,11 @@ celery_app.conf.beat_schedule = {
         "schedule": crontab(hour=6, minute=5),
         "args": (),
     },
+    "reconcile-disk-usage": {
+        "task": "reconcile_disk_usage_task",
+        "schedule": crontab(hour=5, minute=5, day_of_week=0),
+        "args": (),
+    },
 }
 
 
@@ -33,7 +38,7 @@ def calculate_disk_usage() -> None:
 
     # Get disk usage stats
     try:
-        total, used, free = get_disk_usage(settings.STATIC_DIR)
+        total, used, free = get_static_dir_usage(db, settings.STATIC_DIR)
     except Exception:
         logger.exception("Unable to calculate disk usage")
         job.update(status=Status.FAILED)
@@ -51,3 +56,24 @@ def calculate_disk_usage() -> None:
 
     # Update job status
     job.update(status=Status.SUCCESS)
+
+
+@celery_app.task(name="reconcile_disk_usage_task")
+def reconcile_disk_usage_task(shard: int = 0, num_shards: int = 1) -> None:
+    # Create job to track progress
+    job = JobManager(job_name="reconcile-disk-usage")
+    job.start()
+
+    # Get database session
+    db = next(get_db())
+
+    # Replace incrementally updated project disk usage with measured sizes
+    try:
+        reconcile_disk_usage(db, shard=shard, num_shards=num_shards)
+    except Exception:
+        logger.exception("Unable to reconcile disk usage")
+        job.update(status=Status.FAILED)
+        return None
+
+    # Update job status
+    job.update(status=Status.SUCCESS)
@@ -1,7 +1,19 @@
+import os
 from pathlib import Path
+from typing import List
+from uuid import UUID
 
 from celery.utils.log import get_task_logger
+from sqlalchemy.orm import Session
 
+from app import crud
+from app.api.deps import get_db
+from app.api.utils import (
+    create_project_field_preview,
+    create_vector_layer_preview,
+    create_vector_layer_preview_placeholder,
+    get_vector_layer_preview_dir,
+)
 from app.core.celery_app import celery_app
 from app.utils.job_manager import JobManager, Status
 from app.utils import gen_preview_from_pointcloud
@@ -40,3 +52,154 @@ def generate_point_cloud_preview(in_las_filepath: str) -> None:
             pass
 
     job.update(status=Status.SUCCESS)
+
+
+@celery_app.task(name="render_project_previews_task")
+def render_project_previews(project_ids: List[str]) -> int:
+    """Celery task for rendering field boundary previews for a batch of projects.
+    Previews rendered by a worker share its basemap tile cache, so nearby fields
+    reuse tiles instead of requesting them again.
+
+    Args:
+        project_ids (List[str]): IDs of projects to render previews for.
+
+    Returns:
+        int: Number of previews rendered.
+    """
+    # get database session
+    db = next(get_db())
+
+    rendered = 0
+    for project_id in project_ids:
+        try:
+            project = crud.project.get(db, id=project_id)
+            if not project:
+                continue
+            location = crud.location.get_geojson_location(
+                db, location_id=project.location_id
+            )
+            if not location:
+                continue
+            create_project_field_preview(project.id, [location])
+            rendered += 1
+        except Exception:
+            logger.exception(f"Unable to create preview map for project {project_id}")
+
+    return rendered
+
+
+@celery_app.task(name="generate_vector_layer_previews_task")
+def generate_vector_layer_previews(project_id: str, layer_ids: List[str]) -> int:
+    """Celery task for rendering preview images for a batch of vector layers.
+
+    Args:
+        project_id (str): ID of project the vector layers belong to.
+        layer_ids (List[str]): Layer IDs of vector layers.
+
+    Returns:
+        int: Number of previews rendered.
+    """
+    # get database session
+    db = next(get_db())
+
+    return render_vector_layer_previews(db, UUID(project_id), layer_ids)
+
+
+def render_vector_layer_previews(
+    db: Session, project_id: UUID, layer_ids: List[str]
+) -> int:
+    """Renders preview images for vector layers and records the preview state of
+    each layer. Existing previews and placeholders are replaced.
+
+    Args:
+        db (Session): Database session.
+        project_id (UUID): ID of project the vector layers belong to.
+        layer_ids (List[str]): Layer IDs of vector layers.
+
+    Returns:
+        int: Number of previews rendered.
+    """
+    rendered = 0
+    for layer_id in layer_ids:
+        crud.vector_layer.set_preview_status(
+            db, project_id=project_id, layer_id=layer_id, status=Status.INPROGRESS
+        )
+        try:
+            features = crud.vector_layer.get_vector_layer_by_id(
+                db, project_id=project_id, layer_id=layer_id
+            )
+            if len(features) == 0:
+                raise ValueError("Vector layer does not have any features")
+            create_vector_layer_preview(
+                project_id=project_id,
+                layer_id=layer_id,
+                features=features,
+                overwrite=True,
+            )
+        except Exception:
+            logger.exception(f"Unable to create preview for vector layer {layer_id}")
+            crud.vector_layer.set_preview_status(
+                db, project_id=project_id, layer_id=layer_id, status=Status.FAILED
+            )
+            continue
+        crud.vector_layer.set_preview_status(
+            db, project_id=project_id, layer_id=layer_id, status=Status.SUCCESS
+        )
+        rendered += 1
+
+    return rendered
+
+
+def queue_vector_layer_preview(db: Session, project_id: UUID, layer_id: str) -> None:
+    """Serves a placeholder for a new vector layer's preview image and queues the
+    preview for rendering. Previews are rendered immediately when running tests.
+
+    Args:
+        db (Session): Database session.
+        project_id (UUID): ID of project the vector layer belongs to.
+        layer_id (str): Layer ID of vector layer.
+    """
+    crud.vector_layer.set_preview_status(
+        db, project_id=project_id, layer_id=layer_id, status=Status.WAITING
+    )
+    create_vector_layer_preview_placeholder(project_id, layer_id)
+    if os.environ.get("RUNNING_TESTS") == "1":
+        render_vector_layer_previews(db, project_id, [layer_id])
+    else:
+        generate_vector_layer_previews.apply_async(args=(str(project_id), [layer_id]))
+
+
+def queue_missing_vector_layer_previews(
+    db: Session, project_id: UUID, layer_ids: List[str]
+) -> None:
+    """Records the preview state of vector layers uploaded before preview state
+    was tracked. Existing preview images are kept and layers without a preview
+    image are queued for rendering in a single task.
+
+    Args:
+        db (Session): Database session.
+        project_id (UUID): ID of project the vector layers belong to.
+        layer_ids (List[str]): Layer IDs of vector layers without a preview state.
+    """
+    missing_layer_ids = []
+    for layer_id in layer_ids:
+        preview_dir = Path(get_vector_layer_preview_dir(project_id, layer_id))
+        if (preview_dir / "preview.png").exists():
+            crud.vector_layer.set_preview_status(
+                db, project_id=project_id, layer_id=layer_id, status=Status.SUCCESS
+            )
+            continue
+        crud.vector_layer.set_preview_status(
+            db, project_id=project_id, layer_id=layer_id, status=Status.WAITING
+        )
+        create_vector_layer_preview_placeholder(project_id, layer_id)
+        missing_layer_ids.append(layer_id)
+
+    if len(missing_layer_ids) == 0:
+        return
+    if os.environ.get("RUNNING_TESTS") == "1":
+        render_vector_layer_previews(db, project_id, missing_layer_ids)
+    else:
+        generate_vector_layer_previews.apply_async(
+            args=(str(project_id), missing_layer_ids)
+        )
@@ -6,8 +6,6 @@ import geopandas as gpd
 import rasterio
 from celery.utils.log import get_task_logger
 from geojson_pydantic import FeatureCollection
-from rasterstats import zonal_stats
-from sqlalchemy.exc import IntegrityError
 
 from app import crud, schemas
 from app.api.deps import get_db
@@ -17,37 +15,75 @@ from app.schemas.data_product import DataProductUpdate
 from app.schemas.data_product_metadata import ZonalStatisticsProps
 from app.schemas.job import Status
 from app.utils.Toolbox import Toolbox
+from app.utils.toolbox.zonal_statistics import (
+    get_zonal_statistics,
+    get_zone_windows,
+)
 
 
 logger = get_task_logger(__name__)
 
 
+def read_zones(
+    src: rasterio.DatasetReader, feature_collection: dict
+) -> gpd.GeoDataFrame:
+    """Return zones from a feature collection in the raster's CRS."""
+    # convert feature collection to dataframe and update crs to match src crs
+    zones = gpd.GeoDataFrame.from_features(
+        feature_collection["features"], crs="EPSG:4326"
+    )
+    return zones.to_crs(src.crs)
+
+
+def get_zones_window_pixels(input_raster: str, feature_collection: dict) -> int:
+    """Return no. of raster pixels (per band) read to calculate zonal statistics
+    for the zones in a feature collection."""
+    with rasterio.open(input_raster) as src:
+        zone_windows = get_zone_windows(src, read_zones(src, feature_collection))
+    return int((zone_windows[:, 2:] - zone_windows[:, :2]).prod(axis=1).sum())
+
+
 @celery_app.task(name="calculate_zonal_statistics_task")
 def calculate_zonal_statistics(
-    input_raster: str, feature_collection: dict
+    input_raster: str,
+    feature_collection: dict,
+    band_indexes: List[int] | None = None,
+    engine: str = "mask",
+    job_id: UUID | None = None,
 ) -> List[ZonalStatisticsProps]:
-    """Generate zonal statistics for a raster using a feature collection."""
-    job = JobManager(job_name="zonal")
+    """Generate zonal statistics for a raster using a feature collection. Stats for
+    the first requested band (band 1 by default) are returned for each zone. When
+    more than one band is requested, stats for every band are included under
+    "bands" keyed by band name (e.g., "b2"). The "label" engine summarizes all
+    zones in a window at once and is used for bulk zonal statistics. An existing
+    job is updated when job_id is provided, otherwise a new job is created."""
+    job = JobManager(job_id=job_id) if job_id else JobManager(job_name="zonal")
     job.start()
 
-    with rasterio.open(input_raster) as src:
-        # convert feature collection to dataframe and update crs to match src crs
-        zones = gpd.GeoDataFrame.from_features(
-            feature_collection["features"], crs="EPSG:4326"
-        )
-        zones = zones.to_crs(src.crs)
-        minx, miny, maxx, maxy = zones.total_bounds
-        # affine transformation
-        affine = src.transform
-        # create window for total bounding box of all zones in zone_feature
-        window = rasterio.windows.from_bounds(minx, miny, maxx, maxy, affine)
-        window_affine = rasterio.windows.transform(window, src.transform)
-        # read first band contained within window into array
-        data = src.read(1, window=window)
-        # required zonal statistics
-        required_stats = "count min max mean median std"
-        # get stats for zone
-        stats = zonal_stats(zones, data, affine=window_affine, stats=required_stats)
+    if not band_indexes:
+        band_indexes = [1]
+
+    try:
+        with rasterio.open(input_raster) as src:
+            zones = read_zones(src, feature_collection)
+            # nearby zones are read together in bounded windows, one read for all
+            # bands
+            all_band_stats = get_zonal_statistics(
+                src, zones, band_indexes, engine=engine
+            )
+    except Exception:
+        job.update(status=Status.FAILED)
+        raise
+
+    stats = []
+    for band_stats in all_band_stats:
+        zone_stats = dict(band_stats[0])
+        if len(band_indexes) > 1:
+            zone_stats["bands"] = {
+                f"b{band_idx}": band_stats[index]
+                for index, band_idx in enumerate(band_indexes)
+            }
+        stats.append(zone_stats)
 
     job.update(status=Status.SUCCESS)
 
@@ -56,18 +92,25 @@ def calculate_zonal_statistics(
 
 @celery_app.task(name="calculate_bulk_zonal_statistics_task")
 def calculate_bulk_zonal_statistics(
-    input_raster: str, data_product_id: UUID, feature_collection_dict: Dict[str, Any]
+    input_raster: str,
+    data_product_id: UUID,
+    feature_collection_dict: Dict[str, Any],
+    band_indexes: List[int] | None = None,
+    job_id: UUID | None = None,
 ) -> List[ZonalStatisticsProps]:
     # database session for updating data product and job tables
     db = next(get_db())
 
-    # create new job for tool process
-    job = JobManager(data_product_id=data_product_id, job_name="zonal")
+    # use existing job or create new job for tool process
+    if job_id:
+        job = JobManager(job_id=job_id)
+    else:
+        job = JobManager(data_product_id=data_product_id, job_name="zonal")
 
     try:
         job.start()
         all_zonal_stats = calculate_zonal_statistics(
-            input_raster, feature_collection_dict
+            input_raster, feature_collection_dict, band_indexes, engine="label"
         )
     except Exception:
         logger.exception("Unable to complete tool process")
@@ -80,38 +123,18 @@ def calculate_bulk_zonal_statistics(
             **feature_collection_dict
         )
         features = feature_collection.features
-        # create metadata record for each zone
-        for index, zstats in enumerate(all_zonal_stats):
-            vector_layer_feature_id = features[index].properties["feature_id"]
-            metadata_in = schemas.DataProductMetadataCreate(
+        # create or update metadata record for each zone in one statement
+        metadata_in = [
+            schemas.DataProductMetadataCreate(
                 category="zonal",
                 properties={"stats": zstats},
-                vector_layer_feature_id=vector_layer_feature_id,
+                vector_layer_feature_id=features[index].properties["feature_id"],
             )
-            try:
-                crud.data_product_metadata.create_with_data_product(
-                    db, obj_in=metadata_in, data_product_id=data_product_id
-                )
-            except IntegrityError:
-                # update existing metadata
-                existing_metadata = crud.data_product_metadata.get_by_data_product(
-                    db,
-                    category="zonal",
-                    data_product_id=data_product_id,
-                    vector_layer_feature_id=vector_layer_feature_id,
-                )
-                if len(existing_metadata) == 1:
-                    crud.data_product_metadata.update(
-                        db,
-                        db_obj=existing_metadata[0],
-                        obj_in=schemas.DataProductMetadataUpdate(
-                            properties={"stats": zstats}
-                        ),
-                    )
-                else:
-                    logger.exception("Unable to save zonal statistics")
-                    job.update(status=Status.FAILED)
-                    return []
+            for index, zstats in enumerate(all_zonal_stats)
+        ]
+        crud.data_product_metadata.upsert_multi_with_data_product(
+            db, objs_in=metadata_in, data_product_id=data_product_id
+        )
     except Exception:
         logger.exception("Unable to save zonal statistics")
         job.update(status=Status.FAILED)
@@ -172,6 +195,13 @@ def run_toolbox(
                     is_initial_processing_completed=True,
                 ),
             )
+            # store raster extent so listing data products does not open the raster
+            try:
+                crud.data_product.update_raster_extent(
+                    db, data_product_id=new_data_product.id
+                )
+            except Exception:
+                logger.exception("Failed to store raster extent for data product")
             # create user style record with default symbology settings
             crud.user_style.create_with_data_product_and_user(
                 db,
@@ -184,4 +214,10 @@ def run_toolbox(
         job.update(status=Status.FAILED)
         return None
 
+    # add size of new data product directory to project disk usage
+    try:
+        crud.data_product.update_disk_usage(db, data_product_id=new_data_product_id)
+    except Exception:
+        logger.exception("Failed to update disk usage for data product")
+
     job.update(status=Status.SUCCESS)
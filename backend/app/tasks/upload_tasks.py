@@ -12,12 +12,14 @@ from fastapi.encoders import jsonable_encoder
 
 from app import crud, schemas
 from app.api.deps import get_db
-from app.api.utils import is_geometry_match
+from app.api.utils import is_geometry_type_consistent
 from app.core.celery_app import celery_app
+from app.tasks.post_upload_tasks import queue_vector_layer_preview
 from app.utils.job_manager import JobManager
 from app.schemas.data_product import DataProductUpdate
 from app.schemas.job import Status
 from app.utils.ImageProcessor import ImageProcessor
+from app.utils.upload_transfer import transfer_upload
 
 
 logger = get_task_logger(__name__)
@@ -42,8 +44,8 @@ def upload_geotiff(
     """
     in_raster = Path(geotiff_filepath)
 
-    # copy uploaded point cloud to static files
-    shutil.copyfile(storage_path, in_raster)
+    # move uploaded geotiff to static files
+    transfer_upload(storage_path, str(in_raster))
 
     # get database session
     db = next(get_db())
@@ -74,7 +76,7 @@ def upload_geotiff(
 
     # create get STAC properties and convert to COG (if needed)
     try:
-        ip = ImageProcessor(str(in_raster))
+        ip = ImageProcessor(str(in_raster), engine="rasterio", use_overviews=True)
         out_raster = ip.run()
         default_symbology = ip.get_default_symbology()
     except Exception:
@@ -101,6 +103,18 @@ def upload_geotiff(
         logger.exception("Failed to update data product in db")
         return None
 
+    # store raster extent so listing data products does not open the raster
+    try:
+        crud.data_product.update_raster_extent(db, data_product_id=data_product.id)
+    except Exception:
+        logger.exception("Failed to store raster extent for data product")
+
+    # add size of data product directory to project disk usage
+    try:
+        crud.data_product.update_disk_usage(db, data_product_id=data_product.id)
+    except Exception:
+        logger.exception("Failed to update disk usage for data product")
+
     # indicate initial processing finished without errors
     crud.data_product.update(
         db,
@@ -152,8 +166,8 @@ def upload_point_cloud(
     """
     in_las = Path(las_filepath)
 
-    # copy uploaded point cloud to static files
-    shutil.copyfile(storage_path, in_las)
+    # move uploaded point cloud to static files
+    transfer_upload(storage_path, str(in_las))
 
     # get database session
     db = next(get_db())
@@ -227,6 +241,12 @@ def upload_point_cloud(
     if os.path.exists(in_las.parent):
         shutil.rmtree(in_las.parent)
 
+    # add size of data product directory to project disk usage
+    try:
+        crud.data_product.update_disk_usage(db, data_product_id=data_product.id)
+    except Exception:
+        logger.exception("Failed to update disk usage for data product")
+
     # remove the uploaded point cloud from tusd
     try:
         if os.path.exists(storage_path):
@@ -277,8 +297,8 @@ def upload_raw_data(
     # update job status to indicate process has started
     job.start()
     try:
-        # copy uploaded raw data to static files and update record
-        shutil.copyfile(storage_path, destination_filepath)
+        # move uploaded raw data to static files and update record
+        transfer_upload(storage_path, destination_filepath)
 
         # add filepath to raw data object
         crud.raw_data.update(
@@ -297,6 +317,14 @@ def upload_raw_data(
         job.update(status=Status.FAILED)
         return None
 
+    # add size of raw data to project disk usage
+    try:
+        crud.project.add_disk_usage(
+            db, project_id=project_id, delta=os.path.getsize(destination_filepath)
+        )
+    except Exception:
+        logger.exception("Failed to update disk usage for raw data")
+
     # update job to indicate process finished
     job.update(status=Status.SUCCESS)
 
@@ -365,17 +393,12 @@ def upload_vector_layer(
         )
 
     # check for consistent geometry type
-    first_feature_geometry_type = gdf.iloc[0].geometry.geom_type
-    for _, row in gdf.iterrows():
-        if not is_geometry_match(
-            expected_geometry=first_feature_geometry_type,
-            actual_geometry=row.geometry.geom_type,
-        ):
-            logger.error("Inconsistent geometry types in uploaded vector layer")
+    if not is_geometry_type_consistent(gdf.geom_type):
+        logger.error("Inconsistent geometry types in uploaded vector layer")
 
     # add vector layer to database
     try:
-        crud.vector_layer.create_with_project(
+        features = crud.vector_layer.create_with_project(
             db, file_name=original_file_name, gdf=gdf, project_id=project_id
         )
     except Exception:
@@ -384,6 +407,15 @@ def upload_vector_layer(
         cleanup(job)
         return None
 
+    # queue preview image for vector layer, placeholder is served until it is ready
+    try:
+        if len(features) > 0 and features[0].properties:
+            queue_vector_layer_preview(
+                db, project_id=project_id, layer_id=features[0].properties["layer_id"]
+            )
+    except Exception:
+        logger.exception("Unable to queue preview for vector layer")
+
     # remove uploaded file
     cleanup(job)
 
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from unittest.mock import patch, MagicMock
+from uuid import uuid4
 
 from geojson_pydantic import Feature, FeatureCollection
 from fastapi import status
@@ -10,6 +11,7 @@ from app import crud
 from app.api.deps import get_current_user
 from app.core.config import settings
 from app.schemas.file_permission import FilePermissionUpdate
+from app.schemas.job import JobCreate, State, Status
 from app.tests.utils.data_product import SampleDataProduct
 from app.tests.utils.data_product_metadata import (
     create_zonal_metadata,
@@ -651,6 +653,64 @@ def test_running_tool_on_data_product(
     assert response.status_code == status.HTTP_202_ACCEPTED
 
 
+def test_running_band_math_tool_with_invalid_expression(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    current_user = get_current_user(db, normal_user_access_token)
+    rgb_data_product = SampleDataProduct(
+        db, data_type="ortho", multispectral=True, user=current_user
+    )
+    processing_request = {
+        "bandMath": True,
+        "bandMathExpression": "__import__('os').getcwd()",
+        "chm": False,
+        "exg": False,
+        "exgRed": 3,
+        "exgGreen": 2,
+        "exgBlue": 1,
+        "ndvi": False,
+        "ndviNIR": 4,
+        "ndviRed": 3,
+        "zonal": False,
+        "zonal_layer_id": "",
+    }
+
+    response = client.post(
+        f"{settings.API_V1_STR}/projects/{rgb_data_product.project.id}"
+        f"/flights/{rgb_data_product.flight.id}/data_products/{rgb_data_product.obj.id}/tools",
+        json=processing_request,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_running_point_cloud_tool_with_raster_data_product(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    current_user = get_current_user(db, normal_user_access_token)
+    rgb_data_product = SampleDataProduct(
+        db, data_type="ortho", multispectral=True, user=current_user
+    )
+    processing_request = {
+        "chm": True,
+        "exg": False,
+        "exgRed": 3,
+        "exgGreen": 2,
+        "exgBlue": 1,
+        "ndvi": False,
+        "ndviNIR": 4,
+        "ndviRed": 3,
+        "zonal": False,
+        "zonal_layer_id": "",
+    }
+
+    response = client.post(
+        f"{settings.API_V1_STR}/projects/{rgb_data_product.project.id}"
+        f"/flights/{rgb_data_product.flight.id}/data_products/{rgb_data_product.obj.id}/tools",
+        json=processing_request,
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_get_zonal_statistics(
     client: TestClient, db: Session, normal_user_access_token: str
 ) -> None:
@@ -670,12 +730,62 @@ def test_get_zonal_statistics(
         ),
         project_id=project.id,
     )
-    # mock the celery task initiated by the endpoint
+    # small zone is calculated by the api without the celery task queue
     with patch(
         "app.tasks.toolbox_tasks.calculate_zonal_statistics.apply_async"
+    ) as mock_apply_async:
+        # request zonal statistics for zone and sample data product
+        response = client.post(
+            f"{settings.API_V1_STR}/projects/{project.id}/flights/{data_product.flight.id}"
+            f"/data_products/{data_product.obj.id}/zonal_statistics",
+            json=vector_layer.features[0].model_dump(),
+        )
+        mock_apply_async.assert_not_called()
+        assert response.status_code == status.HTTP_200_OK
+        response_data = response.json()
+        assert Feature(**response_data)
+        response_feature = Feature(**response_data)
+        assert (
+            response_feature.properties["min"]
+            and response_feature.properties["max"]
+            and response_feature.properties["mean"]
+            and response_feature.properties["count"]
+            and response_feature.properties["median"]
+            and response_feature.properties["std"]
+        )
+        # check that original feature collection properties are present
+        properties = ["row", "col"]
+        for key in properties:
+            assert key in response_feature.properties
+
+
+def test_get_zonal_statistics_for_large_zone(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    # create project, add current user as viewer in project, and add data product
+    current_user = get_current_user(db, normal_user_access_token)
+    project = create_project(db)
+    create_project_member(
+        db, role="viewer", member_id=current_user.id, project_id=project.id
+    )
+    data_product = SampleDataProduct(db, data_type="dsm", project=project)
+    zone_feature = get_zonal_feature_collection(single_feature=True)
+    vector_layer = create_vector_layer_with_provided_feature_collection(
+        db,
+        feature_collection=FeatureCollection(
+            **{"type": "FeatureCollection", "features": [zone_feature]}
+        ),
+        project_id=project.id,
+    )
+    # mock the celery task initiated by the endpoint for zones above the size limit
+    with patch(
+        "app.api.api_v1.endpoints.data_products.MAX_INLINE_ZONAL_PIXELS", 0
+    ), patch(
+        "app.tasks.toolbox_tasks.calculate_zonal_statistics.apply_async"
     ) as mock_apply_async:
         mock_task = MagicMock()
         mock_task.id = "mock_task_id"
+        mock_task.ready.return_value = True
         mock_task.get.return_value = [
             {
                 "min": 187.37115478515625,
@@ -701,21 +811,113 @@ def test_get_zonal_statistics(
             )
         )
         assert response.status_code == status.HTTP_200_OK
-        response_data = response.json()
-        assert Feature(**response_data)
-        response_feature = Feature(**response_data)
-        assert (
-            response_feature.properties["min"]
-            and response_feature.properties["max"]
-            and response_feature.properties["mean"]
-            and response_feature.properties["count"]
-            and response_feature.properties["median"]
-            and response_feature.properties["std"]
+        response_feature = Feature(**response.json())
+        assert response_feature.properties["count"] == 576
+
+
+def test_zonal_statistics_job(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    # create project, add current user as viewer in project, and add data product
+    current_user = get_current_user(db, normal_user_access_token)
+    project = create_project(db)
+    create_project_member(
+        db, role="viewer", member_id=current_user.id, project_id=project.id
+    )
+    data_product = SampleDataProduct(db, data_type="dsm", project=project)
+    zone_feature = get_zonal_feature_collection(single_feature=True)
+    url = (
+        f"{settings.API_V1_STR}/projects/{project.id}/flights/{data_product.flight.id}"
+        f"/data_products/{data_product.obj.id}/zonal_statistics/jobs"
+    )
+    # mock the celery task initiated by the endpoint
+    with patch(
+        "app.tasks.toolbox_tasks.calculate_zonal_statistics.apply_async"
+    ) as mock_apply_async:
+        mock_apply_async.side_effect = lambda *args, **kwargs: MagicMock(
+            id=kwargs["task_id"], state="PENDING"
         )
-        # check that original feature collection properties are present
-        properties = ["row", "col"]
-        for key in properties:
-            assert key in response_feature.properties
+        response = client.post(url, json=zone_feature.model_dump())
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        task_id = response.json()["task_id"]
+        assert response.json() == {
+            "task_id": task_id,
+            "status": "PENDING",
+            "stats": None,
+        }
+    # task is recorded as a job for the data product and user
+    job = crud.job.get_by_task_id(
+        db,
+        task_id=task_id,
+        data_product_id=data_product.obj.id,
+        user_id=current_user.id,
+    )
+    assert job
+    assert job.name == "zonal"
+    # mock the celery task result requested by the job endpoint
+    stats = {
+        "min": 187.37115478515625,
+        "max": 187.4439239501953,
+        "mean": 187.40421549479166,
+        "count": 576,
+        "std": 0.013546454430626641,
+        "median": 187.4020233154297,
+    }
+    with patch(
+        "app.tasks.toolbox_tasks.calculate_zonal_statistics.AsyncResult"
+    ) as mock_async_result:
+        mock_result = MagicMock()
+        mock_result.id = task_id
+        mock_result.ready.return_value = True
+        mock_result.successful.return_value = True
+        mock_result.state = "SUCCESS"
+        mock_result.result = [stats]
+        mock_async_result.return_value = mock_result
+        response = client.get(f"{url}/{task_id}")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == {
+            "task_id": task_id,
+            "status": "SUCCESS",
+            "stats": stats,
+        }
+
+
+def test_zonal_statistics_job_queued_by_other_user(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    # create project, add current user as viewer in project, and add data product
+    current_user = get_current_user(db, normal_user_access_token)
+    project = create_project(db)
+    create_project_member(
+        db, role="viewer", member_id=current_user.id, project_id=project.id
+    )
+    data_product = SampleDataProduct(db, data_type="dsm", project=project)
+    url = (
+        f"{settings.API_V1_STR}/projects/{project.id}/flights/{data_product.flight.id}"
+        f"/data_products/{data_product.obj.id}/zonal_statistics/jobs"
+    )
+    # job for a task queued by another user
+    task_id = str(uuid4())
+    crud.job.create_job(
+        db,
+        JobCreate(
+            extra={"task_id": task_id, "user_id": str(create_user(db).id)},
+            name="zonal",
+            state=State.PENDING,
+            status=Status.WAITING,
+            start_time=datetime.now(tz=timezone.utc),
+            data_product_id=data_product.obj.id,
+        ),
+    )
+    with patch(
+        "app.tasks.toolbox_tasks.calculate_zonal_statistics.AsyncResult"
+    ) as mock_async_result:
+        response = client.get(f"{url}/{task_id}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        # task ids that were never queued are not found either
+        response = client.get(f"{url}/{uuid4()}")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        mock_async_result.assert_not_called()
 
 
 def test_get_zonal_statistics_by_layer_id(
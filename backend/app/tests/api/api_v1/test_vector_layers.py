@@ -1,13 +1,16 @@
 import os
 
+import fiona
 from geojson_pydantic import FeatureCollection
 from fastapi import status
 from fastapi.testclient import TestClient
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.api.deps import get_current_user
 from app.core.config import settings
+from app.models.vector_layer_preview import VectorLayerPreview
 from app.schemas.vector_layer import VectorLayerFeatureCollection
 from app.tests.utils.project import create_project
 from app.tests.utils.project_member import create_project_member
@@ -169,6 +172,31 @@ def test_read_vector_layers_with_project_owner_role(
         assert "signed_url" in layer
         assert "preview_url" in layer
         assert os.path.exists(layer["preview_url"].split(settings.API_DOMAIN)[1])
+        assert layer["preview_status"] == "SUCCESS"
+
+
+def test_read_vector_layers_queues_missing_previews(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    current_user = get_current_user(db, normal_user_access_token)
+    project = create_project(db, owner_id=current_user.id)
+    feature_collection = create_feature_collection(db, "point", project.id)
+    layer_id = feature_collection.features[0].properties["layer_id"]
+    # layer uploaded before preview state was tracked and without preview image
+    with db as session:
+        session.execute(
+            delete(VectorLayerPreview).where(VectorLayerPreview.layer_id == layer_id)
+        )
+        session.commit()
+    preview_img = feature_collection.metadata.preview_url.split(settings.API_DOMAIN)[1]
+    os.remove(preview_img)
+
+    response = client.get(f"{settings.API_V1_STR}/projects/{project.id}/vector_layers")
+    assert response.status_code == status.HTTP_200_OK
+    response_data = response.json()
+    assert len(response_data) == 1
+    assert response_data[0]["preview_status"] == "SUCCESS"
+    assert os.path.exists(preview_img)
 
 
 def test_read_vector_layers_with_project_manager_role(
@@ -343,3 +371,47 @@ def test_remove_vector_layer_without_project_role(
         f"{settings.API_V1_STR}/projects/{project.id}/vector_layers/{layer_id}"
     )
     assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+def test_download_vector_layer_as_geojson(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    current_user = get_current_user(db, normal_user_access_token)
+    project = create_project(db, owner_id=current_user.id)
+    feature_collection = create_feature_collection(db, "polygon", project.id)
+    layer_id = feature_collection.features[0].properties["layer_id"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/projects/{project.id}/vector_layers/{layer_id}"
+        "/download"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/geo+json"
+    assert "test_file.geojson" in response.headers["content-disposition"]
+    downloaded_feature_collection = FeatureCollection(**response.json())
+    assert len(downloaded_feature_collection.features) == len(
+        feature_collection.features
+    )
+    assert (
+        downloaded_feature_collection.features[0].properties["feature_id"]
+        == feature_collection.features[0].properties["feature_id"]
+    )
+
+
+def test_download_vector_layer_as_geopackage(
+    client: TestClient, db: Session, normal_user_access_token: str
+) -> None:
+    current_user = get_current_user(db, normal_user_access_token)
+    project = create_project(db, owner_id=current_user.id)
+    feature_collection = create_feature_collection(db, "polygon", project.id)
+    layer_id = feature_collection.features[0].properties["layer_id"]
+
+    response = client.get(
+        f"{settings.API_V1_STR}/projects/{project.id}/vector_layers/{layer_id}"
+        "/download?format=gpkg"
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/geopackage+sqlite3"
+    assert "test_file.gpkg" in response.headers["content-disposition"]
+    with fiona.BytesCollection(response.content) as src:
+        assert len(src) == len(feature_collection.features)
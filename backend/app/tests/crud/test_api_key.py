@@ -1,8 +1,11 @@
+from datetime import datetime, timedelta, timezone
+
 from sqlalchemy.orm import Session
 
 from app import crud
 from app.schemas.api_key import APIKeyUpdate
 from app.tests.utils.user import create_user
+from app.utils.api_key_usage import APIKeyUsage
 
 
 def test_create_api_key(db: Session) -> None:
@@ -56,6 +59,48 @@ def test_update_api_key(db: Session) -> None:
     assert api_key_updated.total_requests == 1
 
 
+def test_increment_api_key_usage(db: Session) -> None:
+    user = create_user(db)
+    api_key = crud.api_key.create_with_user(db, user_id=user.id)
+    other_api_key = crud.api_key.create_with_user(db, user_id=create_user(db).id)
+    last_used = datetime.now(timezone.utc)
+    crud.api_key.increment_usage(
+        db,
+        counts={api_key.id: 5, other_api_key.id: 2},
+        last_used={api_key.id: last_used, other_api_key.id: last_used},
+    )
+    # earlier last used date does not replace later date
+    crud.api_key.increment_usage(
+        db,
+        counts={api_key.id: 3},
+        last_used={api_key.id: last_used - timedelta(minutes=1)},
+    )
+    api_key_in_db = crud.api_key.get(db, id=api_key.id)
+    other_api_key_in_db = crud.api_key.get(db, id=other_api_key.id)
+    assert api_key_in_db and other_api_key_in_db
+    assert api_key_in_db.total_requests == 8
+    assert api_key_in_db.last_used_at == last_used
+    assert other_api_key_in_db.total_requests == 2
+
+
+def test_flush_aggregated_api_key_usage(db: Session) -> None:
+    user = create_user(db)
+    api_key = crud.api_key.create_with_user(db, user_id=user.id)
+    api_key_usage = APIKeyUsage(flush_interval=60)
+    for _ in range(3):
+        assert api_key_usage.record(api_key.id) is False
+    # usage is not saved until flushed
+    api_key_in_db = crud.api_key.get(db, id=api_key.id)
+    assert api_key_in_db and api_key_in_db.total_requests == 0
+    assert api_key_usage.flush(db) == 1
+    api_key_in_db = crud.api_key.get(db, id=api_key.id)
+    assert api_key_in_db
+    assert api_key_in_db.total_requests == 3
+    assert api_key_in_db.last_used_at
+    # counts are reset after flush
+    assert api_key_usage.flush(db) == 0
+
+
 def test_deactivate_api_key(db: Session) -> None:
     user = create_user(db)
     api_key = crud.api_key.create_with_user(db, user_id=user.id)
@@ -1,5 +1,6 @@
 import os
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 from sqlalchemy.orm import Session
 
@@ -11,6 +12,7 @@ from app.tests.utils.flight import create_flight
 from app.tests.utils.data_product import SampleDataProduct, test_stac_props_dsm
 from app.tests.utils.job import create_job
 from app.tests.utils.user import create_user
+from app.tests.utils.utils import count_queries
 
 
 def test_create_data_product(db: Session) -> None:
@@ -127,6 +129,32 @@ def test_read_data_products_with_multiple_jobs_for_single_data_product(
     assert len(data_products) == 2
 
 
+def test_read_data_products_query_count_independent_of_data_products(
+    db: Session,
+) -> None:
+    user = create_user(db)
+    flight = create_flight(db)
+
+    def get_query_count() -> int:
+        with count_queries(db) as statements:
+            data_products = crud.data_product.get_multi_by_flight(
+                db,
+                flight_id=flight.id,
+                upload_dir=settings.TEST_STATIC_DIR,
+                user_id=user.id,
+            )
+            for data_product in data_products:
+                assert data_product.user_style
+        return len(statements)
+
+    SampleDataProduct(db, flight=flight, user=user)
+    query_count = get_query_count()
+    # add more data products to flight
+    for _ in range(5):
+        SampleDataProduct(db, flight=flight, user=user)
+    assert get_query_count() == query_count
+
+
 def test_update_data_product_eo_bands(db: Session) -> None:
     # New band description
     bands_in = [{"name": "b1", "description": "Blue"}]
@@ -145,6 +173,28 @@ def test_update_data_product_eo_bands(db: Session) -> None:
     assert updated_data_product.stac_properties["eo"] == bands_in
 
 
+def test_update_data_product_raster_extent(db: Session) -> None:
+    data_product = SampleDataProduct(db)
+    updated_data_product = crud.data_product.update_raster_extent(
+        db, data_product_id=data_product.obj.id
+    )
+    assert updated_data_product
+    assert updated_data_product.crs == "EPSG:32616"
+    assert len(updated_data_product.bbox) == 4
+    assert len(updated_data_product.resolution) == 2
+    # stored bounding box is returned without opening the raster
+    with patch("app.crud.crud_data_product.rasterio.open") as mock_open:
+        stored_data_product = crud.data_product.get_single_by_id(
+            db,
+            data_product_id=data_product.obj.id,
+            upload_dir=settings.TEST_STATIC_DIR,
+            user_id=data_product.user.id,
+        )
+        mock_open.assert_not_called()
+    assert stored_data_product
+    assert stored_data_product.bbox == updated_data_product.bbox
+
+
 def test_update_data_product(db: Session) -> None:
     old_data_type = "dsm"
     new_data_type = "dtm"
@@ -88,6 +88,48 @@ def test_create_data_product_metadata_for_multiple_zones(db: Session) -> None:
     assert len(all_metadata) == 3
 
 
+def test_upsert_multi_zonal_metadata(db: Session) -> None:
+    data_product = SampleDataProduct(db, data_type="dsm")
+    bbox_filepath = os.path.join(
+        os.sep, "app", "app", "tests", "data", "test_bbox_multi.geojson"
+    )
+    with open(bbox_filepath) as bbox_file:
+        bbox_dict = json.loads(bbox_file.read())
+
+    bbox_feature_collection: FeatureCollection = FeatureCollection(**bbox_dict)
+    project = create_project(db)
+    bbox_vector_layer = create_vector_layer_with_provided_feature_collection(
+        db, feature_collection=bbox_feature_collection, project_id=project.id
+    )
+    stats = get_zonal_statistics(data_product.obj.filepath, bbox_feature_collection)
+    metadata_in = [
+        DataProductMetadataCreate(
+            category="zonal",
+            properties={"stats": stats[index]},
+            vector_layer_feature_id=feature.properties["feature_id"],
+        )
+        for index, feature in enumerate(bbox_vector_layer.features)
+    ]
+    # create metadata for every zone
+    count = crud.data_product_metadata.upsert_multi_with_data_product(
+        db, objs_in=metadata_in, data_product_id=data_product.obj.id
+    )
+    assert count == 3
+    # update metadata for every zone
+    for obj_in in metadata_in:
+        obj_in.properties = {"stats": {**obj_in.properties["stats"], "max": 9999}}
+    count = crud.data_product_metadata.upsert_multi_with_data_product(
+        db, objs_in=metadata_in, data_product_id=data_product.obj.id
+    )
+    assert count == 3
+    metadata = crud.data_product_metadata.get_by_data_product(
+        db, category="zonal", data_product_id=data_product.obj.id
+    )
+    assert len(metadata) == 3
+    for metadata_obj in metadata:
+        assert metadata_obj.properties["stats"]["max"] == 9999
+
+
 def test_create_duplicate_zonal_metadata(db: Session) -> None:
     project = create_project(db)
     metadata = create_zonal_metadata(db, project_id=project.id, single_feature=True)[0][
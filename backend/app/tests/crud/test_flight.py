@@ -18,6 +18,7 @@ from app.tests.utils.flight import create_flight
 from app.tests.utils.job import create_job
 from app.tests.utils.project import create_project
 from app.tests.utils.user import create_user
+from app.tests.utils.utils import count_queries
 from app.tests.utils.vector_layers import get_geojson_feature_collection
 
 
@@ -173,6 +174,37 @@ def test_get_flights_excluding_processing_or_failed_data_products(db: Session) -
     assert flights[0].data_products[0].data_type == "dsm"
 
 
+def test_get_flights_query_count_independent_of_data_products(db: Session) -> None:
+    user = create_user(db)
+    project = create_project(db, owner_id=user.id)
+    upload_dir = settings.TEST_STATIC_DIR
+
+    def get_query_count() -> int:
+        with count_queries(db) as statements:
+            flights = crud.flight.get_multi_by_project(
+                db, project_id=project.id, upload_dir=upload_dir, user_id=user.id
+            )
+            # access attributes returned by api
+            for flight in flights:
+                for data_product in flight.data_products:
+                    assert data_product.file_permission
+                    assert len(data_product.jobs) > 0
+                    assert data_product.user_style
+        return len(statements)
+
+    flight = create_flight(db, project_id=project.id)
+    SampleDataProduct(db, project=project, flight=flight, user=user)
+    query_count = get_query_count()
+    # add more flights and data products
+    for _ in range(3):
+        flight = create_flight(db, project_id=project.id)
+        SampleDataProduct(db, project=project, flight=flight, user=user)
+        SampleDataProduct(
+            db, data_type="dsm", project=project, flight=flight, user=user
+        )
+    assert get_query_count() == query_count
+
+
 def test_update_flight(db: Session) -> None:
     flight = create_flight(db, altitude=60, sensor=SENSORS[0])
     flight_in_update = FlightUpdate(altitude=100, sensor=SENSORS[1])
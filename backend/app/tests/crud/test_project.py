@@ -1,8 +1,10 @@
+import os
 from datetime import datetime, timezone
 
 from sqlalchemy.orm import Session
 
 from app import crud, schemas
+from app.crud.crud_admin import get_static_directory_size
 from app.schemas.project import ProjectUpdate
 from app.tests.utils.data_product import SampleDataProduct
 from app.tests.utils.flight import create_flight
@@ -311,3 +313,40 @@ def test_get_projects_ignores_deactivated_projects(db: Session) -> None:
     assert len(projects) == 2
     for project in projects:
         assert project.id in [project.id, project2.id]
+
+
+def test_add_disk_usage(db: Session) -> None:
+    project = create_project(db)
+    crud.project.add_disk_usage(db, project_id=project.id, delta=1000)
+    crud.project.add_disk_usage(db, project_id=project.id, delta=-400)
+    project2 = crud.project.get(db, id=project.id)
+    assert project2 and project2.disk_usage == 600
+
+
+def test_add_disk_usage_to_unmeasured_project(db: Session) -> None:
+    project = create_project(db)
+    # new projects are counted incrementally from the start
+    assert project.disk_usage == 0
+    crud.project.update(db, db_obj=project, obj_in={"disk_usage": None})
+    crud.project.add_disk_usage(db, project_id=project.id, delta=1000)
+    project2 = crud.project.get(db, id=project.id)
+    # project is still reconciled against the file system
+    assert project2 and project2.disk_usage is None
+
+
+def test_update_data_product_disk_usage(db: Session) -> None:
+    project = create_project(db)
+    data_product = SampleDataProduct(db, project=project)
+    data_product_dir = os.path.dirname(data_product.obj.filepath)
+    disk_usage = crud.data_product.update_disk_usage(
+        db, data_product_id=data_product.obj.id
+    )
+    assert disk_usage == get_static_directory_size(data_product_dir)
+    data_product2 = crud.data_product.get(db, id=data_product.obj.id)
+    project2 = crud.project.get(db, id=project.id)
+    assert data_product2 and data_product2.disk_usage == disk_usage
+    assert project2 and project2.disk_usage == disk_usage
+    # measuring an unchanged data product does not change project disk usage
+    crud.data_product.update_disk_usage(db, data_product_id=data_product.obj.id)
+    project3 = crud.project.get(db, id=project.id)
+    assert project3 and project3.disk_usage == disk_usage
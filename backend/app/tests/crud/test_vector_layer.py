@@ -1,4 +1,5 @@
 import os
+from unittest.mock import patch
 from typing import Any, Dict
 
 import geopandas as gpd
@@ -7,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from app import crud, schemas
 from app.core.config import settings
+from app.schemas.job import Status
 from app.tests.utils.data_product import SampleDataProduct
 from app.tests.utils.data_product_metadata import (
     create_zonal_metadata,
@@ -36,6 +38,33 @@ def test_create_point_vector_layer(db: Session) -> None:
     assert point_feature[0].properties.get("layer_name") == vector_layer["layer_name"]
 
 
+def test_create_vector_layer_with_many_features(db: Session) -> None:
+    project = create_project(db)
+    gdf = gpd.GeoDataFrame(
+        {
+            "plot": range(2500),
+            "note": ['a,"b"\n' if i % 2 else None for i in range(2500)],
+        },
+        geometry=gpd.points_from_xy(
+            [-86.9 + i * 1e-5 for i in range(2500)], [41.4] * 2500, [10.0] * 2500
+        ),
+        crs="EPSG:4326",
+    )
+    with patch("app.crud.crud_vector_layer.VECTOR_LAYER_COPY_BATCH_SIZE", 1000):
+        features = crud.vector_layer.create_with_project(
+            db, file_name="plots", gdf=gdf, project_id=project.id
+        )
+    assert len(features) == 2500
+    properties_by_plot = {
+        feature.properties["properties"]["plot"]: feature.properties["properties"]
+        for feature in features
+    }
+    assert properties_by_plot[1]["note"] == 'a,"b"\n'
+    assert properties_by_plot[2]["note"] is None
+    # z coordinate is dropped
+    assert len(features[0].geometry.coordinates) == 2
+
+
 def test_create_linestring_vector_layer(db: Session) -> None:
     project = create_project(db)
     vector_layer: VectorLayerDict = get_geojson_feature_collection("LineString")
@@ -208,6 +237,20 @@ def test_read_vector_layer_by_id_with_metadata(db: Session) -> None:
         assert expected_zonal_stat in vector_layers_with_zonal_metadata[0].properties
 
 
+def test_set_vector_layer_preview_status(db: Session) -> None:
+    project = create_project(db)
+    feature_collection = create_feature_collection(db, "point", project_id=project.id)
+    assert feature_collection.features[0].properties
+    layer_id = feature_collection.features[0].properties["layer_id"]
+    preview_statuses = crud.vector_layer.get_preview_statuses(db, project_id=project.id)
+    assert preview_statuses == {layer_id: Status.SUCCESS}
+    crud.vector_layer.set_preview_status(
+        db, project_id=project.id, layer_id=layer_id, status=Status.FAILED
+    )
+    preview_statuses = crud.vector_layer.get_preview_statuses(db, project_id=project.id)
+    assert preview_statuses == {layer_id: Status.FAILED}
+
+
 def test_remove_vector_layer(db: Session) -> None:
     project = create_project(db)
     # point feature collection with three points (features)
@@ -0,0 +1,119 @@
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import pytest
+import rasterio
+
+from app.utils.toolbox.band_math import (
+    BandMathExpression,
+    create_index_tool,
+    run,
+    validate_params,
+)
+
+
+multispectral_dataset = Path("/app/app/tests/data/test_multispectral.tif")
+ndvi_validation_dataset = Path("/app/app/tests/data/ndvi_validation.tif")
+exg_validation_dataset = Path("/app/app/tests/data/exg_validation.tif")
+
+
+def compare_results(tool_results: str, validation_dataset: Path):
+    """Performs element-wise comparision between test dataset and validation dataset.
+
+    Args:
+        tool_results (str): Path to tool output (test) dataset.
+        validation_dataset (Path): Path to validation dataset.
+    """
+    with rasterio.open(validation_dataset) as validation_src:
+        with rasterio.open(tool_results) as test_src:
+            assert validation_src.count == test_src.count
+
+            validation_array = validation_src.read(1)
+            test_array = test_src.read(1)
+
+            assert np.isclose(validation_array, test_array, atol=0.00001).all()
+
+
+def run_expression(params: dict, validation_dataset: Path, tool=run):
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        in_raster = Path(tmpdir / multispectral_dataset.name)
+        out_raster = Path(tmpdir / "band_math.tif")
+
+        shutil.copyfile(multispectral_dataset, in_raster)
+
+        tool(in_raster, out_raster, params)
+
+        compare_results(out_raster, validation_dataset)
+
+
+def test_ndvi_from_band_math_expression():
+    """Test NDVI expression against NDVI validation dataset."""
+    run_expression({"expression": "(b4 - b3) / (b4 + b3)"}, ndvi_validation_dataset)
+
+
+def test_exg_from_band_math_expression_with_named_bands():
+    """Test ExG expression with named band variables against ExG validation
+    dataset."""
+    params = {
+        "expression": "(2 * green - red - blue) / (red + green + blue)",
+        "red_band_idx": 3,
+        "green_band_idx": 2,
+        "blue_band_idx": 1,
+    }
+    run_expression(params, exg_validation_dataset)
+
+
+def test_predefined_index_tool():
+    """Test GNDVI index tool with NIR and red bands matches NDVI validation."""
+    params = {"nir_band_idx": 4, "green_band_idx": 3}
+    run_expression(params, ndvi_validation_dataset, create_index_tool("gndvi"))
+
+
+def test_compiled_expression_reuses_temporaries():
+    """Test compiled expression evaluates with a single temporary array."""
+    expression = BandMathExpression("(b4 - b3) / (b4 + b3 - b1) * 2", {})
+    img = np.random.default_rng(0).random((3, 4, 5), dtype=np.float32) + 1
+    out = np.empty((4, 5), dtype=np.float32)
+
+    expression(img, out)
+
+    b1, b3, b4 = img
+    assert expression.band_indexes == [1, 3, 4]
+    assert expression.tmp_count == 1
+    assert np.allclose(out, (b4 - b3) / (b4 + b3 - b1) * 2)
+
+
+def test_invalid_expressions():
+    """Test unsupported syntax and unknown band variables are rejected."""
+    invalid_expressions = [
+        "__import__('os')",
+        "b1.real",
+        "b1 if b2 else b3",
+        "b0",
+        "nir + b1",
+        "b1 < b2",
+    ]
+    for expression in invalid_expressions:
+        with pytest.raises(ValueError):
+            BandMathExpression(expression, {})
+
+
+def test_validate_params():
+    """Test expression must be a string and band indexes must be integers."""
+    validate_params(
+        {
+            "expression": "(nir - red) / (nir + red)",
+            "red_band_idx": 3,
+            "nir_band_idx": 4,
+        }
+    )
+    with pytest.raises(ValueError):
+        validate_params({"nir_band_idx": 4})
+    with pytest.raises(TypeError):
+        validate_params({"expression": 1})
+    for band_idx in ["4", 4.0, True]:
+        with pytest.raises(TypeError):
+            validate_params({"expression": "nir", "nir_band_idx": band_idx})
@@ -0,0 +1,84 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+import numpy as np
+import rasterio
+
+from app.utils.toolbox.block_processor import (
+    TILE_SIZE,
+    BandStatistics,
+    get_overview_factors,
+    run_block_windows,
+)
+
+
+multispectral_dataset = Path("/app/app/tests/data/test_multispectral.tif")
+
+
+def copy_band(img: np.ndarray, out: np.ndarray) -> None:
+    out[:] = img[0]
+
+
+def test_windows_written_in_order_with_multiple_threads():
+    """Test output from thread pool matches the input band for every window."""
+    with TemporaryDirectory() as tmpdir:
+        single_thread_out = str(Path(tmpdir) / "single.tif")
+        multi_thread_out = str(Path(tmpdir) / "multi.tif")
+
+        run_block_windows(
+            str(multispectral_dataset), single_thread_out, [2], copy_band, 1
+        )
+        run_block_windows(
+            str(multispectral_dataset), multi_thread_out, [2], copy_band, 4
+        )
+
+        with rasterio.open(multispectral_dataset) as src:
+            expected = src.read(2).astype(np.float32)
+        with rasterio.open(single_thread_out) as single_src:
+            assert single_src.count == 1
+            assert single_src.dtypes[0] == "float32"
+            assert np.array_equal(single_src.read(1), expected)
+        with rasterio.open(multi_thread_out) as multi_src:
+            assert np.array_equal(multi_src.read(1), expected)
+
+
+def test_output_is_tiled_with_band_stats():
+    """Test output is tiled and stores exact band stats in its metadata."""
+    with TemporaryDirectory() as tmpdir:
+        out_raster = str(Path(tmpdir) / "out.tif")
+
+        run_block_windows(str(multispectral_dataset), out_raster, [2], copy_band)
+
+        with rasterio.open(multispectral_dataset) as src:
+            expected = src.read(2).astype(np.float64)
+        with rasterio.open(out_raster) as out_src:
+            assert out_src.profile["tiled"]
+            assert out_src.block_shapes[0] == (TILE_SIZE, TILE_SIZE)
+            tags = out_src.tags(1)
+        assert np.isclose(float(tags["STATISTICS_MINIMUM"]), expected.min())
+        assert np.isclose(float(tags["STATISTICS_MAXIMUM"]), expected.max())
+        assert np.isclose(float(tags["STATISTICS_MEAN"]), expected.mean())
+        assert np.isclose(float(tags["STATISTICS_STDDEV"]), expected.std())
+
+
+def test_band_statistics_merged_across_windows():
+    """Test stats merged window by window match stats for the whole array and
+    skip nodata and non-finite values."""
+    values = np.random.default_rng(0).random((100, 100), dtype=np.float32)
+    values[0, :10] = -9999
+    values[1, :10] = np.nan
+    stats = BandStatistics(nodata=-9999)
+    for rows in np.array_split(values, 7):
+        stats.update(rows)
+
+    valid = values[np.isfinite(values) & (values != -9999)].astype(np.float64)
+    tags = stats.to_tags()
+    assert np.isclose(float(tags["STATISTICS_MEAN"]), valid.mean())
+    assert np.isclose(float(tags["STATISTICS_STDDEV"]), valid.std())
+    assert float(tags["STATISTICS_VALID_PERCENT"]) == 99.8
+
+
+def test_overview_factors():
+    """Test overviews are added until the smallest level fits in a single tile."""
+    assert get_overview_factors(TILE_SIZE, TILE_SIZE) == []
+    assert get_overview_factors(TILE_SIZE * 4, TILE_SIZE + 1) == [2, 4]
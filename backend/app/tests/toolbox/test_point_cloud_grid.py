@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from rasterio.windows import Window
+
+from app.utils.toolbox.point_cloud_grid import (
+    CHUNK_SIZE,
+    NODATA,
+    get_chunk_windows,
+    get_grid,
+    grid_points,
+    validate_params,
+)
+
+
+# four points in the upper left cell and one point in the lower right cell of a
+# 2x2 grid with 1 unit cells
+x = np.array([0.2, 0.4, 0.6, 0.8, 1.5])
+y = np.array([1.8, 1.6, 1.4, 1.2, 0.5])
+z = np.array([10.0, 12.0, 30.0, 100.0, 5.0])
+classification = np.array([2, 2, 5, 7, 1], dtype=np.uint8)
+grid = get_grid(np.array([0, 0, 0]), np.array([2, 2, 100]), resolution=1.0)
+
+
+def grid_product(product: str, window: Window = Window(0, 0, 2, 2), **kwargs):
+    out = np.empty((window.height, window.width), dtype=np.float32)
+    grid_points(x, y, z, classification, grid, window, product, out, **kwargs)
+    return out
+
+
+def test_grid_covers_point_cloud_extent():
+    assert get_grid(np.array([10, 20, 0]), np.array([15.5, 22, 1]), 1.0) == (
+        10.0,
+        22.0,
+        1.0,
+        6,
+        2,
+    )
+
+
+def test_chunk_windows_cover_grid():
+    windows = get_chunk_windows(CHUNK_SIZE + 10, 5)
+    assert windows == [Window(0, 0, CHUNK_SIZE, 5), Window(CHUNK_SIZE, 0, 10, 5)]
+
+
+def test_dsm_uses_highest_point_and_skips_noise():
+    dsm = grid_product("dsm")
+    # highest point (100) in upper left cell is noise
+    assert dsm[0, 0] == 30
+    assert dsm[1, 1] == 5
+    assert dsm[0, 1] == NODATA
+
+
+def test_dtm_uses_lowest_ground_point():
+    dtm = grid_product("dtm")
+    assert dtm[0, 0] == 10
+    # lower right cell has no ground points
+    assert dtm[1, 1] == NODATA
+    # all points are used when point cloud has no ground classification
+    assert grid_product("dtm", ground_only=False)[1, 1] == 5
+
+
+def test_chm_is_height_above_ground():
+    chm = grid_product("chm")
+    assert chm[0, 0] == 20
+    assert chm[1, 1] == NODATA
+
+
+def test_density_counts_points_per_square_unit():
+    density = grid_product("density")
+    assert density.tolist() == [[3, 0], [0, 1]]
+
+
+def test_grid_points_in_window():
+    # window with lower right cell of grid ignores points in other cells
+    dsm = grid_product("dsm", window=Window(1, 1, 1, 1))
+    assert dsm.tolist() == [[5]]
+
+
+def test_validate_params():
+    validate_params({"product": "dsm", "resolution": 0.5})
+    validate_params({"product": "chm"})
+    with pytest.raises(ValueError):
+        validate_params({"product": "ndvi"})
+    with pytest.raises(ValueError):
+        validate_params({"product": "dtm", "resolution": 0})
+    with pytest.raises(TypeError):
+        validate_params({"product": "dtm", "resolution": "1"})
@@ -0,0 +1,129 @@
+import json
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import rasterio
+from rasterstats import zonal_stats
+from shapely.geometry import box
+
+from app.utils.toolbox.zonal_statistics import (
+    cluster_zone_windows,
+    get_non_overlapping_layers,
+    get_zonal_statistics,
+    get_zone_windows,
+    summarize_labels,
+)
+
+
+dsm_dataset = Path("/app/app/tests/data/test.tif")
+multispectral_dataset = Path("/app/app/tests/data/test_multispectral.tif")
+zones_dataset = Path("/app/app/tests/data/zones_inside_test_tif.geojson")
+zone_outside_dataset = Path("/app/app/tests/data/zone_outside_raster.geojson")
+
+
+def read_zones(zones_path: Path, src: rasterio.DatasetReader) -> gpd.GeoDataFrame:
+    with open(zones_path) as zones_file:
+        features = json.load(zones_file)["features"]
+    zones = gpd.GeoDataFrame.from_features(features, crs="EPSG:4326")
+    return zones.to_crs(src.crs)
+
+
+def test_zonal_statistics_match_rasterstats():
+    """Test zonal stats for band 1 match rasterstats for the same zones."""
+    with rasterio.open(dsm_dataset) as src:
+        zones = read_zones(zones_dataset, src)
+        results = get_zonal_statistics(src, zones)
+        expected = zonal_stats(
+            zones,
+            src.read(1),
+            affine=src.transform,
+            nodata=src.nodata,
+            stats="count min max mean median std",
+        )
+
+    assert len(results) == len(expected) == 20
+    for band_stats, expected_stats in zip(results, expected):
+        assert len(band_stats) == 1
+        assert band_stats[0]["count"] == expected_stats["count"]
+        for key in ["min", "max", "mean", "median", "std"]:
+            assert np.isclose(band_stats[0][key], expected_stats[key])
+
+
+def test_zonal_statistics_for_multiple_bands_and_windows():
+    """Test stats for every band are the same whether zones are read in one window
+    or many small windows."""
+    with rasterio.open(multispectral_dataset) as src:
+        # 4 x 4 grid of plots inside the raster
+        left, bottom, right, top = src.bounds
+        size = (right - left) / 10
+        zones = gpd.GeoDataFrame(
+            geometry=[
+                box(x, y, x + size, y + size)
+                for x in np.linspace(left + size, right - 2 * size, 4)
+                for y in np.linspace(bottom + size, top - 2 * size, 4)
+            ],
+            crs=src.crs,
+        )
+        zone_windows = get_zone_windows(src, zones)
+        max_zone_pixels = int(
+            ((zone_windows[:, 2:] - zone_windows[:, :2]).prod(axis=1)).max()
+        )
+        assert len(cluster_zone_windows(zone_windows)) == 1
+        assert len(cluster_zone_windows(zone_windows, max_zone_pixels)) > 1
+
+        results = get_zonal_statistics(src, zones, [1, 3, 5])
+        windowed_results = get_zonal_statistics(src, zones, [1, 3, 5], max_zone_pixels)
+
+    assert results == windowed_results
+    assert all(len(band_stats) == 3 for band_stats in results)
+    assert results[0][0] != results[0][1]
+
+
+def test_zonal_statistics_for_zone_outside_raster():
+    """Test zone outside of the raster has no valid pixels."""
+    with rasterio.open(dsm_dataset) as src:
+        zones = read_zones(zone_outside_dataset, src)
+        results = get_zonal_statistics(src, zones)
+
+    assert results[0][0]["count"] == 0
+    assert results[0][0]["mean"] is None
+
+
+def test_label_engine_matches_mask_engine():
+    """Test label raster engine returns the same stats as the mask engine,
+    including for overlapping zones."""
+    with rasterio.open(dsm_dataset) as src:
+        zones = read_zones(zones_dataset, src)
+        # add a zone overlapping the first two zones
+        overlapping = zones.geometry.iloc[0].union(zones.geometry.iloc[1]).envelope
+        zones = gpd.GeoDataFrame(geometry=[*zones.geometry, overlapping], crs=zones.crs)
+        assert get_non_overlapping_layers(zones.geometry.to_numpy()).max() == 1
+
+        mask_results = get_zonal_statistics(src, zones, engine="mask")
+        label_results = get_zonal_statistics(src, zones, engine="label")
+
+    assert len(label_results) == 21
+    for mask_stats, label_stats in zip(mask_results, label_results):
+        assert mask_stats[0]["count"] == label_stats[0]["count"]
+        for key in ["min", "max", "mean", "median", "std"]:
+            assert np.isclose(mask_stats[0][key], label_stats[0][key])
+
+
+def test_label_engine_for_zone_without_valid_pixels():
+    """Test label engine returns empty stats for a zone without valid pixels."""
+    values = np.ma.masked_equal(np.array([[1, 2], [0, 0]], dtype=np.float32), 0)
+    labels = np.array([[1, 1], [2, 2]], dtype=np.int32)
+
+    stats = summarize_labels(labels, values, 3)
+
+    assert stats[0] == {
+        "min": 1,
+        "max": 2,
+        "mean": 1.5,
+        "count": 2,
+        "std": 0.5,
+        "median": 1.5,
+    }
+    assert stats[1]["count"] == stats[2]["count"] == 0
+    assert stats[1]["median"] is None
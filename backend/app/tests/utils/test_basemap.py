@@ -0,0 +1,97 @@
+import io
+from pathlib import Path
+
+from PIL import Image
+
+from app.utils.basemap import (
+    BasemapTileCache,
+    CachedStaticMap,
+    get_basemap_provider_id,
+    get_blank_tile,
+    get_tiles_in_bounds,
+    seed_basemap_tiles,
+)
+
+
+# Unreachable basemap server
+OFFLINE_URL_TEMPLATE = "http://127.0.0.1:9/{z}/{x}/{y}.png"
+
+
+def create_tile(color: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_basemap_tile_cache_reads_seeded_tiles(tmp_path: Path) -> None:
+    tile = create_tile("green")
+    tile_cache = BasemapTileCache(
+        cache_dir=str(tmp_path), url_template=OFFLINE_URL_TEMPLATE, offline=True
+    )
+    tile_path = tmp_path / tile_cache.provider_id / "12" / "1050" / "1550.png"
+    tile_path.parent.mkdir(parents=True)
+    tile_path.write_bytes(tile)
+    assert tile_cache.get_tile(12, 1050, 1550) == tile
+    # tile is kept in memory after it is read from disk
+    tile_path.unlink()
+    assert tile_cache.get_tile(12, 1050, 1550) == tile
+
+
+def test_basemap_tile_cache_returns_blank_tile(tmp_path: Path) -> None:
+    offline_tile_cache = BasemapTileCache(
+        cache_dir=str(tmp_path), url_template=OFFLINE_URL_TEMPLATE, offline=True
+    )
+    assert offline_tile_cache.get_tile(12, 1050, 1550) == get_blank_tile()
+    # blank tile is also used when the basemap server cannot be reached
+    tile_cache = BasemapTileCache(
+        cache_dir=str(tmp_path), url_template=OFFLINE_URL_TEMPLATE, timeout=1
+    )
+    assert tile_cache.get_tile(12, 1050, 1550) == get_blank_tile()
+    assert not tile_cache.get_tile_path(12, 1050, 1550).exists()
+
+
+def test_basemap_tiles_are_cached_per_provider(tmp_path: Path) -> None:
+    tile_cache = BasemapTileCache(
+        cache_dir=str(tmp_path), url_template=OFFLINE_URL_TEMPLATE, offline=True
+    )
+    tile_cache.write(12, 1050, 1550, create_tile("green"))
+    other_tile_cache = BasemapTileCache(
+        cache_dir=str(tmp_path),
+        url_template="http://127.0.0.1:9/satellite/{z}/{x}/{y}.png",
+        offline=True,
+    )
+    assert other_tile_cache.get_tile(12, 1050, 1550) == get_blank_tile()
+
+
+def test_basemap_provider_id_ignores_access_token() -> None:
+    url_template = "https://tiles.example.com/{z}/{x}/{y}.png?access_token={token}"
+    assert get_basemap_provider_id(
+        url_template.replace("{token}", "a")
+    ) == get_basemap_provider_id(url_template.replace("{token}", "b"))
+    assert get_basemap_provider_id(url_template) != get_basemap_provider_id(
+        OFFLINE_URL_TEMPLATE
+    )
+
+
+def test_cached_static_map_renders_without_basemap_server(tmp_path: Path) -> None:
+    tile_cache = BasemapTileCache(
+        cache_dir=str(tmp_path), url_template=OFFLINE_URL_TEMPLATE, offline=True
+    )
+    static_map = CachedStaticMap(tile_cache=tile_cache, width=128, height=128)
+    image = static_map.render(zoom=12, center=[-86.9, 40.4])
+    assert image.size == (128, 128)
+
+
+def test_get_tiles_in_bounds() -> None:
+    bounds = (-86.95, 40.40, -86.90, 40.45)
+    tiles = list(get_tiles_in_bounds(bounds, min_zoom=0, max_zoom=2))
+    assert tiles == [(0, 0, 0), (1, 0, 0), (2, 1, 1)]
+
+
+def test_seed_basemap_tiles_skips_cached_tiles(tmp_path: Path) -> None:
+    tile_cache = BasemapTileCache(
+        cache_dir=str(tmp_path), url_template=OFFLINE_URL_TEMPLATE, timeout=1
+    )
+    tile_cache.write(0, 0, 0, create_tile("green"))
+    bounds = (-86.95, 40.40, -86.90, 40.45)
+    assert seed_basemap_tiles(tile_cache, bounds, min_zoom=0, max_zoom=1) == 1
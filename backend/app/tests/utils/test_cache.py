@@ -0,0 +1,130 @@
+from unittest.mock import patch
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.static_file_access_version import static_file_access_version
+from app.utils.cache import (
+    StaticFileAccessKey,
+    TTLCache,
+    VersionedTTLCache,
+    invalidate_static_file_access,
+    static_file_access_cache,
+    sync_static_file_access_cache,
+)
+
+
+def test_ttl_cache_evicts_least_recently_used_entry() -> None:
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # access "a" so that "b" is least recently used
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_ttl_cache_expires_entries() -> None:
+    cache = TTLCache(maxsize=2, ttl=30)
+    with patch("app.utils.cache.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with patch("app.utils.cache.time.monotonic", return_value=129):
+        assert cache.get("a") == 1
+    with patch("app.utils.cache.time.monotonic", return_value=130):
+        assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_entries_over_byte_budget() -> None:
+    cache = TTLCache(maxsize=10, maxbytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.set("c", b"1234")
+    # "a" is evicted to keep total size under 10 bytes
+    assert cache.get("a") is None
+    assert cache.nbytes == 8
+    # replacing an entry replaces its size
+    cache.set("b", b"12")
+    assert cache.nbytes == 6
+    # values larger than the budget are not cached
+    cache.set("d", b"12345678901")
+    assert cache.get("d") is None
+    assert cache.invalidate() == 2
+    assert cache.nbytes == 0
+
+
+def test_ttl_cache_invalidate() -> None:
+    cache = TTLCache(maxsize=10)
+    for key in range(5):
+        cache.set(key, key)
+    assert cache.invalidate(lambda key: key % 2 == 0) == 3
+    assert len(cache) == 2
+    assert cache.invalidate() == 2
+    assert len(cache) == 0
+
+
+def test_versioned_ttl_cache_clears_entries_when_version_changes() -> None:
+    cache = VersionedTTLCache(maxsize=10)
+    cache.sync(1)
+    cache.set("a", 1)
+    cache.sync(1)
+    assert cache.get("a") == 1
+    # version incremented by this process keeps entries
+    cache.advance(2)
+    cache.sync(2)
+    assert cache.get("a") == 1
+    # version incremented by another process clears entries
+    cache.advance(4)
+    cache.sync(4)
+    assert cache.get("a") is None
+
+
+def test_versioned_ttl_cache_checks_version_once_per_interval() -> None:
+    cache = VersionedTTLCache(maxsize=10, check_interval=1)
+    assert cache.needs_sync()
+    with patch("app.utils.cache.time.monotonic", return_value=100.0):
+        cache.sync(1)
+    with patch("app.utils.cache.time.monotonic", return_value=100.5):
+        assert not cache.needs_sync()
+    with patch("app.utils.cache.time.monotonic", return_value=101.0):
+        assert cache.needs_sync()
+
+
+def test_invalidate_static_file_access(db: Session) -> None:
+    project_id = uuid4()
+    data_product_id = uuid4()
+    keys = [
+        StaticFileAccessKey(None, "user", "data_products", project_id, uuid4()),
+        StaticFileAccessKey(None, "user", "colorbars", uuid4(), data_product_id),
+        StaticFileAccessKey("key", None, "data_products", uuid4(), uuid4()),
+    ]
+    for key in keys:
+        static_file_access_cache.set(key, True)
+
+    invalidate_static_file_access(db, project_id=project_id)
+    assert static_file_access_cache.get(keys[0]) is None
+    assert static_file_access_cache.get(keys[1]) is True
+
+    invalidate_static_file_access(db, data_product_id=data_product_id)
+    assert static_file_access_cache.get(keys[1]) is None
+    assert static_file_access_cache.get(keys[2]) is True
+
+    invalidate_static_file_access(db, api_key="key")
+    assert static_file_access_cache.get(keys[2]) is None
+
+
+def test_static_file_access_invalidated_by_other_process(db: Session) -> None:
+    key = StaticFileAccessKey(None, "user", "data_products", uuid4(), uuid4())
+    sync_static_file_access_cache(db)
+    static_file_access_cache.set(key, True)
+    sync_static_file_access_cache(db)
+    assert static_file_access_cache.get(key) is True
+    # another process invalidates cached decisions by incrementing the version
+    with db as session:
+        session.execute(select(static_file_access_version.next_value()))
+    sync_static_file_access_cache(db)
+    assert static_file_access_cache.get(key) is None
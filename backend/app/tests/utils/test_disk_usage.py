@@ -0,0 +1,50 @@
+import os
+from pathlib import Path
+from uuid import uuid4
+
+from app.crud.crud_admin import get_static_directory_size
+from app.utils.disk_usage import scan_project_dir
+
+
+def write_file(path: Path, size: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"0" * size)
+
+
+def test_get_static_directory_size(tmp_path: Path) -> None:
+    write_file(tmp_path / "a.tif", 100)
+    write_file(tmp_path / "b" / "c" / "d.tif", 50)
+    # symbolic links are not counted
+    os.symlink(tmp_path / "a.tif", tmp_path / "b" / "link.tif")
+    assert get_static_directory_size(str(tmp_path)) == 150
+    assert get_static_directory_size(str(tmp_path / "missing")) == 0
+
+
+def test_scan_project_dir(tmp_path: Path) -> None:
+    project_dir = tmp_path / "projects" / str(uuid4())
+    flight_dir = project_dir / "flights" / str(uuid4())
+    data_product_id = uuid4()
+    other_data_product_id = uuid4()
+    write_file(project_dir / "field.geojson", 10)
+    write_file(flight_dir / "raw_data" / str(uuid4()) / "raw.zip", 1000)
+    write_file(flight_dir / "data_products" / str(data_product_id) / "ortho.tif", 200)
+    write_file(
+        flight_dir / "data_products" / str(data_product_id) / "original" / "in.tif",
+        300,
+    )
+    write_file(
+        flight_dir / "data_products" / str(other_data_product_id) / "dsm.tif", 400
+    )
+
+    disk_usage, data_product_disk_usage = scan_project_dir(str(project_dir))
+
+    assert disk_usage == 1910
+    assert disk_usage == get_static_directory_size(str(project_dir))
+    assert data_product_disk_usage == {
+        data_product_id: 500,
+        other_data_product_id: 400,
+    }
+
+
+def test_scan_missing_project_dir(tmp_path: Path) -> None:
+    assert scan_project_dir(str(tmp_path / "missing")) == (0, {})
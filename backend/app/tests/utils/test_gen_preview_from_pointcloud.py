@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import laspy as lp
+import numpy as np
+from PIL import Image
+
+from app.utils.gen_preview_from_pointcloud import (
+    create_preview_image,
+    rasterize_top_down,
+)
+
+
+def create_las(las_path: Path, num_points: int = 10_000, rgb: bool = True) -> None:
+    header = lp.LasHeader(point_format=7 if rgb else 6, version="1.4")
+    header.scales = np.array([0.01, 0.01, 0.01])
+    header.offsets = np.array([0, 0, 0])
+    las = lp.LasData(header)
+    rng = np.random.default_rng(0)
+    las.x = rng.uniform(1000, 1200, num_points)
+    las.y = rng.uniform(5000, 5100, num_points)
+    las.z = rng.uniform(300, 310, num_points)
+    if rgb:
+        las.red = rng.integers(0, 65535, num_points)
+        las.green = rng.integers(0, 65535, num_points)
+        las.blue = rng.integers(0, 65535, num_points)
+    las.write(str(las_path))
+
+
+def test_rasterize_top_down_keeps_highest_point() -> None:
+    x = np.array([0.5, 0.5, 3.5])
+    y = np.array([3.5, 3.5, 0.5])
+    z = np.array([10.0, 20.0, 5.0])
+    colors = np.array([[255, 0, 0], [0, 255, 0], [0, 0, 255]], dtype=np.uint8)
+    image = rasterize_top_down(
+        x, y, z, colors, np.array([0, 0]), np.array([4, 4]), size=4
+    )
+    assert image.shape == (4, 4, 4)
+    # top left pixel has two points, the higher point is drawn
+    assert image[0, 0].tolist() == [0, 255, 0, 255]
+    assert image[3, 3].tolist() == [0, 0, 255, 255]
+    # pixels next to points are filled, other pixels are transparent
+    assert image[1, 1, 3] == 255
+    assert image[0, 3, 3] == 0
+
+
+def test_create_preview_image(tmp_path: Path) -> None:
+    las_path = tmp_path / "test.las"
+    create_las(las_path)
+    preview_path = tmp_path / "test.png"
+    create_preview_image(las_path, preview_path, size=256)
+    with Image.open(preview_path) as preview:
+        assert preview.mode == "RGBA"
+        # preview keeps aspect ratio of point cloud extent
+        assert preview.size == (256, 128)
+
+
+def test_create_preview_image_colors_by_elevation(tmp_path: Path) -> None:
+    las_path = tmp_path / "test.las"
+    create_las(las_path, rgb=False)
+    preview_path = tmp_path / "test.png"
+    create_preview_image(las_path, preview_path, size=256)
+    with Image.open(preview_path) as preview:
+        colors = np.asarray(preview)[:, :, :3].reshape(-1, 3)
+        assert len(np.unique(colors, axis=0)) > 2
@@ -0,0 +1,188 @@
+import shutil
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+import pytest
+import rasterio
+import rasterio.shutil
+from rasterio.io import DatasetReader
+
+from app.utils.ImageProcessor import ImageProcessor
+
+
+dsm_dataset = Path("/app/app/tests/data/test.tif")
+multispectral_dataset = Path("/app/app/tests/data/test_multispectral.tif")
+
+
+def run_image_processor(
+    dataset: Path, tmpdir: Path, use_overviews: bool = False
+) -> ImageProcessor:
+    """Copies dataset into a nested upload directory and runs the in-process
+    image processor on it.
+
+    Args:
+        dataset (Path): Path to test dataset.
+        tmpdir (Path): Temporary directory for processing.
+        use_overviews (bool, optional): Run in overview mode. Defaults to False.
+
+    Returns:
+        ImageProcessor: Image processor after run() completes.
+    """
+    upload_dir = tmpdir / "upload"
+    upload_dir.mkdir()
+    in_raster = upload_dir / dataset.name
+    shutil.copyfile(dataset, in_raster)
+
+    ip = ImageProcessor(str(in_raster), engine="rasterio", use_overviews=use_overviews)
+    ip.run()
+
+    return ip
+
+
+def test_in_process_engine_with_single_band_raster():
+    """Test in-process engine creates COG, preview, and STAC properties."""
+    with TemporaryDirectory() as tmpdir:
+        ip = run_image_processor(dsm_dataset, Path(tmpdir))
+
+        assert ip.out_raster.exists()
+        assert ip.preview_out_path.exists()
+        assert not ip.in_raster.parent.exists()
+        with rasterio.open(ip.out_raster) as src:
+            assert src.tags(ns="IMAGE_STRUCTURE").get("LAYOUT") == "COG"
+        assert len(ip.stac_properties["raster"]) == 1
+        assert ip.stac_properties["raster"][0]["data_type"] == "float32"
+        assert ip.stac_properties["raster"][0]["unit"] == "metre"
+        assert ip.stac_properties["eo"] == [{"name": "b1", "description": "Gray"}]
+        stats = ip.stac_properties["raster"][0]["stats"]
+        assert stats["minimum"] <= stats["mean"] <= stats["maximum"]
+        assert ip.get_default_symbology()["settings"]["colorRamp"] == "rainbow"
+
+
+def test_in_process_engine_with_multiband_raster():
+    """Test in-process engine creates an RGB preview for a multiband raster."""
+    with TemporaryDirectory() as tmpdir:
+        ip = run_image_processor(multispectral_dataset, Path(tmpdir))
+
+        assert len(ip.stac_properties["raster"]) == 6
+        assert len(ip.stac_properties["eo"]) == 6
+        with rasterio.open(ip.preview_out_path) as preview:
+            assert preview.count == 3
+            assert preview.dtypes[0] == "uint8"
+        assert "red" in ip.get_default_symbology()["settings"]
+
+
+def test_overview_mode_adds_histograms():
+    """Test overview mode derives stats, histograms, and preview in one read."""
+    with TemporaryDirectory() as tmpdir:
+        ip = run_image_processor(multispectral_dataset, Path(tmpdir), True)
+
+        assert ip.out_raster.exists()
+        assert ip.preview_out_path.exists()
+        assert len(ip.stac_properties["raster"]) == 6
+        for band in ip.stac_properties["raster"]:
+            stats = band["stats"]
+            histogram = band["histogram"]
+            assert stats["minimum"] <= stats["mean"] <= stats["maximum"]
+            assert histogram["count"] == len(histogram["buckets"]) == 256
+            assert histogram["min"] == stats["minimum"]
+            assert histogram["max"] == stats["maximum"]
+
+
+def test_overview_mode_requires_rasterio_engine():
+    """Test overview mode cannot be combined with the GDAL utilities engine."""
+    with pytest.raises(ValueError):
+        ImageProcessor(str(dsm_dataset), engine="gdal", use_overviews=True)
+
+
+def test_invalid_engine():
+    """Test image processor rejects unknown engine names."""
+    with pytest.raises(ValueError):
+        ImageProcessor(str(dsm_dataset), engine="unknown")
+
+
+def test_overview_mode_keeps_tiled_layout_and_cached_stats():
+    """Test tiled input with band stats in its metadata is moved into place and its
+    stored stats are reported instead of stats from the overview."""
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        upload_dir = tmpdir / "upload"
+        upload_dir.mkdir()
+        in_raster = upload_dir / "tool_output.tif"
+        with rasterio.open(dsm_dataset) as src:
+            profile = src.profile
+            profile.update(tiled=True, blockxsize=512, blockysize=512)
+            with rasterio.open(in_raster, "w", **profile) as dst:
+                dst.write(src.read())
+                dst.update_tags(
+                    1,
+                    STATISTICS_MINIMUM="1",
+                    STATISTICS_MAXIMUM="2",
+                    STATISTICS_MEAN="1.5",
+                    STATISTICS_STDDEV="0.5",
+                )
+
+        ip = ImageProcessor(
+            str(in_raster), engine="rasterio", use_overviews=True, keep_layout=True
+        )
+        ip.run()
+
+        with rasterio.open(ip.out_raster) as src:
+            assert src.tags(ns="IMAGE_STRUCTURE").get("LAYOUT") != "COG"
+        assert ip.preview_out_path.exists()
+        stats = ip.stac_properties["raster"][0]["stats"]
+        assert stats == {"minimum": 1, "maximum": 2, "mean": 1.5, "stddev": 0.5}
+
+
+def test_overview_mode_reads_cog_without_overviews_at_preview_size():
+    """Test COG input without internal overviews is read at the preview size
+    instead of at full resolution."""
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        upload_dir = tmpdir / "upload"
+        upload_dir.mkdir()
+        in_raster = upload_dir / "cog_without_overviews.tif"
+        with rasterio.open(dsm_dataset) as src:
+            rasterio.shutil.copy(src, in_raster, driver="COG", OVERVIEWS="NONE")
+
+        # record keyword arguments of every raster read
+        read_kwargs = []
+        read = DatasetReader.read
+
+        def record_read(self, *args, **kwargs):
+            read_kwargs.append(kwargs)
+            return read(self, *args, **kwargs)
+
+        with patch.object(DatasetReader, "read", record_read):
+            ip = ImageProcessor(str(in_raster), engine="rasterio", use_overviews=True)
+            ip.run()
+
+        assert read_kwargs
+        assert all("out_shape" in kwargs for kwargs in read_kwargs)
+        assert ip.preview_out_path.exists()
+        stats = ip.stac_properties["raster"][0]["stats"]
+        assert stats["minimum"] <= stats["mean"] <= stats["maximum"]
+
+
+def test_overview_mode_with_all_nodata_band():
+    """Test band without valid pixels gets stats instead of failing the upload."""
+    with TemporaryDirectory() as tmpdir:
+        tmpdir = Path(tmpdir)
+        upload_dir = tmpdir / "upload"
+        upload_dir.mkdir()
+        in_raster = upload_dir / "all_nodata.tif"
+        with rasterio.open(multispectral_dataset) as src:
+            profile = src.profile
+            profile.update(nodata=0)
+            data = src.read()
+            data[1] = 0
+            with rasterio.open(in_raster, "w", **profile) as dst:
+                dst.write(data)
+
+        ip = ImageProcessor(str(in_raster), engine="rasterio", use_overviews=True)
+        ip.run()
+
+        assert ip.preview_out_path.exists()
+        stats = ip.stac_properties["raster"][1]["stats"]
+        assert stats == {"minimum": 0, "maximum": 0, "mean": 0, "stddev": 0}
+        assert sum(ip.stac_properties["raster"][1]["histogram"]["buckets"]) == 0
@@ -0,0 +1,169 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+from starlette.exceptions import HTTPException
+from starlette.testclient import TestClient
+
+from app.utils.staticfiles import (
+    ClosedRange,
+    OpenRange,
+    RangedFileResponse,
+    RangedStaticFiles,
+    coalesce_ranges,
+    parse_range_header,
+)
+
+
+def create_file(tmp_path: Path, size: int) -> Path:
+    file_path = tmp_path / "test.copc.laz"
+    file_path.write_bytes(os.urandom(size))
+    return file_path
+
+
+def send_range(
+    file_path: Path, range: OpenRange, extensions: Dict[str, Any] | None = None
+) -> List[Dict[str, Any]]:
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.zerocopysend":
+            # read range like the server would before the file is closed
+            message["file"].seek(message["offset"])
+            message = {**message, "body": message["file"].read(message["count"])}
+        messages.append(message)
+
+    response = RangedFileResponse(
+        file_path, range, stat_result=os.stat(file_path), method="GET"
+    )
+    scope = {"type": "http", "method": "GET", "extensions": extensions or {}}
+    asyncio.run(response(scope, receive, send))
+    return messages
+
+
+def test_ranged_file_response_sends_adaptive_chunks(tmp_path: Path) -> None:
+    file_path = create_file(tmp_path, 4 * 1024 * 1024)
+    messages = send_range(file_path, OpenRange(10, 3_000_009))
+    assert messages[0]["status"] == 206
+    assert dict(messages[0]["headers"])[b"content-length"] == b"3000000"
+    chunks = [message["body"] for message in messages[1:]]
+    assert b"".join(chunks) == file_path.read_bytes()[10:3_000_010]
+    # chunks double in size up to the maximum chunk size
+    assert len(chunks[0]) == RangedFileResponse.min_chunk_size
+    assert len(chunks[1]) == RangedFileResponse.min_chunk_size * 2
+    assert max(len(chunk) for chunk in chunks) == RangedFileResponse.max_chunk_size
+    assert messages[-1]["more_body"] is False
+
+
+def test_ranged_file_response_sends_short_range_in_one_chunk(tmp_path: Path) -> None:
+    file_path = create_file(tmp_path, 100_000)
+    messages = send_range(file_path, OpenRange(100, 199))
+    assert len(messages) == 2
+    assert messages[1]["body"] == file_path.read_bytes()[100:200]
+    assert messages[1]["more_body"] is False
+
+
+def test_ranged_file_response_zerocopysend(tmp_path: Path) -> None:
+    file_path = create_file(tmp_path, 100_000)
+    messages = send_range(
+        file_path, OpenRange(500, 50_499), {"http.response.zerocopysend": {}}
+    )
+    assert len(messages) == 2
+    assert messages[1]["type"] == "http.response.zerocopysend"
+    assert messages[1]["offset"] == 500
+    assert messages[1]["count"] == 50_000
+    assert messages[1]["body"] == file_path.read_bytes()[500:50_500]
+    assert messages[1]["file"].closed
+
+
+def test_ranged_file_response_pathsend(tmp_path: Path) -> None:
+    file_path = create_file(tmp_path, 100_000)
+    extensions: Dict[str, Any] = {"http.response.pathsend": {}}
+    messages = send_range(file_path, OpenRange(0, 99_999), extensions)
+    assert messages[1] == {"type": "http.response.pathsend", "path": str(file_path)}
+    # partial ranges cannot be sent with pathsend
+    messages = send_range(file_path, OpenRange(10, 99), extensions)
+    assert messages[1]["type"] == "http.response.body"
+
+
+def test_parse_range_header() -> None:
+    assert parse_range_header("bytes=0-99", 1000) == [ClosedRange(0, 99)]
+    assert parse_range_header("bytes=900-", 1000) == [ClosedRange(900, 999)]
+    assert parse_range_header("bytes=-100", 1000) == [ClosedRange(900, 999)]
+    assert parse_range_header("bytes=-5000", 1000) == [ClosedRange(0, 999)]
+    assert parse_range_header("bytes=0-0, 990-5000", 1000) == [
+        ClosedRange(0, 0),
+        ClosedRange(990, 999),
+    ]
+    # ranges starting after end of file are ignored
+    assert parse_range_header("bytes=0-9,2000-", 1000) == [ClosedRange(0, 9)]
+
+
+def test_parse_range_header_errors() -> None:
+    for range_header in ["bytes=abc", "bytes=-", "bytes=10-5", "items=0-10"]:
+        with pytest.raises(HTTPException) as exc_info:
+            parse_range_header(range_header, 1000)
+        assert exc_info.value.status_code == 400
+    with pytest.raises(HTTPException) as exc_info:
+        parse_range_header("bytes=1000-,-0", 1000)
+    assert exc_info.value.status_code == 416
+    assert exc_info.value.headers == {"content-range": "bytes */1000"}
+
+
+def test_coalesce_ranges() -> None:
+    ranges = [
+        ClosedRange(500, 599),
+        ClosedRange(0, 99),
+        ClosedRange(100, 199),
+        ClosedRange(550, 650),
+        ClosedRange(800, 899),
+    ]
+    assert coalesce_ranges(ranges) == [
+        ClosedRange(0, 199),
+        ClosedRange(500, 650),
+        ClosedRange(800, 899),
+    ]
+
+
+def test_ranged_static_files_multipart_byteranges(tmp_path: Path) -> None:
+    file_path = create_file(tmp_path, 100_000)
+    content = file_path.read_bytes()
+    client = TestClient(RangedStaticFiles(directory=tmp_path))
+
+    response = client.get(
+        "/test.copc.laz", headers={"Range": "bytes=0-99,100-199,-100,5000-5009"}
+    )
+    assert response.status_code == 206
+    assert response.headers["accept-ranges"] == "bytes"
+    media_type, _, boundary = response.headers["content-type"].partition("; boundary=")
+    assert media_type == "multipart/byteranges"
+    assert int(response.headers["content-length"]) == len(response.content)
+
+    # adjacent ranges are sent as one part, parts are sorted by offset
+    parts = response.content.split(f"--{boundary}".encode())
+    assert parts[0] == b"" and parts[-1] == b"--\r\n"
+    expected_ranges = [(0, 199), (5000, 5009), (99_900, 99_999)]
+    for part, (start, end) in zip(parts[1:-1], expected_ranges):
+        part_headers, _, body = part.partition(b"\r\n\r\n")
+        assert f"Content-Range: bytes {start}-{end}/100000".encode() in part_headers
+        assert body.removesuffix(b"\r\n") == content[start : end + 1]
+    assert len(parts) == len(expected_ranges) + 2
+
+
+def test_ranged_static_files_single_range(tmp_path: Path) -> None:
+    file_path = create_file(tmp_path, 100_000)
+    client = TestClient(RangedStaticFiles(directory=tmp_path))
+
+    response = client.get("/test.copc.laz", headers={"Range": "bytes=-100"})
+    assert response.status_code == 206
+    assert response.headers["content-range"] == "bytes 99900-99999/100000"
+    assert response.content == file_path.read_bytes()[-100:]
+
+    response = client.get("/test.copc.laz", headers={"Range": "bytes=99990-"})
+    assert response.status_code == 206
+    assert response.content == file_path.read_bytes()[-10:]
@@ -0,0 +1,88 @@
+import os
+import time
+from pathlib import Path
+from uuid import uuid4
+
+from app.utils.tile_cache import TileCache, TileKey, etag_matches, get_etag
+
+
+def create_tile_key(**kwargs) -> TileKey:
+    params = {
+        "data_product_id": uuid4(),
+        "z": 18,
+        "x": 67141,
+        "y": 97683,
+        "scale": 2,
+        "bidx": (1, 2, 3),
+        "rescale": (),
+        "colormap_name": None,
+    }
+    params.update(kwargs)
+    return TileKey(**params)
+
+
+def test_tile_cache_memory_tier() -> None:
+    tile_cache = TileCache(maxsize=2, ttl=60, cache_dir=None)
+    tile_key = create_tile_key()
+    assert tile_cache.get(tile_key) is None
+    tile = tile_cache.set(tile_key, b"tile")
+    assert tile.etag == get_etag(b"tile")
+    assert tile_cache.get(tile_key) == tile
+    # tiles rendered with different params are cached separately
+    assert tile_cache.get(tile_key._replace(bidx=(1,))) is None
+
+
+def test_tile_cache_memory_tier_byte_budget() -> None:
+    tile_cache = TileCache(maxsize=10, ttl=60, cache_dir=None, maxbytes=1000)
+    tile_keys = [create_tile_key() for _ in range(3)]
+    for tile_key in tile_keys:
+        tile_cache.set(tile_key, b"x" * 400)
+    # least recently used tile is evicted to stay within the byte budget
+    assert tile_cache.get(tile_keys[0]) is None
+    assert tile_cache.get(tile_keys[2]) is not None
+    assert tile_cache.memory.nbytes == 800
+
+
+def test_tile_cache_disk_tier(tmp_path: Path) -> None:
+    tile_key = create_tile_key()
+    TileCache(maxsize=2, ttl=60, cache_dir=str(tmp_path)).set(tile_key, b"tile")
+    # tile is read from disk by a cache with an empty memory tier
+    tile_cache = TileCache(maxsize=2, ttl=60, cache_dir=str(tmp_path))
+    tile = tile_cache.get(tile_key)
+    assert tile and tile.content == b"tile"
+    assert len(tile_cache.memory) == 1
+
+
+def test_tile_cache_disk_tier_expires_tiles(tmp_path: Path) -> None:
+    tile_key = create_tile_key()
+    tile_cache = TileCache(maxsize=2, ttl=60, cache_dir=str(tmp_path))
+    tile_cache.set(tile_key, b"tile")
+    tile_path = tile_cache.get_tile_path(tile_key)
+    expired = time.time() - 120
+    os.utime(tile_path, (expired, expired))
+    tile_cache.memory.invalidate()
+    assert tile_cache.get(tile_key) is None
+    assert not tile_path.exists()
+
+
+def test_tile_cache_invalidate_data_product(tmp_path: Path) -> None:
+    tile_cache = TileCache(maxsize=10, ttl=60, cache_dir=str(tmp_path))
+    tile_key = create_tile_key()
+    other_tile_key = create_tile_key()
+    tile_cache.set(tile_key, b"tile")
+    tile_cache.set(tile_key._replace(z=17), b"tile")
+    tile_cache.set(other_tile_key, b"other tile")
+    tile_cache.invalidate(tile_key.data_product_id)
+    assert tile_cache.get(tile_key) is None
+    assert tile_cache.get(tile_key._replace(z=17)) is None
+    assert not (tmp_path / str(tile_key.data_product_id)).exists()
+    assert tile_cache.get(other_tile_key)
+
+
+def test_etag_matches() -> None:
+    etag = get_etag(b"tile")
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
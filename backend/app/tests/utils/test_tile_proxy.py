@@ -0,0 +1,112 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import Request
+
+from app.utils.tile_proxy import fetch_tile, stream_tile
+
+
+TILE_URL = "http://varnish/cog/tiles/WebMercatorQuad/1/0/0@1x"
+
+
+def create_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def create_request(headers: dict[str, str]) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [
+                (key.lower().encode(), value.encode()) for key, value in headers.items()
+            ],
+        }
+    )
+
+
+async def read_streaming_response(response: StreamingResponse) -> bytes:
+    body = b""
+    async for chunk in response.body_iterator:
+        body += chunk
+    await response.background()
+    return body
+
+
+def test_stream_tile_forwards_body_and_cache_headers() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(
+            200,
+            content=b"tile" * 1000,
+            headers={
+                "Cache-Control": "public, max-age=3600",
+                "ETag": '"abc"',
+                "Server": "titiler",
+            },
+        )
+
+    async def run() -> None:
+        async with create_client(handler) as client:
+            response = await stream_tile(client, TILE_URL, media_type="image/png")
+            assert isinstance(response, StreamingResponse)
+            assert response.status_code == status.HTTP_200_OK
+            assert response.media_type == "image/png"
+            assert response.headers["cache-control"] == "public, max-age=3600"
+            assert response.headers["etag"] == '"abc"'
+            assert "server" not in response.headers
+            assert await read_streaming_response(response) == b"tile" * 1000
+
+    asyncio.run(run())
+
+
+def test_stream_tile_revalidates_with_upstream() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.headers["if-none-match"] == '"abc"'
+        return httpx.Response(304, headers={"ETag": '"abc"'})
+
+    async def run() -> None:
+        async with create_client(handler) as client:
+            response = await stream_tile(
+                client,
+                TILE_URL,
+                media_type="image/png",
+                request=create_request({"If-None-Match": '"abc"'}),
+            )
+            assert response.status_code == status.HTTP_304_NOT_MODIFIED
+            assert response.headers["etag"] == '"abc"'
+
+    asyncio.run(run())
+
+
+def test_stream_tile_raises_upstream_error() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(404, text="Tile not found")
+
+    async def run() -> None:
+        async with create_client(handler) as client:
+            with pytest.raises(HTTPException) as exc_info:
+                await stream_tile(client, TILE_URL, media_type="image/png")
+            assert exc_info.value.status_code == status.HTTP_404_NOT_FOUND
+            assert exc_info.value.detail == "Error: Tile not found"
+
+    asyncio.run(run())
+
+
+def test_fetch_tile() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("@1x"):
+            return httpx.Response(200, content=b"tile")
+        return httpx.Response(500, text="Internal error")
+
+    async def run() -> None:
+        async with create_client(handler) as client:
+            assert await fetch_tile(client, TILE_URL) == b"tile"
+            with pytest.raises(HTTPException) as exc_info:
+                await fetch_tile(client, TILE_URL.replace("@1x", "@2x"))
+            assert exc_info.value.status_code == 500
+
+    asyncio.run(run())
@@ -0,0 +1,61 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from app.utils.upload_transfer import transfer_upload
+
+
+def create_upload(tmp_path: Path, size: int = 100_000) -> Path:
+    storage_path = tmp_path / "tusd" / "upload-id"
+    storage_path.parent.mkdir()
+    storage_path.write_bytes(os.urandom(size))
+    with open(f"{storage_path}.info", "w") as info_file:
+        json.dump({"ID": "upload-id", "Size": size}, info_file)
+    (tmp_path / "static").mkdir()
+    return storage_path
+
+
+def test_transfer_upload_links_on_same_filesystem(tmp_path: Path) -> None:
+    storage_path = create_upload(tmp_path)
+    destination = tmp_path / "static" / "upload.tif"
+    result = transfer_upload(str(storage_path), str(destination))
+    assert result.method == "link"
+    assert result.size == 100_000
+    assert os.path.samefile(storage_path, destination)
+    # removing upload from tusd storage leaves transferred file
+    os.remove(storage_path)
+    assert destination.stat().st_size == 100_000
+
+
+def test_transfer_upload_copies(tmp_path: Path) -> None:
+    storage_path = create_upload(tmp_path)
+    destination = tmp_path / "static" / "upload.tif"
+    # existing file at destination is replaced
+    destination.write_bytes(b"existing")
+    result = transfer_upload(str(storage_path), str(destination), methods=("copy",))
+    assert result.method == "copy"
+    assert result.size == 100_000
+    assert destination.read_bytes() == storage_path.read_bytes()
+    assert not os.path.samefile(storage_path, destination)
+
+
+def test_transfer_upload_copy_file_range(tmp_path: Path) -> None:
+    storage_path = create_upload(tmp_path)
+    destination = tmp_path / "static" / "upload.tif"
+    result = transfer_upload(
+        str(storage_path), str(destination), methods=("copy_file_range", "copy")
+    )
+    assert result.size == 100_000
+    assert destination.read_bytes() == storage_path.read_bytes()
+
+
+def test_transfer_upload_rejects_incomplete_upload(tmp_path: Path) -> None:
+    storage_path = create_upload(tmp_path)
+    with open(f"{storage_path}.info", "w") as info_file:
+        json.dump({"ID": "upload-id", "Size": 200_000}, info_file)
+    destination = tmp_path / "static" / "upload.tif"
+    with pytest.raises(ValueError):
+        transfer_upload(str(storage_path), str(destination), methods=("copy",))
+    assert not destination.exists()
@@ -3,11 +3,16 @@ from datetime import datetime, timedelta, timezone
 from typing import List
 
 import geopandas as gpd
+import pandas as pd
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app import crud
-from app.api.utils import create_vector_layer_preview
+from app.api.utils import (
+    create_vector_layer_preview,
+    create_vector_layer_preview_placeholder,
+    is_geometry_type_consistent,
+)
 from app.core.config import settings
 from app.models.data_product import DataProduct
 from app.models.flight import Flight
@@ -81,6 +86,34 @@ def test_create_vector_layer_preview_image(
     assert os.path.exists(polygon_preview)
 
 
+def test_replace_vector_layer_preview_placeholder(db: Session) -> None:
+    project = create_project(db)
+    vector_layer: VectorLayerDict = get_geojson_feature_collection("point")
+    gdf = gpd.GeoDataFrame.from_features(
+        vector_layer["geojson"]["features"], crs="EPSG:4326"
+    )
+    features = crud.vector_layer.create_with_project(
+        db, file_name=vector_layer["layer_name"], gdf=gdf, project_id=project.id
+    )
+    layer_id = features[0].properties["layer_id"]
+    placeholder = create_vector_layer_preview_placeholder(project.id, layer_id)
+    placeholder_size = os.path.getsize(placeholder)
+    # placeholder is replaced with rendered preview at the same path
+    preview = create_vector_layer_preview(
+        project_id=project.id, layer_id=layer_id, features=features, overwrite=True
+    )
+    assert preview == placeholder
+    assert os.path.getsize(preview) != placeholder_size
+    assert not os.path.exists(preview.replace("preview.png", "preview.tmp.png"))
+
+
+def test_geometry_type_consistency() -> None:
+    assert is_geometry_type_consistent(pd.Series(["Polygon", "MultiPolygon"]))
+    assert is_geometry_type_consistent(pd.Series(["Point", "Point"]))
+    assert not is_geometry_type_consistent(pd.Series(["Point", "LineString"]))
+    assert not is_geometry_type_consistent(pd.Series(["Polygon", None]))
+
+
 def test_deactivated_project_cleanup(db: Session) -> None:
     user = create_user(db)
     data_product1 = SampleDataProduct(db, user=user)
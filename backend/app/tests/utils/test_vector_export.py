@@ -0,0 +1,67 @@
+from pathlib import Path
+
+import fiona
+
+from app.utils.vector_export import get_field_types, get_schema_geometry_type, to_record
+
+
+def test_get_field_types() -> None:
+    field_types = get_field_types(
+        [
+            ("plot", "integer"),
+            ("height", "integer"),
+            ("height", "number"),
+            ("name", "string"),
+            ("name", "null"),
+            ("treated", "boolean"),
+            ("notes", "object"),
+            ("mixed", "string"),
+            ("mixed", "number"),
+            ("empty", "null"),
+        ]
+    )
+    assert field_types == {
+        "plot": "int",
+        "height": "float",
+        "name": "str",
+        "treated": "bool",
+        "notes": "str",
+        "mixed": "str",
+        "empty": "str",
+    }
+
+
+def test_get_schema_geometry_type() -> None:
+    assert get_schema_geometry_type(["POLYGON", "POINT"], "GPKG") == "Unknown"
+    assert get_schema_geometry_type(["POLYGON"], "FlatGeobuf") == "Unknown"
+    polygon_types = ["POLYGON", "MULTIPOLYGON"]
+    assert get_schema_geometry_type(polygon_types, "ESRI Shapefile") == "Polygon"
+    point_types = ["POINT", "MULTIPOINT"]
+    assert get_schema_geometry_type(point_types, "ESRI Shapefile") == "MultiPoint"
+
+
+def test_to_record_matches_schema(tmp_path: Path) -> None:
+    schema = {
+        "geometry": "MultiPoint",
+        "properties": {"plot": "int", "notes": "str"},
+    }
+    records = [
+        to_record(
+            {"type": "Point", "coordinates": [-86.9, 40.4]},
+            {"plot": 1, "notes": {"row": 2}},
+            schema,
+        ),
+        to_record(
+            {"type": "MultiPoint", "coordinates": [[-86.9, 40.4]]}, {"plot": 2}, schema
+        ),
+    ]
+    out_path = str(tmp_path / "plots.shp")
+    with fiona.open(
+        out_path, "w", driver="ESRI Shapefile", crs="EPSG:4326", schema=schema
+    ) as dst:
+        dst.writerecords(records)
+    with fiona.open(out_path) as src:
+        features = list(src)
+    assert [feature.properties["plot"] for feature in features] == [1, 2]
+    assert features[0].properties["notes"] == '{"row": 2}'
+    assert features[1].properties["notes"] is None
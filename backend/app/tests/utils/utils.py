@@ -1,10 +1,12 @@
-from typing import Any, Dict, TypedDict, Union
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, List, TypedDict, Union
 
 from faker import Faker
 from geojson_pydantic import Feature, FeatureCollection, LineString, Point, Polygon
 from pydantic import PostgresDsn
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.orm import Session
 
 from app.core.config import settings
 
@@ -41,6 +43,23 @@ def random_password() -> str:
     return faker.password(length=12)
 
 
+@contextmanager
+def count_queries(db: Session) -> Generator[List[str], None, None]:
+    """Records SQL statements executed by the session's engine. Yields list of
+    statements that is appended to until the context exits."""
+    statements: List[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
 def build_sqlalchemy_uri(db_path: str) -> PostgresDsn:
     """Construct URI for test database."""
     return PostgresDsn.build(
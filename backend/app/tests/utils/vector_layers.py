@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 
 from app import crud, schemas
 from app.core.config import settings
+from app.tasks.post_upload_tasks import queue_vector_layer_preview
 from app.tests.utils.project import create_project
 from app.tests.utils.utils import get_geojson_feature_collection
 
@@ -33,6 +34,9 @@ def create_feature_collection(
     features = crud.vector_layer.create_with_project(
         db, file_name="test_file.geojson", gdf=gdf, project_id=project_id
     )
+    queue_vector_layer_preview(
+        db, project_id=project_id, layer_id=features[0].properties["layer_id"]
+    )
 
     feature_collection = {
         "type": "FeatureCollection",
@@ -7,10 +7,16 @@ import subprocess
 from pathlib import Path
 from typing import Any, NoReturn
 
+import numpy as np
+import rasterio
+import rasterio.shutil
+from affine import Affine
 from pydantic import ValidationError
+from rasterio.enums import Resampling
 
 from app.schemas.user_style import UserStyleCreate
 from app.utils.STACProperties import (
+    Histogram,
     ImageStructure,
     Metadata,
     STACProperties,
@@ -21,6 +27,14 @@ from app.utils.STACProperties import (
 logger = logging.getLogger("__name__")
 
 
+# "gdal" runs the GDAL command line utilities in subprocesses, "rasterio" opens the
+# dataset once and performs every step in-process
+ENGINES = ["gdal", "rasterio"]
+
+# size of the preview image relative to the full resolution raster
+PREVIEW_SCALE = 0.0625
+
+
 class ImageProcessor:
     """
     Used to process uploaded rasters in the GeoTIFF format. If the raster is not
@@ -28,7 +42,24 @@ class ImageProcessor:
     compressed COG for visualization will be created along with a small preview image.
     """
 
-    def __init__(self, in_raster: str, output_dir: str | Path | None = None) -> None:
+    def __init__(
+        self,
+        in_raster: str,
+        output_dir: str | Path | None = None,
+        engine: str = "gdal",
+        use_overviews: bool = False,
+        keep_layout: bool = False,
+    ) -> None:
+        if engine not in ENGINES:
+            raise ValueError("Invalid image processing engine")
+        if use_overviews and engine != "rasterio":
+            raise ValueError("Overview mode requires the rasterio engine")
+
+        self.engine = engine
+        self.use_overviews = use_overviews
+        # move (instead of rewrite) input rasters that are already tiled with
+        # internal overviews, e.g. toolbox outputs, in overview mode
+        self.keep_layout = keep_layout
         self.in_raster = Path(in_raster)
 
         if not output_dir:
@@ -41,6 +72,11 @@ class ImageProcessor:
         self.stac_properties: STACProperties = {"raster": [], "eo": []}
 
     def run(self) -> Path:
+        if self.engine == "rasterio" and self.use_overviews:
+            return self.run_with_overviews()
+        if self.engine == "rasterio":
+            return self.run_in_process()
+
         info: dict = get_info(self.in_raster)
 
         if is_cog(info):
@@ -59,6 +95,81 @@ class ImageProcessor:
 
         return self.out_raster
 
+    def run_in_process(self) -> Path:
+        """Same steps as run(), but the input raster is opened a single time with
+        rasterio instead of once per GDAL utility. The preview image is read from
+        the overviews of the output COG rather than the full resolution raster.
+
+        Returns:
+            Path: Path to output raster in COG layout.
+        """
+        with rasterio.open(self.in_raster) as src:
+            self.stac_properties = get_stac_properties_from_dataset(src)
+            cog = is_cog_dataset(src)
+            if not cog:
+                write_cog(src, self.out_raster)
+
+        if cog:
+            shutil.move(self.in_raster, self.out_dir)
+
+        if os.path.exists(self.in_raster.parent):
+            shutil.rmtree(self.in_raster.parent)
+
+        write_preview_image(
+            self.out_raster, self.preview_out_path, self.stac_properties
+        )
+
+        return self.out_raster
+
+    def run_with_overviews(self) -> Path:
+        """Writes the COG (and its internal overviews) first, then reads the
+        smallest overview level that covers the preview size a single time. Band
+        stats, histograms, and the preview image are all derived from that read, so
+        their cost depends on the preview size instead of the source size.
+
+        Returns:
+            Path: Path to output raster in COG layout.
+        """
+        with rasterio.open(self.in_raster) as src:
+            cog = is_cog_dataset(src) or (
+                self.keep_layout and is_tiled_with_overviews(src)
+            )
+            if not cog:
+                write_cog(src, self.out_raster)
+
+        if cog:
+            shutil.move(self.in_raster, self.out_dir)
+
+        if os.path.exists(self.in_raster.parent):
+            shutil.rmtree(self.in_raster.parent)
+
+        with rasterio.open(self.out_raster) as src:
+            overview_level = get_preview_overview_level(src)
+            if overview_level is None:
+                # without overviews, GDAL averages blocks down to the preview size
+                # as they are read, so the full resolution raster is never in memory
+                data = src.read(
+                    out_shape=(
+                        src.count,
+                        max(1, round(src.height * PREVIEW_SCALE)),
+                        max(1, round(src.width * PREVIEW_SCALE)),
+                    ),
+                    resampling=Resampling.average,
+                    masked=True,
+                )
+            else:
+                with rasterio.open(
+                    self.out_raster, overview_level=overview_level
+                ) as ovr:
+                    data = ovr.read(masked=True)
+            self.stac_properties = get_stac_properties_from_array(src, data)
+            preview_bands = [0, 1, 2] if src.count > 2 else [0]
+            save_preview_image(
+                data[preview_bands], self.preview_out_path, self.stac_properties, src
+            )
+
+        return self.out_raster
+
     def get_default_symbology(self) -> UserStyleCreate | NoReturn:
         """Creates default symbology settings based on raster type and stats."""
         if (
@@ -266,3 +377,351 @@ def create_preview_image(
     result = subprocess.run(command)
 
     result.check_returncode()
+
+
+def is_cog_dataset(src: rasterio.DatasetReader) -> bool:
+    """Return True if the open raster dataset is in COG layout.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+
+    Returns:
+        bool: True if in COG layout, False otherwise
+    """
+    return src.tags(ns="IMAGE_STRUCTURE").get("LAYOUT") == "COG"
+
+
+def is_tiled_with_overviews(src: rasterio.DatasetReader) -> bool:
+    """Return True if the open raster dataset is tiled and has internal overviews
+    (or is small enough to fit in a single tile).
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+
+    Returns:
+        bool: True if tiled with overviews, False otherwise
+    """
+    if not src.profile.get("tiled"):
+        return False
+    block_height, block_width = src.block_shapes[0]
+    fits_in_tile = src.width <= block_width and src.height <= block_height
+    return fits_in_tile or len(src.overviews(1)) > 0
+
+
+def get_dataset_stats(src: rasterio.DatasetReader, bidx: int) -> Stats:
+    """Return exact band stats from the full resolution band, read one block at a
+    time. Stats for a band without valid pixels are reported as zeros.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        bidx (int): Band index (1-based).
+
+    Returns:
+        Stats: Band stats.
+    """
+    count, total, total_sq = 0, 0.0, 0.0
+    minimum, maximum = np.inf, -np.inf
+    for _, window in src.block_windows(bidx):
+        valid = src.read(bidx, window=window, masked=True).compressed()
+        valid = valid.astype(np.float64)
+        valid = valid[np.isfinite(valid)]
+        if valid.size == 0:
+            continue
+        count += valid.size
+        total += valid.sum()
+        total_sq += np.square(valid).sum()
+        minimum = min(minimum, valid.min())
+        maximum = max(maximum, valid.max())
+
+    if count == 0:
+        logger.warning(f"No valid pixels found in band {bidx} of {src.name}")
+        return {"minimum": 0.0, "maximum": 0.0, "mean": 0.0, "stddev": 0.0}
+    mean = total / count
+    return {
+        "minimum": float(minimum),
+        "maximum": float(maximum),
+        "mean": float(mean),
+        "stddev": float(np.sqrt(max(total_sq / count - mean**2, 0))),
+    }
+
+
+def get_cached_stats(src: rasterio.DatasetReader, bidx: int) -> Stats | None:
+    """Return band stats stored in the dataset's STATISTICS_* metadata, if any.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        bidx (int): Band index (1-based).
+
+    Returns:
+        Stats | None: Stored band stats or None.
+    """
+    tags = src.tags(bidx)
+    keys = {
+        "minimum": "STATISTICS_MINIMUM",
+        "maximum": "STATISTICS_MAXIMUM",
+        "mean": "STATISTICS_MEAN",
+        "stddev": "STATISTICS_STDDEV",
+    }
+    if not all(key in tags for key in keys.values()):
+        return None
+    return {
+        "minimum": float(tags[keys["minimum"]]),
+        "maximum": float(tags[keys["maximum"]]),
+        "mean": float(tags[keys["mean"]]),
+        "stddev": float(tags[keys["stddev"]]),
+    }
+
+
+def get_stac_properties_from_dataset(
+    src: rasterio.DatasetReader, approx: bool = True
+) -> STACProperties:
+    """Return STAC raster:bands and eo:bands properties for an open raster dataset.
+    Mirrors the "stac" section of gdalinfo -approx_stats -json.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        approx (bool, optional): Compute approximate stats. Defaults to True.
+
+    Returns:
+        STACProperties: Raster band dtype, stats, nodata, and unit
+    """
+    band_stats: list[Stats] = [
+        {
+            "minimum": stats.min,
+            "maximum": stats.max,
+            "mean": stats.mean,
+            "stddev": stats.std,
+        }
+        for stats in src.stats(approx=approx)
+    ]
+
+    return build_stac_properties(src, band_stats)
+
+
+def get_stac_properties_from_array(
+    src: rasterio.DatasetReader, data: np.ma.MaskedArray, bins: int = 256
+) -> STACProperties:
+    """Return STAC raster:bands and eo:bands properties with stats and histograms
+    computed from band values that have already been read (e.g., an overview level).
+    Stats already stored in the dataset metadata are used instead when present.
+    Mirrors the "stac" section of gdalinfo -approx_stats -hist -json.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset the values were read from.
+        data (np.ma.MaskedArray): Band values with nodata masked.
+        bins (int, optional): Number of histogram buckets. Defaults to 256.
+
+    Returns:
+        STACProperties: Raster band dtype, stats, histogram, nodata, and unit
+    """
+    band_stats: list[Stats] = []
+    histograms: list[Histogram] = []
+    for idx, band in enumerate(data):
+        valid = band.compressed().astype(np.float64)
+        valid = valid[np.isfinite(valid)]
+        stats = get_cached_stats(src, idx + 1)
+        if stats is None and valid.size == 0:
+            # band is nodata at this level (or everywhere), use the stats GDAL
+            # computes from the full resolution band instead
+            stats = get_dataset_stats(src, idx + 1)
+        elif stats is None:
+            stats = {
+                "minimum": float(valid.min()),
+                "maximum": float(valid.max()),
+                "mean": float(valid.mean()),
+                "stddev": float(valid.std()),
+            }
+        band_stats.append(stats)
+        minimum, maximum = stats["minimum"], stats["maximum"]
+        buckets, _ = np.histogram(valid, bins=bins, range=(minimum, maximum))
+        histograms.append(
+            {
+                "count": bins,
+                "min": minimum,
+                "max": maximum,
+                "buckets": buckets.tolist(),
+            }
+        )
+
+    return build_stac_properties(src, band_stats, histograms)
+
+
+def build_stac_properties(
+    src: rasterio.DatasetReader,
+    band_stats: list[Stats],
+    histograms: list[Histogram] | None = None,
+) -> STACProperties:
+    """Combine band stats with the dtype, nodata, unit, and color interpretation
+    of an open raster dataset into STAC raster:bands and eo:bands properties.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        band_stats (list[Stats]): Stats for each band.
+        histograms (list[Histogram] | None, optional): Histogram for each band.
+
+    Returns:
+        STACProperties: Raster band dtype, stats, nodata, and unit
+    """
+    stac_properties: STACProperties = {"raster": [], "eo": []}
+    raster_bands: list = []
+    eo_bands: list = []
+    for idx, stats in enumerate(band_stats):
+        raster_band: dict = {"data_type": src.dtypes[idx], "stats": stats}
+        if histograms:
+            raster_band["histogram"] = histograms[idx]
+        if src.nodata is not None:
+            raster_band["nodata"] = "nan" if np.isnan(src.nodata) else src.nodata
+        if src.units[idx]:
+            raster_band["unit"] = src.units[idx]
+        raster_bands.append(raster_band)
+        eo_bands.append(
+            {
+                "name": f"b{idx + 1}",
+                "description": src.colorinterp[idx].name.capitalize(),
+            }
+        )
+
+    try:
+        stac_properties = STACPropertiesValidator.validate_python(
+            {"raster": raster_bands, "eo": eo_bands}
+        )
+    except ValidationError as e:
+        logger.error(e)
+
+    return stac_properties
+
+
+def get_preview_overview_level(src: rasterio.DatasetReader) -> int | None:
+    """Return the smallest overview level that is still at least as large as the
+    preview image. Returns None if the raster has no suitable overviews.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+
+    Returns:
+        int | None: Overview level for rasterio.open(overview_level=...) or None.
+    """
+    preview_width = max(1, round(src.width * PREVIEW_SCALE))
+    preview_height = max(1, round(src.height * PREVIEW_SCALE))
+    overview_level = None
+    # overview factors are ordered from largest to smallest resolution
+    for level, factor in enumerate(src.overviews(1)):
+        if (
+            src.width // factor >= preview_width
+            and src.height // factor >= preview_height
+        ):
+            overview_level = level
+    return overview_level
+
+
+def write_cog(
+    src: rasterio.DatasetReader, out_raster: Path, num_threads: int | None = None
+) -> None:
+    """Copies an open raster dataset to a new raster in COG layout. The COG driver
+    builds the internal overviews while writing.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        out_raster (Path): Path for output raster dataset
+        num_threads (int | None, optional): No. of CPUs to use. Defaults to None.
+    """
+    if not num_threads:
+        num_threads = int(multiprocessing.cpu_count() / 2)
+
+    rasterio.shutil.copy(
+        src,
+        out_raster,
+        driver="COG",
+        COMPRESS="DEFLATE",
+        NUM_THREADS=num_threads,
+        BIGTIFF="YES",
+    )
+
+
+def write_preview_image(
+    in_raster: Path, preview_out_path: Path, stac_props: STACProperties
+) -> None:
+    """Generates preview image for GeoTIFF data products in-process. Reads at the
+    preview size so GDAL serves the pixels from the closest overview level.
+
+    Args:
+        in_raster (Path): Path to input dataset.
+        preview_out_path (Path): Path for preview image.
+        stac_props (STACProperties): STAC properties with band stats.
+    """
+    band_count: int = len(stac_props["raster"])
+    indexes: list[int] = [1, 2, 3] if band_count > 2 else [1]
+
+    with rasterio.open(in_raster) as src:
+        width = max(1, round(src.width * PREVIEW_SCALE))
+        height = max(1, round(src.height * PREVIEW_SCALE))
+        data = src.read(
+            indexes,
+            out_shape=(len(indexes), height, width),
+            resampling=Resampling.nearest,
+            masked=True,
+        )
+        save_preview_image(data, preview_out_path, stac_props, src)
+
+
+def save_preview_image(
+    data: np.ma.MaskedArray,
+    preview_out_path: Path,
+    stac_props: STACProperties,
+    src: rasterio.DatasetReader,
+) -> None:
+    """Rescales band values to bytes with the STAC band stats and writes them to a
+    JPEG. Values larger than the preview size are downsampled (nearest neighbor).
+
+    Args:
+        data (np.ma.MaskedArray): Values for the one or three preview bands.
+        preview_out_path (Path): Path for preview image.
+        stac_props (STACProperties): STAC properties with band stats.
+        src (rasterio.DatasetReader): Full resolution dataset the values came from.
+    """
+    width = max(1, round(src.width * PREVIEW_SCALE))
+    height = max(1, round(src.height * PREVIEW_SCALE))
+    rows = np.linspace(0, data.shape[1] - 1, height).round().astype(int)
+    cols = np.linspace(0, data.shape[2] - 1, width).round().astype(int)
+
+    preview = np.zeros((data.shape[0], height, width), dtype=np.uint8)
+    for idx in range(data.shape[0]):
+        stats: Stats = stac_props["raster"][idx]["stats"]
+        band = data[idx][np.ix_(rows, cols)]
+        preview[idx] = scale_to_byte(band, stats["minimum"], stats["maximum"])
+
+    transform = src.transform * Affine.scale(src.width / width, src.height / height)
+
+    with rasterio.open(
+        preview_out_path,
+        "w",
+        driver="JPEG",
+        width=width,
+        height=height,
+        count=data.shape[0],
+        dtype="uint8",
+        crs=src.crs,
+        transform=transform,
+        QUALITY=75,
+    ) as dst:
+        dst.write(preview)
+
+
+def scale_to_byte(
+    band: np.ma.MaskedArray, minimum: float, maximum: float
+) -> np.ndarray:
+    """Linearly rescales band values from [minimum, maximum] to [0, 255]. Masked
+    (nodata) pixels are set to 0.
+
+    Args:
+        band (np.ma.MaskedArray): Band values.
+        minimum (float): Value mapped to 0.
+        maximum (float): Value mapped to 255.
+
+    Returns:
+        np.ndarray: Rescaled band as uint8.
+    """
+    value_range = maximum - minimum if maximum > minimum else 1
+    scaled = (band.astype(np.float32) - minimum) * (255 / value_range)
+    np.clip(scaled, 0, 255, out=scaled)
+    return np.ma.filled(scaled, 0).astype(np.uint8)
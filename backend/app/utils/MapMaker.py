@@ -1,44 +1,42 @@
 import os
-from typing import List
+from typing import List, Optional
 
 import geopandas as gpd
 import numpy as np
 from geojson_pydantic import Feature
 from shapely.geometry import MultiLineString, MultiPolygon, MultiPoint
-from staticmap import CircleMarker, Line, Polygon, StaticMap
+from staticmap import CircleMarker, Line, Polygon
 
-from app.core.config import settings
+from app.utils.basemap import (
+    BasemapTileCache,
+    CachedStaticMap,
+    get_basemap_tile_cache,
+)
 
 
 class MapMaker:
     """Used to create static map previews for display on frontend application."""
 
-    def __init__(self, features: list[Feature], outpath: str):
+    def __init__(
+        self,
+        features: list[Feature],
+        outpath: str,
+        tile_cache: Optional[BasemapTileCache] = None,
+    ):
         self.features = features
         self.outpath = outpath
         self.preview_img = ""
 
-        mapbox_access_token = os.environ.get("MAPBOX_ACCESS_TOKEN")
-
         size = (128, 128)
         padding = (16, 16)
-        if mapbox_access_token:
-            basemap = (
-                "https://api.mapbox.com/v4/mapbox.satellite/{z}/{x}/{y}.png?access_token="
-                + mapbox_access_token
-            )
-        else:
-            basemap = "https://basemap.nationalmap.gov/arcgis/rest/services/USGSImageryOnly/MapServer/tile/{z}/{y}/{x}"
-
-        headers = {"User-Agent": "StaticMap", "Referer": settings.API_DOMAIN}
 
-        self.map = StaticMap(
+        # Basemap tiles are read from the local tile cache when available
+        self.map = CachedStaticMap(
+            tile_cache=tile_cache or get_basemap_tile_cache(),
             width=size[0],
             height=size[1],
             padding_x=padding[0],
             padding_y=padding[1],
-            url_template=basemap,
-            headers=headers,
         )
 
         # Standardize geometry type for features
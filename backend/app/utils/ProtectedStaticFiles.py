@@ -1,9 +1,9 @@
-from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
 from starlette.types import Scope, Receive, Send
 from sqlalchemy.orm import Session
 
@@ -12,15 +12,25 @@ from app.utils.staticfiles import RangedStaticFiles
 from app import crud
 from app.api.deps import decode_jwt, can_read_project
 from app.db.session import SessionLocal
+from app.models.api_key import APIKey
 from app.models.data_product import DataProduct
-from app.schemas.api_key import APIKeyUpdate
+from app.utils.api_key_usage import (
+    api_key_usage,
+    flush_api_key_usage,
+    record_api_key_usage,
+)
+from app.utils.cache import (
+    StaticFileAccessKey,
+    static_file_access_cache,
+    sync_static_file_access_cache,
+)
 
 
 def verify_api_key_static_file_access(
     data_product: DataProduct, api_key: str, db: Session | None = None
 ) -> bool:
     """Verify if user associated with API key is authorized to access the
-    requested data product.
+    requested data product. Records usage of the API key if authorized.
 
     Args:
         data_product (DataProduct): Data product that was requested.
@@ -29,14 +39,40 @@ def verify_api_key_static_file_access(
     Returns:
         _type_: True if authorized to access, False otherwise.
     """
+    if not db:
+        with SessionLocal() as db:
+            return verify_api_key_static_file_access(data_product, api_key, db=db)
+    api_key_obj = get_authorized_api_key(db, data_product, api_key)
+    if api_key_obj:
+        # update last accessed date and total requests
+        record_api_key_usage(api_key_obj.id, db=db)
+        return True
+
+    return False
+
+
+def get_authorized_api_key(
+    db: Session, data_product: DataProduct, api_key: str
+) -> APIKey | None:
+    """Return API key if the user associated with it is authorized to access the
+    requested data product.
+
+    Args:
+        db (Session): Database session.
+        data_product (DataProduct): Data product that was requested.
+        api_key (str): API key included in request.
+
+    Raises:
+        HTTPException: Data product is deactivated.
+
+    Returns:
+        APIKey | None: API key if authorized to access, None otherwise.
+    """
     # check if data product is active
     if not data_product.is_active:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Data product not found"
         )
-    # create database session
-    if not db:
-        db = SessionLocal()
     # get api key db obj
     api_key_obj = crud.api_key.get_by_api_key(db, api_key)
 
@@ -49,15 +85,64 @@ def verify_api_key_static_file_access(
         if flight and can_read_project(
             db=db, project_id=flight.project_id, current_user=user
         ):
-            # update last accessed date and total requests
-            api_key_in = APIKeyUpdate(
-                last_used_at=datetime.now(timezone.utc),
-                total_requests=api_key_obj.total_requests + 1,
+            return api_key_obj
+
+    return None
+
+
+def get_static_file_access_key(request: Request) -> StaticFileAccessKey | None:
+    """Return key for caching the access decision for a static file request.
+    Files of the same data product share a key. Return None if the request path
+    cannot be parsed, the request is then always verified against the database.
+
+    Args:
+        request (Request): Client request for a static file.
+
+    Returns:
+        StaticFileAccessKey | None: Access decision key.
+    """
+    path = request.url.path
+    project_id: UUID | None = None
+    data_product_id: UUID | None = None
+    try:
+        if "/projects/" in path:
+            project_id = UUID(path.split("/projects/")[1].split("/")[0])
+        if "colorbars" in path:
+            resource = "colorbars"
+            data_product_id = UUID(Path(path).parents[1].name)
+        elif "data_products" in path:
+            resource = "data_products"
+            data_product_id = UUID(
+                Path(path.split("data_products")[1]).parents[-2].name
             )
-            crud.api_key.update(db, db_obj=api_key_obj, obj_in=api_key_in)
-            return True
+        elif project_id:
+            resource = "projects"
+        elif "users" in path:
+            resource = "users/" + path.split("/users/")[1].split("/")[0]
+        else:
+            return None
+    except (IndexError, ValueError):
+        return None
 
-    return False
+    # user id from access token, tokens that cannot be decoded are never cached
+    user_id: str | None = None
+    access_token = request.cookies.get("access_token")
+    if access_token:
+        try:
+            token_data = decode_jwt(access_token.split(" ")[1])
+        except (HTTPException, IndexError):
+            return None
+        if not token_data.sub:
+            return None
+        user_id = str(token_data.sub)
+
+    return StaticFileAccessKey(
+        api_key=request.query_params.get("API_KEY"),
+        user_id=user_id,
+        resource=resource,
+        project_id=project_id,
+        data_product_id=data_product_id,
+    )
 
 
 async def verify_static_file_access(request: Request) -> None:
@@ -66,6 +151,11 @@ async def verify_static_file_access(request: Request) -> None:
     restricted, verify client requesting a static file has access to the project
     associated with the file.
 
+    Decisions are cached for a short time per client and data product, so the
+    range requests made by COG and COPC viewers do not query the database. Cached
+    decisions are invalidated in every process, within the version check
+    interval, when permissions or active states change.
+
     Args:
         request (Request): Client request for a static file
 
@@ -74,6 +164,59 @@ async def verify_static_file_access(request: Request) -> None:
         HTTPException: User associated with access token not found
         HTTPException: User does not have access to project
     """
+    access_key = get_static_file_access_key(request)
+    decision = None
+    if access_key:
+        if static_file_access_cache.needs_sync():
+            await run_in_threadpool(sync_static_file_access_version)
+        decision = static_file_access_cache.get(access_key)
+    if isinstance(decision, HTTPException):
+        raise HTTPException(status_code=decision.status_code, detail=decision.detail)
+    if decision is None:
+        try:
+            decision = await run_in_threadpool(authorize_static_file_request, request)
+        except HTTPException as exception:
+            # cache denied access, except for authentication errors
+            if access_key and exception.status_code in (
+                status.HTTP_400_BAD_REQUEST,
+                status.HTTP_403_FORBIDDEN,
+                status.HTTP_404_NOT_FOUND,
+            ):
+                static_file_access_cache.set(access_key, exception)
+            raise
+        if access_key:
+            static_file_access_cache.set(access_key, decision)
+
+    if isinstance(decision, UUID):
+        # access granted by api key, usage is saved once flush interval elapses
+        if api_key_usage.record(decision):
+            await run_in_threadpool(flush_api_key_usage)
+
+
+def sync_static_file_access_version() -> None:
+    """Discards cached static file access decisions invalidated by any process."""
+    with SessionLocal() as db:
+        sync_static_file_access_cache(db)
+
+
+def authorize_static_file_request(request: Request) -> UUID | bool:
+    """Verify client requesting a static file is authorized to access it. Uses a
+    single database session for all queries.
+
+    Args:
+        request (Request): Client request for a static file
+
+    Raises:
+        HTTPException: Client not authorized to access static file.
+
+    Returns:
+        UUID | bool: ID of API key that granted access, otherwise True.
+    """
+    with SessionLocal() as db:
+        return check_static_file_access(db, request)
+
+
+def check_static_file_access(db: Session, request: Request) -> UUID | bool:
     # check if access to color bar's data product is restricted or public
     if "colorbars" in request.url.path:
         try:
@@ -84,18 +227,18 @@ async def verify_static_file_access(request: Request) -> None:
                 status_code=status.HTTP_404_NOT_FOUND, detail="data product not found"
             )
         file_permission = crud.file_permission.get_by_data_product(
-            SessionLocal(), file_id=data_product_id
+            db, file_id=data_product_id
         )
         # public, return file
         if file_permission and file_permission.is_public:
-            return
+            return True
 
     # check if access to requested data product is restricted or public
     if "data_products" in request.url.path and "colorbars" not in request.url.path:
         try:
             request_path = Path(request.url.path.split("data_products")[1])
             data_product_id = UUID(request_path.parents[-2].name)
-            data_product = crud.data_product.get(SessionLocal(), id=data_product_id)
+            data_product = crud.data_product.get(db, id=data_product_id)
         except (IndexError, ValueError):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="data product not found"
@@ -109,11 +252,12 @@ async def verify_static_file_access(request: Request) -> None:
         if "API_KEY" in request.query_params:
             api_key = request.query_params["API_KEY"]
             # check if owner of api key has access to requested static file
-            if verify_api_key_static_file_access(data_product, api_key):
-                return
+            api_key_obj = get_authorized_api_key(db, data_product, api_key)
+            if api_key_obj:
+                return api_key_obj.id
 
         file_permission = crud.file_permission.get_by_data_product(
-            SessionLocal(), file_id=data_product_id
+            db, file_id=data_product_id
         )
         # if file is deactivated return 404
         if file_permission and file_permission.file.is_active is False:
@@ -123,7 +267,7 @@ async def verify_static_file_access(request: Request) -> None:
             )
         # public, return file
         if file_permission and file_permission.is_public:
-            return
+            return True
 
     # restricted access authorization
     access_token = request.cookies.get("access_token")
@@ -131,7 +275,7 @@ async def verify_static_file_access(request: Request) -> None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED)
     token_data = decode_jwt(access_token.split(" ")[1])
     if token_data.sub:
-        user = crud.user.get(SessionLocal(), id=token_data.sub)
+        user = crud.user.get(db, id=token_data.sub)
     if not token_data.sub or not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="user not found"
@@ -146,7 +290,7 @@ async def verify_static_file_access(request: Request) -> None:
             )
         try:
             project = crud.project.get_user_project(
-                SessionLocal(), user_id=user.id, project_id=project_id_uuid
+                db, user_id=user.id, project_id=project_id_uuid
             )
             assert project
         except Exception:
@@ -167,6 +311,8 @@ async def verify_static_file_access(request: Request) -> None:
     else:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST)
 
+    return True
+
 
 class ProtectedStaticFiles(RangedStaticFiles):
     """Extend StatcFiles to include user access authorization."""
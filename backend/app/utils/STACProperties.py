@@ -25,9 +25,17 @@ class Stats(TypedDict):
     stddev: float
 
 
+class Histogram(TypedDict):
+    count: int
+    min: float
+    max: float
+    buckets: list[int]
+
+
 class STACRasterPropertiesBase(TypedDict):
     data_type: str
     stats: Stats
+    histogram: NotRequired[Histogram]
     nodata: NotRequired[Union[int, float, str, None]]
     unit: NotRequired[Union[str, None]]
 
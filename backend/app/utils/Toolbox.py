@@ -12,13 +12,25 @@ from app import crud, schemas
 from app.api.deps import get_db
 from app.core.celery_app import celery_app
 from app.utils.ImageProcessor import ImageProcessor
+from app.utils.toolbox.band_math import create_index_tool, run as band_math_run
 from app.utils.toolbox.exg import run as exg_run
 from app.utils.toolbox.ndvi import run as ndvi_run
+from app.utils.toolbox.point_cloud_grid import create_grid_tool
 
 logger = get_task_logger(__name__)
 
 
-AVAILABLE_TOOLS = {"exg": exg_run, "ndvi": ndvi_run}
+AVAILABLE_TOOLS = {
+    "band_math": band_math_run,
+    "chm": create_grid_tool("chm"),
+    "dsm": create_grid_tool("dsm"),
+    "dtm": create_grid_tool("dtm"),
+    "exg": exg_run,
+    "gndvi": create_index_tool("gndvi"),
+    "ndre": create_index_tool("ndre"),
+    "ndvi": ndvi_run,
+    "vari": create_index_tool("vari"),
+}
 
 
 class Toolbox:
@@ -83,7 +95,9 @@ class Toolbox:
         return self.out_raster, self.ip
 
     def convert_result_to_cog(self, tmp_out_raster: str, output_dir: str) -> None:
-        """Convert output from processing tool to COG layout.
+        """Convert output from processing tool to COG layout. Tool outputs are
+        already tiled with internal overviews and band stats, so they are moved into
+        place instead of being rewritten.
 
         Args:
             tmp_out_raster (str): Output from processing tool
@@ -93,7 +107,13 @@ class Toolbox:
             e: Raise exception if image processor fails
         """
         try:
-            self.ip = ImageProcessor(tmp_out_raster, output_dir=output_dir)
+            self.ip = ImageProcessor(
+                tmp_out_raster,
+                output_dir=output_dir,
+                engine="rasterio",
+                use_overviews=True,
+                keep_layout=True,
+            )
             self.ip.run()
         except Exception as e:
             logger.exception("Failed to process output raster")
@@ -0,0 +1,96 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+
+logger = logging.getLogger("__name__")
+
+
+class APIKeyUsage:
+    """Aggregates API key usage in memory. Counts are written to the database in
+    a single statement when flushed, instead of a commit per request.
+    """
+
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        # total requests and most recent request time since last flush
+        self.counts: Dict[UUID, int] = {}
+        self.last_used: Dict[UUID, datetime] = {}
+        self.last_flush = time.monotonic()
+        self.lock = threading.Lock()
+
+    def record(self, api_key_id: UUID) -> bool:
+        """Adds a request to the usage of an API key.
+
+        Args:
+            api_key_id (UUID): ID of API key used for request.
+
+        Returns:
+            bool: True if the flush interval has elapsed, False otherwise.
+        """
+        with self.lock:
+            self.counts[api_key_id] = self.counts.get(api_key_id, 0) + 1
+            self.last_used[api_key_id] = datetime.now(timezone.utc)
+            return time.monotonic() - self.last_flush >= self.flush_interval
+
+    def flush(self, db: Session) -> int:
+        """Writes aggregated usage to the database and resets the counts. Counts
+        are restored if the update fails, so they are included in the next flush.
+
+        Args:
+            db (Session): Database session.
+
+        Returns:
+            int: Number of API keys updated.
+        """
+        with self.lock:
+            counts, self.counts = self.counts, {}
+            last_used, self.last_used = self.last_used, {}
+            self.last_flush = time.monotonic()
+        if len(counts) == 0:
+            return 0
+        try:
+            crud.api_key.increment_usage(db, counts=counts, last_used=last_used)
+        except Exception:
+            with self.lock:
+                for api_key_id, count in counts.items():
+                    self.counts[api_key_id] = self.counts.get(api_key_id, 0) + count
+                    self.last_used.setdefault(api_key_id, last_used[api_key_id])
+            raise
+        return len(counts)
+
+
+api_key_usage = APIKeyUsage(flush_interval=settings.API_KEY_USAGE_FLUSH_INTERVAL)
+
+
+def record_api_key_usage(api_key_id: UUID, db: Optional[Session] = None) -> None:
+    """Records a request made with an API key. Flushes aggregated usage to the
+    database once the flush interval has elapsed.
+
+    Args:
+        api_key_id (UUID): ID of API key used for request.
+        db (Optional[Session], optional): Database session. Defaults to None.
+    """
+    if api_key_usage.record(api_key_id):
+        flush_api_key_usage(db)
+
+
+def flush_api_key_usage(db: Optional[Session] = None) -> None:
+    """Writes aggregated API key usage to the database."""
+    try:
+        if db:
+            api_key_usage.flush(db)
+        else:
+            with SessionLocal() as db:
+                api_key_usage.flush(db)
+    except Exception:
+        logger.exception("Unable to update API key usage")
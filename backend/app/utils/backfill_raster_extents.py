@@ -0,0 +1,82 @@
+import argparse
+import logging
+import os
+
+from sqlalchemy import select, and_
+from sqlalchemy.orm import Session
+from tqdm import tqdm
+
+from app import crud
+from app.crud.crud_data_product import is_raster
+from app.db.session import SessionLocal
+from app.models.data_product import DataProduct
+
+logger = logging.getLogger("__name__")
+
+
+def run(db: Session, check_only: bool) -> None:
+    # query statement for all active data products without a stored bounding box
+    data_product_query = select(DataProduct).where(
+        and_(
+            DataProduct.data_type != "point_cloud",
+            DataProduct.is_active,
+            DataProduct.bbox.is_(None),
+        )
+    )
+    # perform query
+    with db as session:
+        data_products = session.scalars(data_product_query).all()
+
+    # track rasters missing a stored extent
+    missing_extents = 0
+    failed_extents = 0
+    for data_product in tqdm(data_products):
+        if not is_raster(data_product) or not os.path.exists(data_product.filepath):
+            continue
+        missing_extents += 1
+        if not check_only:
+            # store bounding box, crs, resolution, and footprint
+            try:
+                crud.data_product.update_raster_extent(
+                    db, data_product_id=data_product.id
+                )
+            except Exception:
+                logger.exception(
+                    f"Unable to store raster extent for data product: {data_product.id}"
+                )
+                failed_extents += 1
+
+    if check_only:
+        print(f"Missing raster extents for {missing_extents} data products.")
+    else:
+        print(
+            f"Stored raster extents for {missing_extents - failed_extents} of "
+            f"{missing_extents} data products."
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Stores bounding box, CRS, resolution, and footprint for raster data "
+            "products processed before these were stored in the database."
+        )
+    )
+    parser.add_argument(
+        "--check-only",
+        type=bool,
+        help="Only returns count of missing raster extents. Does not update records.",
+        default=0,
+        required=False,
+    )
+
+    args = parser.parse_args()
+
+    try:
+        # get database session
+        db = SessionLocal()
+        run(db, check_only=args.check_only)
+    except Exception as e:
+        print(str(e))
+    finally:
+        db.close()
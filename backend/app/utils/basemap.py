@@ -0,0 +1,271 @@
+import argparse
+import hashlib
+import io
+import logging
+import math
+import os
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from PIL import Image
+from staticmap import StaticMap
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+logger = logging.getLogger("__name__")
+
+USGS_IMAGERY_URL = (
+    "https://basemap.nationalmap.gov/arcgis/rest/services/USGSImageryOnly/MapServer"
+    "/tile/{z}/{y}/{x}"
+)
+MAPBOX_SATELLITE_URL = (
+    "https://api.mapbox.com/v4/mapbox.satellite/{z}/{x}/{y}.png?access_token={token}"
+)
+
+# Basemap tiles kept in memory by each worker
+BASEMAP_TILE_MEMORY_SIZE = 512
+# Seconds to wait for a basemap tile
+BASEMAP_TILE_TIMEOUT = 10
+TILE_SIZE = 256
+# Query parameters with credentials that do not change the tiles served
+BASEMAP_URL_SECRET_PARAMS = {"access_token", "api_key", "apikey", "key", "token"}
+
+
+def get_basemap_url_template() -> str:
+    """Return Mapbox satellite URL if an access token is set, otherwise USGS
+    imagery URL."""
+    mapbox_access_token = settings.MAPBOX_ACCESS_TOKEN or os.environ.get(
+        "MAPBOX_ACCESS_TOKEN"
+    )
+    if mapbox_access_token:
+        return MAPBOX_SATELLITE_URL.replace("{token}", mapbox_access_token)
+    return USGS_IMAGERY_URL
+
+
+def get_basemap_provider_id(url_template: str) -> str:
+    """Return ID for the basemap served by a URL template. Credentials in the
+    query string are ignored, so the ID does not change when a token is rotated.
+    """
+    url = urlsplit(url_template)
+    query = [
+        (key, value)
+        for key, value in parse_qsl(url.query, keep_blank_values=True)
+        if key.lower() not in BASEMAP_URL_SECRET_PARAMS
+    ]
+    url_without_secrets = urlunsplit(url._replace(query=urlencode(query)))
+    return hashlib.sha256(url_without_secrets.encode()).hexdigest()[:16]
+
+
+@lru_cache(maxsize=1)
+def get_blank_tile() -> bytes:
+    """Return transparent PNG used in place of basemap tiles that are not
+    available, so previews are rendered over the map background."""
+    buffer = io.BytesIO()
+    Image.new("RGBA", (TILE_SIZE, TILE_SIZE), (0, 0, 0, 0)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+class BasemapTileCache:
+    """XYZ basemap tile cache stored on disk as {provider_id}/{z}/{x}/{y}.png, so
+    tiles from different basemaps are not mixed. Tiles missing from the cache are
+    requested from the basemap server unless offline, and a blank tile is returned
+    if a tile cannot be found or downloaded.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str],
+        url_template: str,
+        offline: bool = False,
+        timeout: float = BASEMAP_TILE_TIMEOUT,
+    ) -> None:
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.url_template = url_template
+        self.provider_id = get_basemap_provider_id(url_template)
+        self.offline = offline
+        self.timeout = timeout
+        self.memory = TTLCache(maxsize=BASEMAP_TILE_MEMORY_SIZE)
+        self.session = requests.Session()
+        self.session.headers.update(
+            {"User-Agent": "StaticMap", "Referer": settings.API_DOMAIN}
+        )
+
+    def get_tile(self, z: int, x: int, y: int) -> bytes:
+        """Return basemap tile from memory, disk, or basemap server, in that order.
+
+        Args:
+            z (int): Zoom level.
+            x (int): Tile column.
+            y (int): Tile row.
+
+        Returns:
+            bytes: PNG or JPEG tile, or a blank tile if unavailable.
+        """
+        tile = self.memory.get((z, x, y))
+        if tile is None and self.cache_dir:
+            tile = self.read(z, x, y)
+        if tile is None and not self.offline:
+            tile = self.fetch(z, x, y)
+            if tile is not None and self.cache_dir:
+                self.write(z, x, y, tile)
+        if tile is None:
+            return get_blank_tile()
+        self.memory.set((z, x, y), tile)
+        return tile
+
+    def get_tile_path(self, z: int, x: int, y: int) -> Path:
+        assert self.cache_dir
+        return self.cache_dir / self.provider_id / str(z) / str(x) / f"{y}.png"
+
+    def read(self, z: int, x: int, y: int) -> Optional[bytes]:
+        try:
+            return self.get_tile_path(z, x, y).read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.exception("Unable to read cached basemap tile")
+            return None
+
+    def write(self, z: int, x: int, y: int, tile: bytes) -> None:
+        tile_path = self.get_tile_path(z, x, y)
+        try:
+            tile_path.parent.mkdir(parents=True, exist_ok=True)
+            # write to temporary file first so partial tiles are never read
+            with tempfile.NamedTemporaryFile(
+                dir=tile_path.parent, suffix=".tmp", delete=False
+            ) as tmp_file:
+                tmp_file.write(tile)
+            os.replace(tmp_file.name, tile_path)
+        except OSError:
+            logger.exception("Unable to write cached basemap tile")
+
+    def fetch(self, z: int, x: int, y: int) -> Optional[bytes]:
+        url = self.url_template.format(z=z, x=x, y=y)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            logger.warning(f"Unable to request basemap tile {z}/{x}/{y}")
+            return None
+        if response.status_code != 200:
+            logger.warning(
+                f"Basemap tile {z}/{x}/{y} request failed [{response.status_code}]"
+            )
+            return None
+        return response.content
+
+
+class CachedStaticMap(StaticMap):
+    """StaticMap that reads basemap tiles through a BasemapTileCache instead of
+    requesting every tile from the basemap server."""
+
+    def __init__(self, tile_cache: BasemapTileCache, **kwargs) -> None:
+        super().__init__(url_template="{z}/{x}/{y}", **kwargs)
+        self.tile_cache = tile_cache
+
+    def get(self, url: str, **kwargs) -> Tuple[int, bytes]:
+        z, x, y = (int(value) for value in url.split("/"))
+        return 200, self.tile_cache.get_tile(z, x, y)
+
+
+@lru_cache(maxsize=1)
+def get_basemap_tile_cache() -> BasemapTileCache:
+    """Return basemap tile cache shared by map previews rendered in a worker.
+    Previews are rendered from cached tiles only while running tests."""
+    return BasemapTileCache(
+        cache_dir=settings.BASEMAP_TILE_CACHE_DIR,
+        url_template=get_basemap_url_template(),
+        offline=settings.BASEMAP_OFFLINE or os.environ.get("RUNNING_TESTS") == "1",
+    )
+
+
+def lon_lat_to_tile(lon: float, lat: float, z: int) -> Tuple[int, int]:
+    """Return XYZ tile column and row containing a WGS84 coordinate."""
+    lat = max(min(lat, 85.0511), -85.0511)
+    n = 2**z
+    x = int((lon + 180.0) / 360.0 * n)
+    y = int((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def get_tiles_in_bounds(
+    bounds: Tuple[float, float, float, float], min_zoom: int, max_zoom: int
+) -> Iterator[Tuple[int, int, int]]:
+    """Yield XYZ tiles covering WGS84 bounds (west, south, east, north)."""
+    west, south, east, north = bounds
+    for z in range(min_zoom, max_zoom + 1):
+        x_min, y_min = lon_lat_to_tile(west, north, z)
+        x_max, y_max = lon_lat_to_tile(east, south, z)
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                yield z, x, y
+
+
+def seed_basemap_tiles(
+    tile_cache: BasemapTileCache,
+    bounds: Tuple[float, float, float, float],
+    min_zoom: int,
+    max_zoom: int,
+) -> int:
+    """Downloads basemap tiles covering bounds into the tile cache so previews
+    can be rendered without requesting tiles.
+
+    Args:
+        tile_cache (BasemapTileCache): Tile cache with a cache directory.
+        bounds (Tuple[float, float, float, float]): West, south, east, north.
+        min_zoom (int): Minimum zoom level.
+        max_zoom (int): Maximum zoom level.
+
+    Returns:
+        int: Number of tiles in cache for bounds.
+    """
+    seeded = 0
+    for z, x, y in get_tiles_in_bounds(bounds, min_zoom, max_zoom):
+        if tile_cache.get_tile_path(z, x, y).exists():
+            seeded += 1
+            continue
+        tile = tile_cache.fetch(z, x, y)
+        if tile is not None:
+            tile_cache.write(z, x, y, tile)
+            seeded += 1
+    return seeded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Downloads basemap tiles used by map previews into a cache."
+    )
+    parser.add_argument(
+        "--bbox",
+        type=float,
+        nargs=4,
+        metavar=("WEST", "SOUTH", "EAST", "NORTH"),
+        help="WGS84 bounding box of tiles to download.",
+        required=True,
+    )
+    parser.add_argument("--min-zoom", type=int, help="Minimum zoom.", default=0)
+    parser.add_argument("--max-zoom", type=int, help="Maximum zoom.", default=12)
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Tile cache directory. Defaults to BASEMAP_TILE_CACHE_DIR.",
+        default=settings.BASEMAP_TILE_CACHE_DIR,
+    )
+
+    args = parser.parse_args()
+
+    if not args.cache_dir:
+        parser.error("--cache-dir or BASEMAP_TILE_CACHE_DIR is required")
+
+    tile_cache = BasemapTileCache(
+        cache_dir=args.cache_dir, url_template=get_basemap_url_template()
+    )
+    seeded = seed_basemap_tiles(
+        tile_cache, tuple(args.bbox), min_zoom=args.min_zoom, max_zoom=args.max_zoom
+    )
+    print(f"Cached {seeded} basemap tiles.")
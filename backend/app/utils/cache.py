@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.static_file_access_version import static_file_access_version
+
+
+class TTLCache:
+    """Thread-safe, size-bounded cache with least recently used eviction. Entries
+    expire ttl seconds after they are set. A ttl of 0 or less disables expiration.
+    If maxbytes is greater than 0, entries are also evicted until the total of
+    sizeof(value) for all entries is at most maxbytes.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float = 0,
+        maxbytes: int = 0,
+        sizeof: Callable[[Any], int] = len,
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.nbytes = 0
+        self.entries: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return cached value for key or default if missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value, _ = entry
+            if expires_at and expires_at <= time.monotonic():
+                self.remove(key)
+                return default
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Add value to cache. Evicts least recently used entries if full."""
+        expires_at = time.monotonic() + self.ttl if self.ttl > 0 else 0
+        nbytes = self.sizeof(value) if self.maxbytes > 0 else 0
+        if self.maxbytes > 0 and nbytes > self.maxbytes:
+            # value would evict every other entry and still not fit
+            self.pop(key)
+            return
+        with self.lock:
+            if key in self.entries:
+                self.remove(key)
+            self.entries[key] = (expires_at, value, nbytes)
+            self.nbytes += nbytes
+            while len(self.entries) > self.maxsize or (
+                self.maxbytes > 0 and self.nbytes > self.maxbytes
+            ):
+                self.remove(next(iter(self.entries)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key from cache and return its value."""
+        with self.lock:
+            if key not in self.entries:
+                return default
+            return self.remove(key)
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Remove entries with keys matching predicate, or all entries if no
+        predicate is provided.
+
+        Args:
+            predicate (Optional[Callable[[Hashable], bool]], optional): Key filter.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self.lock:
+            if predicate is None:
+                removed = len(self.entries)
+                self.clear()
+                return removed
+            keys = [key for key in self.entries if predicate(key)]
+            for key in keys:
+                self.remove(key)
+            return len(keys)
+
+    def remove(self, key: Hashable) -> Any:
+        """Remove entry and return its value. Caller must hold the lock."""
+        _, value, nbytes = self.entries.pop(key)
+        self.nbytes -= nbytes
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries. Caller must hold the lock."""
+        self.entries.clear()
+        self.nbytes = 0
+
+
+class StaticFileAccessKey(NamedTuple):
+    """Client and resource a static file access decision was made for."""
+
+    api_key: Optional[str]
+    user_id: Optional[str]
+    resource: str
+    project_id: Optional[UUID]
+    data_product_id: Optional[UUID]
+
+
+class VersionedTTLCache(TTLCache):
+    """TTLCache that is cleared when a version stamp shared by all processes
+    changes. Processes that invalidate entries also increment the version, so
+    the entries are discarded by every process once it checks the version again,
+    which it does at most every check_interval seconds.
+    """
+
+    def __init__(self, maxsize: int, ttl: float = 0, check_interval: float = 0) -> None:
+        super().__init__(maxsize, ttl)
+        self.check_interval = check_interval
+        self.checked_at = 0.0
+        self.version: Optional[int] = None
+
+    def needs_sync(self) -> bool:
+        """Return True if the shared version should be checked again."""
+        return (
+            self.version is None
+            or time.monotonic() - self.checked_at >= self.check_interval
+        )
+
+    def sync(self, version: int) -> None:
+        """Clear all entries if cache was filled under a different version."""
+        with self.lock:
+            self.checked_at = time.monotonic()
+            if version != self.version:
+                self.clear()
+                self.version = version
+
+    def advance(self, version: int) -> None:
+        """Adopt a version this process incremented itself. Entries are kept if
+        no other process incremented the version since the last sync."""
+        with self.lock:
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+
+# static file access decisions, reused for the range requests a viewer makes
+# while displaying a data product
+static_file_access_cache = VersionedTTLCache(
+    maxsize=settings.STATIC_FILE_ACCESS_CACHE_SIZE,
+    ttl=settings.STATIC_FILE_ACCESS_CACHE_TTL,
+    check_interval=settings.STATIC_FILE_ACCESS_VERSION_CHECK_INTERVAL,
+)
+
+
+def get_static_file_access_version(db: Session) -> int:
+    """Return shared version of static file access decisions."""
+    # last_value is only a used version after the first nextval call
+    statement = text(
+        "SELECT CASE WHEN is_called THEN last_value ELSE 0 END "
+        f"FROM {static_file_access_version.name}"
+    )
+    with db as session:
+        return session.execute(statement).scalar_one()
+
+
+def sync_static_file_access_cache(db: Session) -> None:
+    """Discards cached static file access decisions if another process
+    invalidated decisions since the shared version was last checked.
+
+    Args:
+        db (Session): Database session.
+    """
+    static_file_access_cache.sync(get_static_file_access_version(db))
+
+
+def invalidate_static_file_access(
+    db: Session,
+    project_id: Optional[UUID] = None,
+    data_product_id: Optional[UUID] = None,
+    api_key: Optional[str] = None,
+) -> None:
+    """Removes cached static file access decisions for a project, data product,
+    or API key. Called when file permissions, project membership, or the active
+    state of a project, data product, or API key changes. The shared version is
+    incremented so other processes discard their cached decisions too.
+
+    Args:
+        db (Session): Database session.
+        project_id (Optional[UUID], optional): Project ID. Defaults to None.
+        data_product_id (Optional[UUID], optional): Data product ID. Defaults to None.
+        api_key (Optional[str], optional): API key. Defaults to None.
+    """
+
+    def is_affected(key: StaticFileAccessKey) -> bool:
+        return (
+            (project_id is not None and key.project_id == project_id)
+            or (data_product_id is not None and key.data_product_id == data_product_id)
+            or (api_key is not None and key.api_key == api_key)
+        )
+
+    static_file_access_cache.invalidate(is_affected)
+    with db as session:
+        version = session.execute(
+            select(static_file_access_version.next_value())
+        ).scalar_one()
+    static_file_access_cache.advance(version)
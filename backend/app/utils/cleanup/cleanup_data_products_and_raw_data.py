@@ -76,6 +76,12 @@ def cleanup_data_products_and_raw_data(db: Session, check_only: bool = False) ->
             stats["space_freed_up"] += dir_size
             # delete database records for deactivated data product
             if not check_only:
+                # remove freed up space from project disk usage
+                crud.project.add_disk_usage(
+                    db,
+                    project_id=deactivated_data_product.flight.project_id,
+                    delta=-dir_size,
+                )
                 crud.data_product.remove(db, id=deactivated_data_product.id)
     # remove deactivated raw data
     with db as session:
@@ -88,6 +94,10 @@ def cleanup_data_products_and_raw_data(db: Session, check_only: bool = False) ->
             stats["space_freed_up"] += dir_size
             # delete database records for deactivated raw data
             if not check_only:
+                # remove freed up space from project disk usage
+                crud.project.add_disk_usage(
+                    db, project_id=deactivated_raw.flight.project_id, delta=-dir_size
+                )
                 crud.raw_data.remove(db, id=deactivated_raw.id)
 
     return stats
@@ -55,6 +55,10 @@ def cleanup_flights(db: Session, check_only: bool = False) -> Dict:
             stats["space_freed_up"] += dir_size
             # delete database records for deactivated flight
             if not check_only:
+                # remove freed up space from project disk usage
+                crud.project.add_disk_usage(
+                    db, project_id=deactivated_flight.project_id, delta=-dir_size
+                )
                 crud.flight.remove(db, id=deactivated_flight.id)
 
     return stats
@@ -0,0 +1,210 @@
+import argparse
+import logging
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import crud
+from app.api.utils import get_static_dir
+from app.crud.crud_admin import get_static_directory_size
+from app.db.session import SessionLocal
+from app.models.project import Project
+
+
+logger = logging.getLogger("__name__")
+
+
+def get_entry_size(entry: os.DirEntry) -> int:
+    """Return size of a file or, for a directory, the size of its contents."""
+    if entry.is_dir(follow_symlinks=False):
+        return get_static_directory_size(entry.path)
+    if entry.is_file(follow_symlinks=False):
+        return entry.stat(follow_symlinks=False).st_size
+    return 0
+
+
+def scan_directory(
+    directory: str, skip: Optional[str] = None
+) -> Tuple[int, List[os.DirEntry]]:
+    """Return size of a directory's contents, excluding the sub-directory named
+    skip, and the entries of the skipped sub-directory."""
+    total_size = 0
+    skipped_entries: List[os.DirEntry] = []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name == skip and entry.is_dir(follow_symlinks=False):
+                    with os.scandir(entry.path) as sub_entries:
+                        skipped_entries.extend(sub_entries)
+                else:
+                    total_size += get_entry_size(entry)
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return total_size, skipped_entries
+
+
+def scan_project_dir(project_dir: str) -> Tuple[int, Dict[UUID, int]]:
+    """Measures a project directory in a single pass and returns its size along
+    with the size of each data product directory found inside it.
+
+    Args:
+        project_dir (str): Path to project's static file directory.
+
+    Returns:
+        Tuple[int, Dict[UUID, int]]: Size of project directory in bytes and size
+        of each data product directory in bytes.
+    """
+    data_product_disk_usage: Dict[UUID, int] = {}
+    total_size, flights = scan_directory(project_dir, skip="flights")
+    for flight in flights:
+        if not flight.is_dir(follow_symlinks=False):
+            total_size += get_entry_size(flight)
+            continue
+        flight_size, data_products = scan_directory(flight.path, skip="data_products")
+        total_size += flight_size
+        for data_product in data_products:
+            data_product_size = get_entry_size(data_product)
+            total_size += data_product_size
+            try:
+                data_product_disk_usage[UUID(data_product.name)] = data_product_size
+            except ValueError:
+                continue
+    return total_size, data_product_disk_usage
+
+
+def reconcile_project(db: Session, project_id: UUID, static_dir: str) -> int:
+    """Replaces the incrementally updated disk usage of a project and its data
+    products with sizes measured from the project directory.
+
+    Args:
+        db (Session): Database session.
+        project_id (UUID): ID of project.
+        static_dir (str): Root static files directory.
+
+    Returns:
+        int: Size of project directory in bytes.
+    """
+    project_dir = os.path.join(static_dir, "projects", str(project_id))
+    disk_usage, data_product_disk_usage = scan_project_dir(project_dir)
+    crud.project.set_disk_usage(
+        db,
+        project_id=project_id,
+        disk_usage=disk_usage,
+        data_product_disk_usage=data_product_disk_usage,
+    )
+    return disk_usage
+
+
+def reconcile_projects(
+    project_ids: List[UUID], static_dir: str, num_workers: int = 4
+) -> int:
+    """Reconciles disk usage for projects in parallel. Each worker thread uses
+    its own database session.
+
+    Args:
+        project_ids (List[UUID]): IDs of projects to reconcile.
+        static_dir (str): Root static files directory.
+        num_workers (int, optional): Number of worker threads. Defaults to 4.
+
+    Returns:
+        int: Number of projects reconciled.
+    """
+
+    def reconcile(project_id: UUID) -> bool:
+        try:
+            with SessionLocal() as db:
+                reconcile_project(db, project_id, static_dir)
+            return True
+        except Exception:
+            logger.exception(f"Unable to reconcile disk usage for project {project_id}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        return sum(executor.map(reconcile, project_ids))
+
+
+def reconcile_disk_usage(
+    db: Session, shard: int = 0, num_shards: int = 1, num_workers: int = 4
+) -> int:
+    """Reconciles disk usage for one shard of all projects. Projects are split
+    into shards by ID so reconciliation can be spread across runs or workers.
+
+    Args:
+        db (Session): Database session.
+        shard (int, optional): Shard to reconcile. Defaults to 0.
+        num_shards (int, optional): Total number of shards. Defaults to 1.
+        num_workers (int, optional): Number of worker threads. Defaults to 4.
+
+    Returns:
+        int: Number of projects reconciled.
+    """
+    with db as session:
+        project_ids = session.scalars(select(Project.id)).all()
+    shard_project_ids = [
+        project_id for project_id in project_ids if project_id.int % num_shards == shard
+    ]
+    return reconcile_projects(shard_project_ids, get_static_dir(), num_workers)
+
+
+def get_static_dir_usage(db: Session, static_dir: str) -> Tuple[int, int, int]:
+    """Returns disk usage statistics for the static directory like get_disk_usage,
+    but the space used by projects is read from the database instead of walking
+    every project directory. Projects that have not been measured yet are
+    reconciled first.
+
+    Args:
+        db (Session): Database session.
+        static_dir (str): The path to the static directory.
+
+    Returns:
+        Tuple[int, int, int]: Total disk space, disk space used by the static
+        directory, and free disk space, all in bytes.
+    """
+    total, _, free = shutil.disk_usage(static_dir)
+
+    _, unmeasured_project_ids = crud.project.get_total_disk_usage(db)
+    if len(unmeasured_project_ids) > 0:
+        reconcile_projects(unmeasured_project_ids, static_dir)
+    used_by_projects, _ = crud.project.get_total_disk_usage(db)
+
+    # files outside of project directories are still measured
+    used_outside_projects, _ = scan_directory(static_dir, skip="projects")
+
+    return total, used_by_projects + used_outside_projects, free
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Measures project and data product directories and replaces the disk "
+            "usage stored in the database."
+        )
+    )
+    parser.add_argument(
+        "--shard", type=int, help="Shard of projects to reconcile.", default=0
+    )
+    parser.add_argument(
+        "--num-shards", type=int, help="Total number of shards.", default=1
+    )
+    parser.add_argument(
+        "--workers", type=int, help="Number of worker threads.", default=4
+    )
+
+    args = parser.parse_args()
+
+    try:
+        # get database session
+        db = SessionLocal()
+        reconciled = reconcile_disk_usage(
+            db, shard=args.shard, num_shards=args.num_shards, num_workers=args.workers
+        )
+        print(f"Reconciled disk usage for {reconciled} projects.")
+    except Exception as e:
+        print(str(e))
+    finally:
+        db.close()
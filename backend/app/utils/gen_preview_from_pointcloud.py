@@ -1,126 +1,193 @@
-import io
+import math
 from pathlib import Path
-
-import matplotlib.pyplot as plt
-import matplotlib.image as mpimg
+from typing import Optional, Tuple
 
 import laspy as lp
 import numpy as np
+from PIL import Image
+
+
+# Longest side of preview image in pixels
+PREVIEW_SIZE = 1024
+# Points kept from point clouds that are not COPC, which are streamed in full
+PREVIEW_MAX_POINTS = 2_000_000
+# Points per chunk when streaming point clouds that are not COPC
+CHUNK_SIZE = 1_000_000
+# Color ramp (low to high elevation) for point clouds without color
+ELEVATION_COLORS = np.array(
+    [
+        [59, 76, 192],
+        [141, 176, 254],
+        [221, 221, 221],
+        [244, 154, 123],
+        [180, 4, 38],
+    ],
+    dtype=np.float64,
+)
+
+
+def get_preview_shape(
+    mins: np.ndarray, maxs: np.ndarray, size: int = PREVIEW_SIZE
+) -> Tuple[int, int, float]:
+    """Return height and width of preview image and the ground size of a pixel
+    for a point cloud's XY extent."""
+    extent_x = max(float(maxs[0] - mins[0]), 1e-9)
+    extent_y = max(float(maxs[1] - mins[1]), 1e-9)
+    pixel_size = max(extent_x, extent_y) / size
+    width = max(1, min(size, math.ceil(extent_x / pixel_size)))
+    height = max(1, min(size, math.ceil(extent_y / pixel_size)))
+    return height, width, pixel_size
+
+
+def read_copc_points(
+    input_las_path: Path, size: int = PREVIEW_SIZE
+) -> Tuple[lp.ScaleAwarePointRecord, lp.LasHeader]:
+    """Reads only the octree levels of a COPC file with a point spacing close to
+    the preview's pixel size, so memory use depends on the preview size rather
+    than the size of the point cloud."""
+    with lp.CopcReader.open(
+        str(input_las_path),
+        decompression_selection=lp.DecompressionSelection.XY_RETURNS_CHANNEL
+        | lp.DecompressionSelection.Z
+        | lp.DecompressionSelection.RGB,
+    ) as reader:
+        _, _, pixel_size = get_preview_shape(
+            reader.header.mins, reader.header.maxs, size
+        )
+        return reader.query(resolution=pixel_size), reader.header
+
+
+def read_decimated_points(
+    input_las_path: Path, max_points: int = PREVIEW_MAX_POINTS
+) -> Tuple[lp.ScaleAwarePointRecord, lp.LasHeader]:
+    """Streams a las/laz file in chunks and keeps every nth point, so at most
+    max_points points are held in memory."""
+    with lp.open(str(input_las_path)) as reader:
+        step = max(1, math.ceil(reader.header.point_count / max_points))
+        # copy every nth point so chunks are released after they are decimated
+        chunks = [
+            chunk.array[::step].copy()
+            for chunk in reader.chunk_iterator(CHUNK_SIZE)
+            if len(chunk)
+        ]
+        points = lp.ScaleAwarePointRecord.empty(header=reader.header)
+        if chunks:
+            points = lp.ScaleAwarePointRecord(
+                np.concatenate(chunks),
+                reader.header.point_format,
+                reader.header.scales,
+                reader.header.offsets,
+            )
+        return points, reader.header
+
+
+def get_point_colors(points: lp.ScaleAwarePointRecord, z: np.ndarray) -> np.ndarray:
+    """Return 8-bit RGB color for each point. Point clouds without color are
+    colored by elevation."""
+    dimensions = set(points.point_format.dimension_names)
+    if {"red", "green", "blue"} <= dimensions and len(points) > 0:
+        rgb = np.stack(
+            [np.asarray(points[band]) for band in ("red", "green", "blue")], axis=1
+        )
+        if rgb.max() > rgb.min():
+            # colors are stored as 16-bit values, but some writers use 8-bit values
+            if rgb.max() > 255:
+                rgb = rgb >> 8
+            return rgb.astype(np.uint8)
+
+    z_min, z_max = (z.min(), z.max()) if len(z) > 0 else (0.0, 0.0)
+    scaled = (z - z_min) / (z_max - z_min) if z_max > z_min else np.zeros_like(z)
+    stops = np.linspace(0, 1, len(ELEVATION_COLORS))
+    return np.stack(
+        [np.interp(scaled, stops, ELEVATION_COLORS[:, band]) for band in range(3)],
+        axis=1,
+    ).astype(np.uint8)
+
+
+def rasterize_top_down(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    colors: np.ndarray,
+    mins: np.ndarray,
+    maxs: np.ndarray,
+    size: int = PREVIEW_SIZE,
+) -> np.ndarray:
+    """Renders a top-down RGBA image of points, where each pixel takes the color
+    of its highest point and pixels without points are transparent.
 
-
-def create_preview_image(input_las_path: Path, preview_out_path: Path) -> None:
-    """Generates preview image for point cloud data products.
+    Args:
+        x (np.ndarray): X coordinates.
+        y (np.ndarray): Y coordinates.
+        z (np.ndarray): Z coordinates.
+        colors (np.ndarray): 8-bit RGB color of each point.
+        mins (np.ndarray): Minimum XY of point cloud.
+        maxs (np.ndarray): Maximum XY of point cloud.
+        size (int, optional): Longest side of image. Defaults to PREVIEW_SIZE.
+
+    Returns:
+        np.ndarray: RGBA image with shape (height, width, 4).
+    """
+    height, width, pixel_size = get_preview_shape(mins, maxs, size)
+    image = np.zeros((height, width, 4), dtype=np.uint8)
+    if len(x) == 0:
+        return image
+
+    cols = np.clip(((x - mins[0]) / pixel_size).astype(np.int64), 0, width - 1)
+    rows = np.clip(((maxs[1] - y) / pixel_size).astype(np.int64), 0, height - 1)
+    pixels = rows * width + cols
+
+    # sort by pixel, then elevation, and keep the last (highest) point per pixel
+    order = np.lexsort((z, pixels))
+    pixels = pixels[order]
+    highest = np.ones(len(pixels), dtype=bool)
+    highest[:-1] = pixels[1:] != pixels[:-1]
+
+    flat_image = image.reshape(-1, 4)
+    flat_image[pixels[highest], :3] = colors[order[highest]]
+    flat_image[pixels[highest], 3] = 255
+
+    return fill_gaps(image)
+
+
+def fill_gaps(image: np.ndarray) -> np.ndarray:
+    """Fills transparent pixels with a neighboring pixel's color, closing single
+    pixel gaps between points in sparse parts of the preview."""
+    height, width = image.shape[:2]
+    padded = np.pad(image, ((1, 1), (1, 1), (0, 0)))
+    filled = image.copy()
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            neighbor = padded[1 + dy : 1 + dy + height, 1 + dx : 1 + dx + width]
+            gaps = (filled[:, :, 3] == 0) & (neighbor[:, :, 3] > 0)
+            filled[gaps] = neighbor[gaps]
+    return filled
+
+
+def create_preview_image(
+    input_las_path: Path, preview_out_path: Path, size: int = PREVIEW_SIZE
+) -> None:
+    """Generates a top-down preview image for point cloud data products. COPC
+    files are read only down to the octree level that matches the preview's
+    resolution, other las/laz files are streamed and decimated.
 
     Args:
         input_las_path (Path): Path to input las/laz dataset.
         preview_out_path (str): Path for final preview image.
+        size (int, optional): Longest side of preview image. Defaults to
+            PREVIEW_SIZE.
     """
-    input_las = lp.read(input_las_path)
-    # input_las = lp.read('/home/minyj/Downloads/231028_PUSH_L1_40m_5ms_lin_70.las')
-
-    # reduce the number of points
-
-    idx_preview = (np.arange(len(input_las.x)) % 10) == 0
-    # '''may need to reduce number of point in consideration of computing resources capacity'''
-
-    point_x = input_las.x[idx_preview]
-    point_y = input_las.y[idx_preview]
-    point_z = input_las.z[idx_preview]
-
-    x1 = np.min(point_x)
-    x2 = np.max(point_x)
-    y1 = np.min(point_y)
-    y2 = np.max(point_y)
-    z1 = np.min(point_z)
-    z2 = np.max(point_z)
-
-    # check color information
-    try:
-        exist_color = len(np.unique(input_las.red)) > 1
-    except:
-        exist_color = False
-
-    # fig, ax = plt.subplots(fig_size=(20,20), subplot_kw = dict(projection='3d'),
-    #                        gridspec_kw = dict(top=0.5, bottom = 0, left = 0, right = 1))
-    # fig, ax = plt.subplots(subplot_kw = dict(projection='3d'), layout='compressed')
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection="3d")
-
-    if exist_color:
-
-        table_color = np.stack(
-            (
-                input_las.red[idx_preview],
-                input_las.green[idx_preview],
-                input_las.blue[idx_preview],
-            ),
-            axis=1,
-        )
-        ax.scatter(point_x, point_y, point_z, c=table_color / (2**16), s=0.01)
-        ax.margins(x=0, tight=True)
-        ax.set_xlim([x1, x2])
-        ax.set_ylim([y1, y2])
-        ax.set_zlim([z1, z2])
-        # ax.set_yticks([])
-        # ax.set_xticks([])
-        # ax.set_zticks([])
-        ax.set_aspect("equal")
-        plt.axis("off")
-        # ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        # ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        # ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        # ax.xaxis._axinfo["grid"]['color'] = (1, 1, 1, 0)
-        # ax.yaxis._axinfo["grid"]['color'] = (1, 1, 1, 0)
-        # ax.zaxis._axinfo["grid"]['color'] = (1, 1, 1, 0)
-        # plt.show()
-
-    else:
-        table_color = point_z
-
-        ax.scatter(point_x, point_y, point_z, c=table_color, cmap="coolwarm", s=0.01)
-        ax.margins(x=0, tight=True)
-        ax.set_xlim([x1, x2])
-        ax.set_ylim([y1, y2])
-        ax.set_zlim([z1, z2])
-        # ax.set_yticks([])
-        # ax.set_xticks([])
-        # ax.set_zticks([])
-        ax.set_aspect("equal")
-        plt.axis("off")
-        # ax.xaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        # ax.yaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        # ax.zaxis.set_pane_color((1.0, 1.0, 1.0, 0.0))
-        # ax.xaxis._axinfo["grid"]['color'] = (1, 1, 1, 0)
-        # ax.yaxis._axinfo["grid"]['color'] = (1, 1, 1, 0)
-        # ax.zaxis._axinfo["grid"]['color'] = (1, 1, 1, 0)
-        # plt.show()
-
-    in_memory_buff = io.BytesIO()
-    plt.savefig(
-        in_memory_buff, transparent=True, bbox_inches="tight", dpi=200
-    )  # generate image with margins
-    in_memory_buff.seek(0)
-    plt.close("all")
-
-    # region - Reduce the margins
-
-    img = mpimg.imread(in_memory_buff)
-    tmp_x, tmp_y = np.where(img[:, :, -1] != 0)
-    x1 = np.min(tmp_x) - 10
-    x2 = np.max(tmp_x) + 10
-    if x1 < 0:
-        x1 = 0
-    if x2 > img.shape[1]:
-        x2 = img.shape[1]
-    y1 = np.min(tmp_y) - 10
-    y2 = np.max(tmp_y) + 10
-    if y1 < 0:
-        y1 = 0
-    if y2 > img.shape[0]:
-        y2 = img.shape[0]
-    plt.imshow(img[x1:x2, y1:y2, :])
-    plt.axis("off")
-    plt.savefig(preview_out_path, transparent=True, bbox_inches="tight", dpi=200)
-    plt.close("all")
-
-    # endregion
+    points: Optional[lp.ScaleAwarePointRecord] = None
+    if str(input_las_path).endswith(".copc.laz"):
+        try:
+            points, header = read_copc_points(input_las_path, size)
+        except lp.LaspyException:
+            points = None
+    if points is None:
+        points, header = read_decimated_points(input_las_path)
+
+    x, y, z = np.asarray(points.x), np.asarray(points.y), np.asarray(points.z)
+    image = rasterize_top_down(
+        x, y, z, get_point_colors(points, z), header.mins, header.maxs, size
+    )
+    Image.fromarray(image).save(preview_out_path)
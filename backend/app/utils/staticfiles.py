@@ -3,14 +3,17 @@ Author:         Kevin Stone
 Source:         https://gist.github.com/kevinastone/a6a62db57577b3f24e8a6865ed311463
 Description:    Add support for range requests in Starlette.
 """
+
 import os
 import re
+import secrets
 import stat
 import typing as t
 from urllib.parse import quote
 
 import aiofiles
 from aiofiles.os import stat as aio_stat
+from starlette.concurrency import run_in_threadpool
 from starlette.datastructures import Headers
 from starlette.exceptions import HTTPException
 from starlette.responses import Response, guess_type
@@ -18,7 +21,11 @@ from starlette.staticfiles import StaticFiles
 from starlette.types import Receive, Scope, Send
 
 
-RANGE_REGEX = re.compile(r"^bytes=(?P<start>\d+)-(?P<end>\d*)$")
+RANGE_SPEC_REGEX = re.compile(r"^(?P<start>\d*)-(?P<end>\d*)$")
+
+# Ranges left after coalescing that are sent as multipart/byteranges, requests
+# with more ranges are answered with the whole file
+MAX_RANGES = 64
 
 
 PathLike = t.Union[str, "os.PathLike[str]"]
@@ -30,7 +37,7 @@ class OpenRange(t.NamedTuple):
 
     def clamp(self, start: int, end: int) -> "ClosedRange":
         begin = max(self.start, start)
-        end = min((x for x in (self.end, end) if x))
+        end = min((x for x in (self.end, end) if x is not None))
 
         begin = min(begin, end)
         end = max(begin, end)
@@ -50,7 +57,10 @@ class ClosedRange(t.NamedTuple):
 
 
 class RangedFileResponse(Response):
-    chunk_size = 4096
+    # Chunks start at min_chunk_size so short ranges (e.g., COPC hierarchy pages)
+    # are sent in one message, and double up to max_chunk_size for long ranges
+    min_chunk_size = 64 * 1024
+    max_chunk_size = 1024 * 1024
 
     def __init__(
         self,
@@ -86,9 +96,9 @@ class RangedFileResponse(Response):
         assert self.stat_result
         total_length = self.stat_result.st_size
         content_length = len(range)
-        self.headers[
-            "content-range"
-        ] = f"bytes {range.start}-{range.end}/{total_length}"
+        self.headers["content-range"] = (
+            f"bytes {range.start}-{range.end}/{total_length}"
+        )
         self.headers["content-length"] = str(content_length)
         pass
 
@@ -104,42 +114,219 @@ class RangedFileResponse(Response):
                 if not stat.S_ISREG(mode):
                     raise RuntimeError(f"File at path {self.path} is not a file.")
 
-        byte_range = self.range.clamp(0, self.stat_result.st_size)
+        byte_range = self.range.clamp(0, self.stat_result.st_size - 1)
         self.set_range_headers(byte_range)
 
-        async with aiofiles.open(self.path, mode="rb") as file:
-            await file.seek(byte_range.start)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 206,
+                "headers": self.raw_headers,
+            }
+        )
+        if self.send_header_only or not byte_range:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        if "http.response.pathsend" in extensions and self.is_whole_file(byte_range):
+            await send(
+                {"type": "http.response.pathsend", "path": os.path.abspath(self.path)}
+            )
+            return
+
+        file = await run_in_threadpool(open, self.path, "rb")
+        try:
+            await self.send_range(send, file, byte_range, extensions, more_body=False)
+        finally:
+            file.close()
+
+    def is_whole_file(self, byte_range: ClosedRange) -> bool:
+        assert self.stat_result
+        return byte_range.start == 0 and len(byte_range) == self.stat_result.st_size
+
+    async def send_range(
+        self,
+        send: Send,
+        file: t.BinaryIO,
+        byte_range: ClosedRange,
+        extensions: t.Dict[str, t.Any],
+        more_body: bool,
+    ) -> None:
+        """Sends a byte range of an open file. The file is handed to the server
+        to send with os.sendfile if it supports zerocopysend, otherwise the range
+        is read with os.pread in chunks, which does not need a separate seek and
+        reads each chunk in a single threadpool call."""
+        if "http.response.zerocopysend" in extensions:
+            await send(
+                {
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": byte_range.start,
+                    "count": len(byte_range),
+                    "more_body": more_body,
+                }
+            )
+            return
+
+        offset = byte_range.start
+        remaining_bytes = len(byte_range)
+        chunk_size = self.min_chunk_size
+        while remaining_bytes > 0:
+            chunk = await run_in_threadpool(
+                os.pread, file.fileno(), min(chunk_size, remaining_bytes), offset
+            )
+            if not chunk:
+                raise RuntimeError(f"File at path {self.path} was truncated.")
+            offset += len(chunk)
+            remaining_bytes -= len(chunk)
             await send(
                 {
-                    "type": "http.response.start",
-                    "status": 206,
-                    "headers": self.raw_headers,
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining_bytes > 0 or more_body,
                 }
             )
-            if self.send_header_only:
+            chunk_size = min(chunk_size * 2, self.max_chunk_size)
+
+
+class MultiRangeFileResponse(RangedFileResponse):
+    """Sends several byte ranges of a file in a multipart/byteranges response."""
+
+    def __init__(
+        self,
+        path: PathLike,
+        ranges: t.List[ClosedRange],
+        stat_result: os.stat_result,
+        headers: t.Optional[t.Dict[str, str]] = None,
+        method: t.Optional[str] = None,
+    ) -> None:
+        self.ranges = ranges
+        self.boundary = secrets.token_hex(16)
+        self.part_media_type = guess_type(path)[0] or "application/octet-stream"
+        super().__init__(
+            path,
+            OpenRange(ranges[0].start, ranges[-1].end),
+            headers=headers,
+            media_type=f"multipart/byteranges; boundary={self.boundary}",
+            stat_result=stat_result,
+            method=method,
+        )
+
+    def get_part_header(self, index: int, range: ClosedRange) -> bytes:
+        assert self.stat_result
+        part_header = (
+            f"--{self.boundary}\r\n"
+            f"Content-Type: {self.part_media_type}\r\n"
+            f"Content-Range: bytes {range.start}-{range.end}"
+            f"/{self.stat_result.st_size}\r\n\r\n"
+        )
+        # each part after the first starts on a new line
+        return (f"\r\n{part_header}" if index > 0 else part_header).encode("latin-1")
+
+    def get_closing_boundary(self) -> bytes:
+        return f"\r\n--{self.boundary}--\r\n".encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        part_headers = [
+            self.get_part_header(index, range)
+            for index, range in enumerate(self.ranges)
+        ]
+        closing_boundary = self.get_closing_boundary()
+        content_length = (
+            sum(len(part_header) for part_header in part_headers)
+            + sum(len(range) for range in self.ranges)
+            + len(closing_boundary)
+        )
+        self.headers["content-length"] = str(content_length)
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 206,
+                "headers": self.raw_headers,
+            }
+        )
+        if self.send_header_only:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        extensions = scope.get("extensions") or {}
+        file = await run_in_threadpool(open, self.path, "rb")
+        try:
+            for part_header, range in zip(part_headers, self.ranges):
                 await send(
-                    {"type": "http.response.body", "body": b"", "more_body": False}
+                    {
+                        "type": "http.response.body",
+                        "body": part_header,
+                        "more_body": True,
+                    }
                 )
-            else:
-                remaining_bytes = len(byte_range)
-
-                if not byte_range:
-                    await send(
-                        {"type": "http.response.body", "body": b"", "more_body": False}
-                    )
-                    return
-
-                while remaining_bytes > 0:
-                    chunk_size = min(self.chunk_size, remaining_bytes)
-                    chunk = await file.read(chunk_size)
-                    remaining_bytes -= len(chunk)
-                    await send(
-                        {
-                            "type": "http.response.body",
-                            "body": chunk,
-                            "more_body": remaining_bytes > 0,
-                        }
-                    )
+                await self.send_range(send, file, range, extensions, more_body=True)
+        finally:
+            file.close()
+        await send(
+            {"type": "http.response.body", "body": closing_boundary, "more_body": False}
+        )
+
+
+def parse_range_header(range_header: str, file_size: int) -> t.List[ClosedRange]:
+    """Parses a Range header into byte ranges within a file. Supports multiple
+    ranges, open ranges (bytes=N-) and suffix ranges (bytes=-N).
+
+    Args:
+        range_header (str): Value of Range header.
+        file_size (int): Size of file in bytes.
+
+    Raises:
+        HTTPException: 400 if the header is malformed, 416 if no range overlaps
+        the file.
+
+    Returns:
+        t.List[ClosedRange]: Byte ranges in the order they were requested.
+    """
+    unit, _, range_set = range_header.partition("=")
+    if unit.strip().lower() != "bytes":
+        raise HTTPException(400)
+
+    ranges: t.List[ClosedRange] = []
+    for range_spec in range_set.split(","):
+        match = RANGE_SPEC_REGEX.search(range_spec.strip())
+        if not match or not (match.group("start") or match.group("end")):
+            raise HTTPException(400)
+
+        start, end = match.group("start"), match.group("end")
+        if not start:
+            # suffix range, last N bytes of file
+            suffix_length = int(end)
+            if suffix_length > 0 and file_size > 0:
+                ranges.append(
+                    ClosedRange(max(file_size - suffix_length, 0), file_size - 1)
+                )
+            continue
+
+        range = OpenRange(int(start), int(end) if end else None)
+        if range.end is not None and range.end < range.start:
+            raise HTTPException(400)
+        if range.start < file_size:
+            ranges.append(range.clamp(0, file_size - 1))
+
+    if not ranges:
+        raise HTTPException(416, headers={"content-range": f"bytes */{file_size}"})
+    return ranges
+
+
+def coalesce_ranges(ranges: t.List[ClosedRange]) -> t.List[ClosedRange]:
+    """Sorts byte ranges and merges ranges that overlap or are adjacent."""
+    coalesced: t.List[ClosedRange] = []
+    for range in sorted(ranges):
+        if coalesced and range.start <= coalesced[-1].end + 1:
+            coalesced[-1] = ClosedRange(
+                coalesced[-1].start, max(coalesced[-1].end, range.end)
+            )
+        else:
+            coalesced.append(range)
+    return coalesced
 
 
 class RangedStaticFiles(StaticFiles):
@@ -172,16 +359,19 @@ class RangedStaticFiles(StaticFiles):
         method = scope["method"]
         request_headers = Headers(scope=scope)
 
-        range_header = request_headers["range"]
-
-        match = RANGE_REGEX.search(range_header)
-        if not match:
-            raise HTTPException(400)
-
-        start, end = match.group("start"), match.group("end")
+        ranges = coalesce_ranges(
+            parse_range_header(request_headers["range"], stat_result.st_size)
+        )
 
-        range = OpenRange(int(start), int(end) if end else None)
+        if len(ranges) == 1:
+            return RangedFileResponse(
+                full_path, OpenRange(*ranges[0]), stat_result=stat_result, method=method
+            )
+        if len(ranges) > MAX_RANGES:
+            return super().file_response(
+                full_path, stat_result=stat_result, scope=scope
+            )
 
-        return RangedFileResponse(
-            full_path, range, stat_result=stat_result, method=method
+        return MultiRangeFileResponse(
+            full_path, ranges, stat_result=stat_result, method=method
         )
@@ -0,0 +1,176 @@
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.utils.staticfiles import OpenRange, RangedFileResponse
+
+
+class FixedChunkRangedFileResponse(RangedFileResponse):
+    """RangedFileResponse with the 4096 byte chunks used before adaptive chunks."""
+
+    min_chunk_size = 4096
+    max_chunk_size = 4096
+
+
+# Response class and ASGI extensions offered by the server for each mode
+MODES: Dict[str, Tuple[type, Dict[str, Any]]] = {
+    "4k-chunks": (FixedChunkRangedFileResponse, {}),
+    "adaptive-chunks": (RangedFileResponse, {}),
+    "zerocopysend": (RangedFileResponse, {"http.response.zerocopysend": {}}),
+}
+
+
+def get_ranges(
+    file_size: int, range_size: int, num_requests: int
+) -> List[Tuple[int, int]]:
+    """Return random byte ranges (start, end) within a file."""
+    rng = random.Random(0)
+    starts = [rng.randrange(0, file_size - range_size) for _ in range(num_requests)]
+    return [(start, start + range_size - 1) for start in starts]
+
+
+async def serve_ranges(
+    path: str,
+    ranges: List[Tuple[int, int]],
+    response_class: type,
+    extensions: Dict[str, Any],
+    out_fd: int,
+) -> int:
+    """Serves byte ranges through a response class and writes the body to out_fd
+    the way an ASGI server writes to a socket.
+
+    Returns:
+        int: Number of bytes sent.
+    """
+    stat_result = os.stat(path)
+    sent = 0
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request"}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal sent
+        if message["type"] == "http.response.body":
+            sent += os.write(out_fd, message["body"]) if message["body"] else 0
+        elif message["type"] == "http.response.zerocopysend":
+            offset, count = message["offset"], message["count"]
+            while count > 0:
+                written = os.sendfile(out_fd, message["file"].fileno(), offset, count)
+                if written == 0:
+                    break
+                offset += written
+                count -= written
+                sent += written
+
+    scope = {"type": "http", "method": "GET", "extensions": extensions}
+    for start, end in ranges:
+        response = response_class(
+            path, OpenRange(start, end), stat_result=stat_result, method="GET"
+        )
+        await response(scope, receive, send)
+    return sent
+
+
+def run_benchmark(
+    path: str, range_size: int, num_requests: int, modes: List[str]
+) -> List[Dict[str, Any]]:
+    """Serves the same random byte ranges in each mode and measures throughput.
+    CPU time covers the event loop and threadpool threads, so MB/s per core is
+    bytes sent divided by CPU seconds used.
+
+    Args:
+        path (str): Path to file ranges are read from.
+        range_size (int): Size of each range in bytes.
+        num_requests (int): Number of range requests per mode.
+        modes (List[str]): Modes to benchmark.
+
+    Returns:
+        List[Dict[str, Any]]: Results for each mode.
+    """
+    ranges = get_ranges(os.path.getsize(path), range_size, num_requests)
+    results = []
+    out_fd = os.open(os.devnull, os.O_WRONLY)
+    try:
+        for mode in modes:
+            response_class, extensions = MODES[mode]
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            sent = asyncio.run(
+                serve_ranges(path, ranges, response_class, extensions, out_fd)
+            )
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            results.append(
+                {
+                    "mode": mode,
+                    "mb": sent / 1e6,
+                    "mb_per_s": sent / 1e6 / wall,
+                    "mb_per_cpu_s": sent / 1e6 / cpu if cpu > 0 else float("inf"),
+                }
+            )
+    finally:
+        os.close(out_fd)
+    return results
+
+
+def create_test_file(size: int) -> str:
+    with tempfile.NamedTemporaryFile(suffix=".copc.laz", delete=False) as tmp_file:
+        block = os.urandom(1024 * 1024)
+        for _ in range(size // len(block)):
+            tmp_file.write(block)
+        tmp_file.write(block[: size % len(block)])
+    return tmp_file.name
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Benchmarks RangedFileResponse range reads with 4 KiB chunks, adaptive "
+            "chunks, and zerocopysend."
+        )
+    )
+    parser.add_argument(
+        "--path",
+        type=str,
+        help="File to read ranges from. Defaults to a temporary random file.",
+        default=None,
+    )
+    parser.add_argument(
+        "--file-size", type=int, help="Temporary file size in MiB.", default=256
+    )
+    parser.add_argument(
+        "--range-size", type=int, help="Range size in KiB.", default=4096
+    )
+    parser.add_argument(
+        "--requests", type=int, help="Range requests per mode.", default=200
+    )
+    parser.add_argument(
+        "--modes",
+        type=str,
+        nargs="+",
+        choices=list(MODES.keys()),
+        default=list(MODES.keys()),
+    )
+
+    args = parser.parse_args()
+
+    path: Optional[str] = args.path
+    if path is None:
+        path = create_test_file(args.file_size * 1024 * 1024)
+    try:
+        # read file once so every mode reads from the page cache
+        run_benchmark(path, args.range_size * 1024, args.requests, ["zerocopysend"])
+        results = run_benchmark(path, args.range_size * 1024, args.requests, args.modes)
+    finally:
+        if args.path is None:
+            os.remove(path)
+
+    print(f"{'mode':<16}{'MB':>10}{'MB/s':>12}{'MB/s/core':>12}")
+    for result in results:
+        print(
+            f"{result['mode']:<16}{result['mb']:>10.1f}"
+            f"{result['mb_per_s']:>12.1f}{result['mb_per_cpu_s']:>12.1f}"
+        )
@@ -0,0 +1,150 @@
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import NamedTuple, Optional, Tuple
+from uuid import UUID
+
+from app.core.config import settings
+from app.utils.cache import TTLCache
+
+
+logger = logging.getLogger("__name__")
+
+
+class TileKey(NamedTuple):
+    """Data product and titiler parameters a map tile was rendered with."""
+
+    data_product_id: UUID
+    z: int
+    x: float
+    y: float
+    scale: int
+    bidx: Tuple[int, ...]
+    rescale: Tuple[str, ...]
+    colormap_name: Optional[str]
+
+
+class CachedTile(NamedTuple):
+    content: bytes
+    etag: str
+
+
+class TileCache:
+    """Two tier cache for rendered map tiles. Recently used tiles are kept in
+    memory, up to maxsize tiles and maxbytes of tile content, and, if a cache
+    directory is provided, all tiles are also written to disk so they are shared
+    by workers and survive restarts. Tiles expire after ttl seconds in both tiers.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        cache_dir: Optional[str],
+        maxbytes: int = 0,
+    ) -> None:
+        self.memory = TTLCache(
+            maxsize=maxsize,
+            ttl=ttl,
+            maxbytes=maxbytes,
+            sizeof=lambda tile: len(tile.content),
+        )
+        self.ttl = ttl
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def get(self, key: TileKey) -> Optional[CachedTile]:
+        """Return cached tile or None if tile is not cached."""
+        tile = self.memory.get(key)
+        if tile is None and self.cache_dir:
+            tile = self.read(key)
+            if tile:
+                self.memory.set(key, tile)
+        return tile
+
+    def set(self, key: TileKey, content: bytes) -> CachedTile:
+        """Adds tile to cache and returns it with its ETag."""
+        tile = CachedTile(content=content, etag=get_etag(content))
+        self.memory.set(key, tile)
+        if self.cache_dir:
+            self.write(key, content)
+        return tile
+
+    def invalidate(self, data_product_id: UUID) -> None:
+        """Removes all cached tiles for a data product."""
+        self.memory.invalidate(lambda key: key.data_product_id == data_product_id)
+        if self.cache_dir:
+            shutil.rmtree(self.cache_dir / str(data_product_id), ignore_errors=True)
+
+    def get_tile_path(self, key: TileKey) -> Path:
+        assert self.cache_dir
+        key_hash = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.cache_dir / str(key.data_product_id) / f"{key_hash}.png"
+
+    def read(self, key: TileKey) -> Optional[CachedTile]:
+        tile_path = self.get_tile_path(key)
+        try:
+            if self.ttl > 0 and time.time() - tile_path.stat().st_mtime > self.ttl:
+                tile_path.unlink(missing_ok=True)
+                return None
+            content = tile_path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.exception("Unable to read cached tile")
+            return None
+        return CachedTile(content=content, etag=get_etag(content))
+
+    def write(self, key: TileKey, content: bytes) -> None:
+        tile_path = self.get_tile_path(key)
+        try:
+            tile_path.parent.mkdir(parents=True, exist_ok=True)
+            # write to temporary file first so partial tiles are never read
+            with tempfile.NamedTemporaryFile(
+                dir=tile_path.parent, suffix=".tmp", delete=False
+            ) as tmp_file:
+                tmp_file.write(content)
+            os.replace(tmp_file.name, tile_path)
+        except OSError:
+            logger.exception("Unable to write cached tile")
+
+
+def get_etag(content: bytes) -> str:
+    """Return strong ETag for tile content."""
+    return f'"{hashlib.sha1(content).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Return True if an If-None-Match header value matches the ETag.
+
+    Args:
+        if_none_match (Optional[str]): If-None-Match request header value.
+        etag (str): ETag of cached tile.
+
+    Returns:
+        bool: True if client copy of the tile is current.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+tile_cache = TileCache(
+    maxsize=settings.TILE_CACHE_SIZE,
+    ttl=settings.TILE_CACHE_TTL,
+    cache_dir=settings.TILE_CACHE_DIR,
+    maxbytes=settings.TILE_CACHE_BYTES,
+)
+
+
+def invalidate_tiles(data_product_id: UUID) -> None:
+    """Removes cached map tiles for a data product. Called when a data product
+    is deactivated or its bands are updated."""
+    tile_cache.invalidate(data_product_id)
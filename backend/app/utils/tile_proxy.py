@@ -0,0 +1,130 @@
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+
+# upstream tile servers are reached through varnish, connections are kept alive
+# and shared by all requests handled by a worker
+UPSTREAM_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=50, keepalive_expiry=60
+)
+# timeout request after 30 seconds
+UPSTREAM_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+
+# client request headers passed on to upstream so it can revalidate cached tiles
+FORWARDED_REQUEST_HEADERS = ["if-none-match", "if-modified-since"]
+# upstream response headers returned to the client
+FORWARDED_RESPONSE_HEADERS = ["cache-control", "etag", "expires", "last-modified"]
+
+
+def create_http_client() -> httpx.AsyncClient:
+    """Return HTTP/1.1 client with a keep-alive connection pool for upstream
+    tile servers. Created once per app in its lifespan."""
+    return httpx.AsyncClient(limits=UPSTREAM_LIMITS, timeout=UPSTREAM_TIMEOUT)
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient:
+    """Return shared upstream client created in the app lifespan."""
+    return request.app.state.http_client
+
+
+async def send_tile_request(
+    client: httpx.AsyncClient, upstream_request: httpx.Request, stream: bool
+) -> httpx.Response:
+    """Sends request to upstream tile server. Connection errors are raised as
+    gateway errors."""
+    try:
+        return await client.send(upstream_request, stream=stream)
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail="Tile request timed out"
+        )
+    except httpx.HTTPError:
+        raise HTTPException(
+            status_code=status.HTTP_502_BAD_GATEWAY, detail="Unable to request tile"
+        )
+
+
+async def fetch_tile(client: httpx.AsyncClient, tile_url: str) -> bytes:
+    """Requests a tile from an upstream tile server and returns its content.
+
+    Args:
+        client (httpx.AsyncClient): Shared upstream client.
+        tile_url (str): Upstream tile URL.
+
+    Raises:
+        HTTPException: Raise if upstream server does not return the tile.
+
+    Returns:
+        bytes: Tile content.
+    """
+    upstream_request = client.build_request("GET", tile_url)
+    upstream_response = await send_tile_request(client, upstream_request, stream=False)
+    if upstream_response.status_code != status.HTTP_200_OK:
+        raise HTTPException(
+            status_code=upstream_response.status_code,
+            detail=f"Error: {upstream_response.text}",
+        )
+    return upstream_response.content
+
+
+async def stream_tile(
+    client: httpx.AsyncClient,
+    tile_url: str,
+    media_type: str,
+    request: Optional[Request] = None,
+) -> Response:
+    """Requests a tile from an upstream tile server and streams the response body
+    back to the client as it is received. Caching headers are forwarded in both
+    directions.
+
+    Args:
+        client (httpx.AsyncClient): Shared upstream client.
+        tile_url (str): Upstream tile URL.
+        media_type (str): Media type of tile.
+        request (Optional[Request], optional): Client request. Defaults to None.
+
+    Raises:
+        HTTPException: Raise if upstream server does not return the tile.
+
+    Returns:
+        Response: Streaming tile response, or empty response if not modified.
+    """
+    headers = {}
+    if request:
+        for header in FORWARDED_REQUEST_HEADERS:
+            if header in request.headers:
+                headers[header] = request.headers[header]
+
+    upstream_request = client.build_request("GET", tile_url, headers=headers)
+    upstream_response = await send_tile_request(client, upstream_request, stream=True)
+
+    response_headers = {
+        header: upstream_response.headers[header]
+        for header in FORWARDED_RESPONSE_HEADERS
+        if header in upstream_response.headers
+    }
+
+    if upstream_response.status_code == status.HTTP_200_OK:
+        return StreamingResponse(
+            upstream_response.aiter_bytes(),
+            media_type=media_type,
+            headers=response_headers,
+            background=BackgroundTask(upstream_response.aclose),
+        )
+
+    try:
+        if upstream_response.status_code == status.HTTP_304_NOT_MODIFIED:
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED, headers=response_headers
+            )
+        await upstream_response.aread()
+        raise HTTPException(
+            status_code=upstream_response.status_code,
+            detail=f"Error: {upstream_response.text}",
+        )
+    finally:
+        await upstream_response.aclose()
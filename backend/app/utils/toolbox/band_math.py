@@ -0,0 +1,323 @@
+import argparse
+import ast
+import os
+import re
+import threading
+from typing import Callable
+
+import numpy as np
+
+from app.utils.toolbox.block_processor import run_block_windows
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+
+# Vegetation indices that can be run without a dedicated tool module. Variables
+# other than bN are resolved from "<variable>_band_idx" params.
+INDICES = {
+    "gndvi": "(nir - green) / (nir + green)",
+    "ndre": "(nir - rededge) / (nir + rededge)",
+    "vari": "(green - red) / (green + red - blue)",
+}
+
+BINARY_OPERATORS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+    ast.Pow: np.power,
+}
+
+UNARY_OPERATORS = {ast.USub: np.negative, ast.UAdd: np.positive}
+
+FUNCTIONS = {"abs": np.absolute, "exp": np.exp, "log": np.log, "sqrt": np.sqrt}
+
+BAND_VARIABLE_REGEX = re.compile(r"^b(?P<idx>[1-9]\d*)$")
+
+# max characters allowed in an expression
+MAX_EXPRESSION_LENGTH = 256
+
+
+class BandMathExpression:
+    """Band math expression (e.g., "(b4 - b3) / (b4 + b3)") compiled once into a
+    chain of NumPy ufunc calls. Intermediate results are written in place to
+    reusable temporary arrays and the final result is written directly to the
+    output array. Uses numexpr instead if it is installed.
+    """
+
+    def __init__(self, expression: str, band_variables: dict[str, int]) -> None:
+        """Validates and compiles expression.
+
+        Args:
+            expression (str): Band math expression.
+            band_variables (dict[str, int]): Band index for each named variable.
+
+        Raises:
+            ValueError: Raise if expression is invalid or uses unknown variables.
+        """
+        self.expression = expression
+        self.tree = parse_expression(expression)
+        # band index for each variable used in expression
+        function_names = [
+            node.func for node in ast.walk(self.tree) if isinstance(node, ast.Call)
+        ]
+        self.variables: dict[str, int] = {}
+        for node in ast.walk(self.tree):
+            if isinstance(node, ast.Name) and node not in function_names:
+                self.variables[node.id] = resolve_band_variable(node.id, band_variables)
+        if len(self.variables) == 0:
+            raise ValueError("Expression must use at least one band")
+        # position of each variable's band in the block window array
+        self.band_indexes = sorted(set(self.variables.values()))
+        self.positions = {
+            name: self.band_indexes.index(band_idx)
+            for name, band_idx in self.variables.items()
+        }
+        self.steps: list[tuple[Callable, tuple, object]] = []
+        self.tmp_count = 0
+        self.free_tmps: list[int] = []
+        result = self.compile(self.tree.body, "out")
+        if result != "out":
+            self.steps.append((np.positive, (result,), "out"))
+        self.local = threading.local()
+
+    def compile(self, node: ast.AST, dest: str | None) -> object:
+        """Emits the ufunc steps for node and returns a reference to its result.
+        References are a float constant, ("band", position), ("tmp", index), or
+        "out". Only the leftmost branch of a node writes to dest, so dest is never
+        overwritten while still needed.
+        """
+        if isinstance(node, ast.Constant):
+            return float(node.value)
+        if isinstance(node, ast.Name):
+            return ("band", self.positions[node.id])
+        if isinstance(node, ast.BinOp):
+            left = self.compile(node.left, dest)
+            right = self.compile(node.right, None)
+            ufunc = BINARY_OPERATORS[type(node.op)]
+            if isinstance(left, float) and isinstance(right, float):
+                return float(ufunc(left, right))
+            target = dest or self.reuse_tmp(left, right)
+            self.steps.append((ufunc, (left, right), target))
+            self.release_tmp(left, target)
+            self.release_tmp(right, target)
+            return target
+        if isinstance(node, ast.UnaryOp):
+            ufunc = UNARY_OPERATORS[type(node.op)]
+            operand_node = node.operand
+        else:
+            assert isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+            ufunc = FUNCTIONS[node.func.id]
+            operand_node = node.args[0]
+        operand = self.compile(operand_node, dest)
+        if isinstance(operand, float):
+            return float(ufunc(operand))
+        target = dest or self.reuse_tmp(operand)
+        self.steps.append((ufunc, (operand,), target))
+        self.release_tmp(operand, target)
+        return target
+
+    def reuse_tmp(self, *operands: object) -> tuple[str, int]:
+        """Return a temporary from the operands, a released one, or a new one."""
+        for operand in operands:
+            if isinstance(operand, tuple) and operand[0] == "tmp":
+                return operand
+        if self.free_tmps:
+            return ("tmp", self.free_tmps.pop())
+        self.tmp_count += 1
+        return ("tmp", self.tmp_count - 1)
+
+    def release_tmp(self, operand: object, target: object) -> None:
+        if isinstance(operand, tuple) and operand[0] == "tmp" and operand != target:
+            self.free_tmps.append(operand[1])
+
+    def __call__(self, img: np.ndarray, out: np.ndarray) -> None:
+        """Evaluates expression for a block window.
+
+        Args:
+            img (np.ndarray): Values for self.band_indexes in the window.
+            out (np.ndarray): Output array for expression values.
+        """
+        if numexpr:
+            local_dict = {name: img[pos] for name, pos in self.positions.items()}
+            numexpr.evaluate(
+                self.expression, local_dict=local_dict, out=out, casting="same_kind"
+            )
+            return
+
+        # temporaries are reused between windows with the same shape per thread
+        tmps = getattr(self.local, "tmps", None)
+        if tmps is None or tmps[0].shape != out.shape:
+            tmps = [np.empty_like(out) for _ in range(max(self.tmp_count, 1))]
+            self.local.tmps = tmps
+
+        def lookup(ref: object) -> object:
+            if isinstance(ref, tuple):
+                return img[ref[1]] if ref[0] == "band" else tmps[ref[1]]
+            if ref == "out":
+                return out
+            return ref
+
+        for ufunc, operands, target in self.steps:
+            ufunc(*[lookup(operand) for operand in operands], out=lookup(target))
+
+
+def parse_expression(expression: str) -> ast.Expression:
+    """Parses expression and verifies it only contains numbers, band variables,
+    arithmetic operators, and supported functions.
+
+    Args:
+        expression (str): Band math expression.
+
+    Raises:
+        ValueError: Raise if expression cannot be parsed or has unsupported syntax.
+
+    Returns:
+        ast.Expression: Parsed expression.
+    """
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise ValueError("Expression is too long")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError:
+        raise ValueError("Unable to parse expression")
+
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.Load, ast.Name)):
+            continue
+        if isinstance(node, ast.Constant):
+            if type(node.value) not in (int, float):
+                raise ValueError("Expression constants must be numbers")
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in BINARY_OPERATORS:
+                raise ValueError("Unsupported operator in expression")
+        elif isinstance(node, ast.UnaryOp):
+            if type(node.op) not in UNARY_OPERATORS:
+                raise ValueError("Unsupported operator in expression")
+        elif isinstance(node, ast.Call):
+            if (
+                not isinstance(node.func, ast.Name)
+                or node.func.id not in FUNCTIONS
+                or len(node.args) != 1
+                or node.keywords
+            ):
+                raise ValueError("Unsupported function in expression")
+        elif type(node) not in BINARY_OPERATORS and type(node) not in UNARY_OPERATORS:
+            raise ValueError("Unsupported syntax in expression")
+
+    return tree
+
+
+def resolve_band_variable(name: str, band_variables: dict[str, int]) -> int:
+    """Return band index for an expression variable. Variables are either bN, where
+    N is the band index, or a name with an index in band_variables.
+
+    Args:
+        name (str): Variable name.
+        band_variables (dict[str, int]): Band index for each named variable.
+
+    Raises:
+        ValueError: Raise if variable cannot be resolved to a band index.
+
+    Returns:
+        int: Band index.
+    """
+    match = BAND_VARIABLE_REGEX.match(name)
+    if match:
+        return int(match.group("idx"))
+    if name in band_variables:
+        return band_variables[name]
+    raise ValueError(f"Unknown band variable in expression: {name}")
+
+
+def get_band_variables(params: dict) -> dict[str, int]:
+    """Return band index for each "<variable>_band_idx" param."""
+    return {
+        key[: -len("_band_idx")]: value
+        for key, value in params.items()
+        if key.endswith("_band_idx")
+    }
+
+
+def run(in_raster: str, out_raster: str, params: dict) -> str:
+    """Main function for creating a raster from a band math expression evaluated
+    on the input raster. Output raster will be stored as a GeoTIFF in the
+    'out_dir' location.
+
+    Args:
+        in_raster (str): Filepath for input raster.
+        out_raster (str): Filepath for output raster.
+        params (dict): Expression and optional named band indexes.
+
+    Returns:
+        out_raster (str): Filepath for output raster.
+    """
+    validate_params(params)
+
+    expression = BandMathExpression(params["expression"], get_band_variables(params))
+
+    return run_block_windows(in_raster, out_raster, expression.band_indexes, expression)
+
+
+def create_index_tool(name: str) -> Callable[[str, str, dict], str]:
+    """Return a toolbox function that runs one of the predefined INDICES.
+
+    Args:
+        name (str): Name of index in INDICES.
+
+    Returns:
+        Callable[[str, str, dict], str]: Tool function with same signature as run.
+    """
+    expression = INDICES[name]
+
+    def run_index(in_raster: str, out_raster: str, params: dict) -> str:
+        return run(in_raster, out_raster, {**params, "expression": expression})
+
+    return run_index
+
+
+def validate_params(params: dict) -> None:
+    """Validate parameters for band math tool.
+    Checks for missing parameters and incorrect data types.
+
+    Args:
+        params (dict): Input parameters.
+
+    Raises:
+        ValueError: Raise if expression is missing.
+        TypeError: Raise if expression is not a string.
+        TypeError: Raise if a band index is not an integer.
+        ValueError: Raise if expression is invalid.
+    """
+    if "expression" not in params:
+        raise ValueError("Expression param (expression) missing")
+    if not isinstance(params.get("expression"), str):
+        raise TypeError("Expression must be a string")
+    for key, value in params.items():
+        if key.endswith("_band_idx") and (
+            not isinstance(value, int) or isinstance(value, bool)
+        ):
+            raise TypeError("Band indexes must be integers")
+    BandMathExpression(params["expression"], get_band_variables(params))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Creates a data product from a band math expression."
+    )
+    parser.add_argument("in_raster", type=str, help="Path to multispectral raster file")
+    parser.add_argument("out_raster", type=str, help="Full path for output raster")
+    parser.add_argument("expression", type=str, help="Expression, e.g. (b4-b3)/(b4+b3)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.in_raster):
+        raise FileNotFoundError("Input raster not found")
+
+    if os.path.exists(args.out_raster):
+        raise FileExistsError("Output raster already exists")
+
+    run(args.in_raster, args.out_raster, {"expression": args.expression})
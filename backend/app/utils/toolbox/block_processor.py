@@ -0,0 +1,273 @@
+import multiprocessing
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque
+
+import numpy as np
+import rasterio
+from rasterio.enums import Resampling
+from rasterio.windows import Window
+
+
+# Signature for tool calculations. Receives the requested bands for a single block
+# window as a float32 array (bands, rows, cols) and a float32 output array
+# (rows, cols). The band array is a reusable buffer and may be overwritten.
+BlockCalculation = Callable[[np.ndarray, np.ndarray], None]
+
+# Tile size (pixels) for output rasters and the smallest overview level
+TILE_SIZE = 512
+
+
+class BandStatistics:
+    """Running min, max, mean, and standard deviation of the valid (finite and
+    not nodata) values of a band. Windows are merged with Chan's parallel
+    algorithm so the stats are exact without a second pass over the output.
+    """
+
+    def __init__(self, nodata: float | None = None) -> None:
+        self.nodata = nodata
+        self.count = 0
+        self.total = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values: np.ndarray) -> None:
+        """Merges the valid values of a window into the running stats.
+
+        Args:
+            values (np.ndarray): Output values for a window.
+        """
+        self.total += values.size
+        valid = np.isfinite(values)
+        if self.nodata is not None and not np.isnan(self.nodata):
+            valid &= values != self.nodata
+        values = values[valid].astype(np.float64)
+        if values.size == 0:
+            return
+        count = self.count + values.size
+        mean = values.mean()
+        delta = mean - self.mean
+        self.m2 += ((values - mean) ** 2).sum() + (
+            delta**2 * self.count * values.size / count
+        )
+        self.mean += delta * values.size / count
+        self.count = count
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+
+    def to_tags(self) -> dict[str, str]:
+        """Return stats as GDAL STATISTICS_* band metadata items."""
+        if self.count == 0:
+            return {}
+        return {
+            "STATISTICS_MINIMUM": repr(self.minimum),
+            "STATISTICS_MAXIMUM": repr(self.maximum),
+            "STATISTICS_MEAN": repr(float(self.mean)),
+            "STATISTICS_STDDEV": repr(float(np.sqrt(self.m2 / self.count))),
+            "STATISTICS_VALID_PERCENT": repr(100 * self.count / self.total),
+        }
+
+
+class BufferPool:
+    """Thread-safe pool of reusable float32 arrays keyed by shape."""
+
+    def __init__(self) -> None:
+        self.buffers: dict[tuple[int, ...], list[np.ndarray]] = {}
+        self.lock = threading.Lock()
+
+    def get(self, shape: tuple[int, ...]) -> np.ndarray:
+        with self.lock:
+            available = self.buffers.get(shape)
+            if available:
+                return available.pop()
+        return np.empty(shape, dtype=np.float32)
+
+    def put(self, buffer: np.ndarray) -> None:
+        with self.lock:
+            self.buffers.setdefault(buffer.shape, []).append(buffer)
+
+
+def run_block_windows(
+    in_raster: str,
+    out_raster: str,
+    band_indexes: list[int],
+    calculate: BlockCalculation,
+    num_threads: int | None = None,
+) -> str:
+    """Runs a tool calculation over each tile window of the input raster and writes
+    the single band float32 result to a deflate compressed, tiled GeoTIFF.
+
+    Windows are read (all requested bands in one call) and calculated on a pool of
+    threads, each with its own dataset handle. Results are written by the calling
+    thread in window order. The number of windows in flight is bounded so memory
+    use does not depend on raster size, and input/output arrays are reused.
+
+    Band stats are accumulated while the windows are written and stored in the
+    output metadata, then internal overviews are built from the written tiles, so
+    the output does not need another pass before it can be served.
+
+    Args:
+        in_raster (str): Filepath for input raster.
+        out_raster (str): Filepath for output raster.
+        band_indexes (list[int]): Band indexes (1-based) passed to the calculation.
+        calculate (BlockCalculation): Function calculating output for a window.
+        num_threads (int | None, optional): No. of threads. Defaults to None.
+
+    Returns:
+        out_raster (str): Filepath for output raster.
+    """
+    if not num_threads:
+        num_threads = max(1, int(multiprocessing.cpu_count() / 2))
+
+    with rasterio.open(in_raster) as src:
+        assert src.count >= max(band_indexes)  # assert requested bands available
+        assert len(set(src.dtypes)) == 1  # assert each band has same dtype
+        # all bands must have same block window shapes
+        assert len(set(src.block_shapes)) == 1
+
+        # update source raster profile to single band, float32, and tiled, output
+        # tiles are compressed on the same number of threads
+        profile = src.profile
+        profile.update(
+            dtype=rasterio.float32,
+            count=1,
+            tiled=True,
+            blockxsize=TILE_SIZE,
+            blockysize=TILE_SIZE,
+            compress="deflate",
+            BIGTIFF="YES",
+            NUM_THREADS=num_threads,
+        )
+        windows = get_tile_windows(src.width, src.height)
+
+    # dataset handles are not thread-safe, so each thread opens its own
+    local = threading.local()
+    handles: list[rasterio.DatasetReader] = []
+    handles_lock = threading.Lock()
+    output_buffers = BufferPool()
+
+    def process_window(window: Window) -> tuple[Window, np.ndarray]:
+        if not hasattr(local, "src"):
+            local.src = rasterio.open(in_raster)
+            local.input_buffers = {}
+            with handles_lock:
+                handles.append(local.src)
+        shape = (len(band_indexes), window.height, window.width)
+        img = local.input_buffers.get(shape)
+        if img is None:
+            img = local.input_buffers[shape] = np.empty(shape, dtype=np.float32)
+        local.src.read(band_indexes, window=window, out=img)
+        out = output_buffers.get((window.height, window.width))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            calculate(img, out)
+        return window, out
+
+    try:
+        write_windows(
+            out_raster, profile, windows, process_window, output_buffers, num_threads
+        )
+    finally:
+        for handle in handles:
+            handle.close()
+
+    return out_raster
+
+
+def write_windows(
+    out_raster: str,
+    profile: dict,
+    windows: list[Window],
+    process_window: Callable[[Window], tuple[Window, np.ndarray]],
+    output_buffers: BufferPool,
+    num_threads: int,
+) -> None:
+    """Calculates windows on a pool of threads and writes them to a single band
+    raster in window order, with at most two windows per thread in flight. Band
+    stats are stored in the output metadata and internal overviews are built from
+    the written tiles.
+
+    Args:
+        out_raster (str): Filepath for output raster.
+        profile (dict): Profile for output raster.
+        windows (list[Window]): Windows to calculate.
+        process_window (Callable[[Window], tuple[Window, np.ndarray]]): Function
+            returning a window and its output array, taken from output_buffers.
+        output_buffers (BufferPool): Pool output arrays are returned to.
+        num_threads (int): No. of threads.
+    """
+    overview_factors = get_overview_factors(profile["width"], profile["height"])
+    max_in_flight = num_threads * 2
+    stats = BandStatistics(profile.get("nodata"))
+    with rasterio.open(out_raster, "w", **profile) as dst:
+        with ThreadPoolExecutor(max_workers=num_threads) as executor:
+            in_flight: Deque[Future] = deque()
+            for window in windows:
+                in_flight.append(executor.submit(process_window, window))
+                if len(in_flight) >= max_in_flight:
+                    write_result(dst, in_flight.popleft(), output_buffers, stats)
+            while in_flight:
+                write_result(dst, in_flight.popleft(), output_buffers, stats)
+        dst.update_tags(1, **stats.to_tags())
+        if overview_factors:
+            dst.build_overviews(overview_factors, Resampling.average)
+            dst.update_tags(ns="rio_overview", resampling="average")
+
+
+def get_tile_windows(width: int, height: int) -> list[Window]:
+    """Return windows for each output tile in row-major order.
+
+    Args:
+        width (int): Raster width.
+        height (int): Raster height.
+
+    Returns:
+        list[Window]: Tile windows clipped to the raster extent.
+    """
+    return [
+        Window(col, row, min(TILE_SIZE, width - col), min(TILE_SIZE, height - row))
+        for row in range(0, height, TILE_SIZE)
+        for col in range(0, width, TILE_SIZE)
+    ]
+
+
+def get_overview_factors(width: int, height: int) -> list[int]:
+    """Return overview decimation factors (2, 4, 8, ...) until the smallest overview
+    fits in a single tile, matching the levels the GDAL COG driver creates.
+
+    Args:
+        width (int): Raster width.
+        height (int): Raster height.
+
+    Returns:
+        list[int]: Overview factors.
+    """
+    factors = []
+    factor = 1
+    while max(width, height) / factor > TILE_SIZE:
+        factor *= 2
+        factors.append(factor)
+    return factors
+
+
+def write_result(
+    dst: rasterio.io.DatasetWriter,
+    future: Future,
+    output_buffers: BufferPool,
+    stats: BandStatistics,
+) -> None:
+    """Waits for a window calculation, writes it, updates the band stats, and
+    releases its output buffer.
+
+    Args:
+        dst (rasterio.io.DatasetWriter): Output raster.
+        future (Future): Pending window calculation.
+        output_buffers (BufferPool): Pool the output buffer is returned to.
+        stats (BandStatistics): Running stats for the output band.
+    """
+    window, out = future.result()
+    dst.write(out, window=window, indexes=1)
+    stats.update(out)
+    output_buffers.put(out)
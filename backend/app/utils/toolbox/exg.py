@@ -2,7 +2,8 @@ import argparse
 import os
 
 import numpy as np
-import rasterio
+
+from app.utils.toolbox.block_processor import run_block_windows
 
 
 def run(in_raster: str, out_raster: str, params: dict) -> str:
@@ -19,63 +20,31 @@ def run(in_raster: str, out_raster: str, params: dict) -> str:
     """
     validate_params(params)
 
-    # input file name
-    in_fn = in_raster
-
-    with rasterio.open(in_raster) as src:
-        assert src.count >= 3  # assert at least 3 bands available
-        assert len(set(src.dtypes)) == 1  # assert each band has same dtype
-        dtype = src.dtypes[0]  # dtype from first band
-
-        # update source raster profile to single band and float32
-        profile = src.profile
-        profile.update(
-            dtype=rasterio.float32, count=1, compress="deflate", BIGTIFF="YES"
-        )
-
-        # use block windows to calculate exg and write to new file
-        with rasterio.open(out_raster, "w", **profile) as dst:
-            # all bands must have same block window shapes
-            assert len(set(src.block_shapes)) == 1
-
-            # indexes for bands in img array
-            red_band_img_idx = 0
-            green_band_img_idx = 1
-            blue_band_img_idx = 2
-
-            # iterate over each block window
-            for ji, window in src.block_windows(1):
-                # initialize array to store band values
-                img = np.zeros((3, window.height, window.width), dtype=dtype)
-
-                # red band
-                img[red_band_img_idx, :, :] = src.read(
-                    params.get("red_band_idx"), window=window
-                )
-                # green band
-                img[green_band_img_idx, :, :] = src.read(
-                    params.get("green_band_idx"), window=window
-                )
-                # blue band
-                img[blue_band_img_idx, :, :] = src.read(
-                    params.get("blue_band_idx"), window=window
-                )
-
-                # calculate exg for current window
-                red = img[red_band_img_idx, :, :].astype(np.float32)
-                green = img[green_band_img_idx, :, :].astype(np.float32)
-                blue = img[blue_band_img_idx, :, :].astype(np.float32)
-
-                red_s = red / (red + green + blue)
-                green_s = green / (red + green + blue)
-                blue_s = blue / (red + green + blue)
-
-                exg = 2 * green_s - red_s - blue_s
-
-                # write exg window to out raster
-                dst.write(exg, window=window, indexes=1)
-
-    return out_raster
+    band_indexes = [
+        params["red_band_idx"],
+        params["green_band_idx"],
+        params["blue_band_idx"],
+    ]
+
+    return run_block_windows(in_raster, out_raster, band_indexes, calculate)
+
+
+def calculate(img: np.ndarray, out: np.ndarray) -> None:
+    """Calculates ExG for a block window. Band buffers are reused as scratch space.
+
+    Args:
+        img (np.ndarray): Red, green, and blue band values for the window.
+        out (np.ndarray): Output array for ExG values.
+    """
+    red, green, blue = img[0], img[1], img[2]
+    # exg = 2 * green_s - red_s - blue_s, where each band is divided by the sum of
+    # all three bands, which simplifies to (2 * green - red - blue) / total
+    np.add(red, green, out=out)
+    np.add(out, blue, out=out)
+    np.multiply(green, 2, out=green)
+    np.subtract(green, red, out=green)
+    np.subtract(green, blue, out=green)
+    np.divide(green, out, out=out)
 
 
 def validate_params(params: dict) -> None:
@@ -2,7 +2,8 @@ import argparse
 import os
 
 import numpy as np
-import rasterio
+
+from app.utils.toolbox.block_processor import run_block_windows
 
 
 def run(in_raster: str, out_raster: str, params: dict) -> str:
@@ -19,54 +20,23 @@ def run(in_raster: str, out_raster: str, params: dict) -> str:
     """
     validate_params(params)
 
-    # input file name
-    in_fn = in_raster
-
-    with rasterio.open(in_raster) as src:
-        assert src.count >= 2  # assert at least 2 bands available
-        assert len(set(src.dtypes)) == 1  # assert each band has same dtype
-        dtype = src.dtypes[0]  # dtype from first band
-
-        # update source raster profile to single band and float32
-        profile = src.profile
-        profile.update(
-            dtype=rasterio.float32, count=1, compress="deflate", BIGTIFF="YES"
-        )
-
-        # use block windows to calculate exg and write to new file
-        with rasterio.open(out_raster, "w", **profile) as dst:
-            # all bands must have same block window shapes
-            assert len(set(src.block_shapes)) == 1
-
-            # indexes for bands in img array
-            red_band_img_idx = 0
-            nir_band_img_idx = 1
-
-            # iterate over each block window
-            for ji, window in src.block_windows(1):
-                # initialize array to store band values
-                img = np.zeros((2, window.height, window.width), dtype=dtype)
-
-                # read bands into initialized array
-                for i in range(2):
-                    # red band
-                    img[red_band_img_idx, :, :] = src.read(
-                        params.get("red_band_idx"), window=window
-                    )
-                    # nir band
-                    img[nir_band_img_idx, :, :] = src.read(
-                        params.get("nir_band_idx"), window=window
-                    )
-
-                # calculate ndvi
-                nir = img[nir_band_img_idx, :, :].astype(np.float32)
-                red = img[red_band_img_idx, :, :].astype(np.float32)
-                ndvi = (nir - red) / (nir + red)
-
-                # write ndvi window to out raster
-                dst.write(ndvi, window=window, indexes=1)
-
-    return out_raster
+    band_indexes = [params["red_band_idx"], params["nir_band_idx"]]
+
+    return run_block_windows(in_raster, out_raster, band_indexes, calculate)
+
+
+def calculate(img: np.ndarray, out: np.ndarray) -> None:
+    """Calculates NDVI for a block window. Band buffers are reused as scratch space.
+
+    Args:
+        img (np.ndarray): Red and NIR band values for the window.
+        out (np.ndarray): Output array for NDVI values.
+    """
+    red, nir = img[0], img[1]
+    # ndvi = (nir - red) / (nir + red)
+    np.subtract(nir, red, out=out)
+    np.add(nir, red, out=red)
+    np.divide(out, red, out=out)
 
 
 def validate_params(params: dict) -> None:
@@ -0,0 +1,292 @@
+import math
+import multiprocessing
+import threading
+from contextlib import ExitStack
+from typing import Callable, NamedTuple
+
+import laspy as lp
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+from rasterio.windows import Window
+
+from app.utils.toolbox.block_processor import (
+    TILE_SIZE,
+    BufferPool,
+    write_windows,
+)
+
+
+# Rasters that can be gridded from a point cloud
+PRODUCTS = ("dsm", "dtm", "chm", "density")
+# Output value for cells without points
+NODATA = -9999.0
+# ASPRS classification codes
+GROUND_CLASS = 2
+NOISE_CLASSES = (7, 18)
+# Average no. of points per cell used to pick a resolution when none is given
+POINTS_PER_CELL = 4
+# Octree levels read to check if a point cloud has ground classified points
+GROUND_CHECK_LEVELS = range(0, 3)
+# Cells per side of the chunk gridded from one point cloud query, a multiple of
+# the output tile size so chunks are written as whole tiles
+CHUNK_SIZE = 4 * TILE_SIZE
+
+
+class Grid(NamedTuple):
+    west: float
+    north: float
+    resolution: float
+    width: int
+    height: int
+
+    def window_bounds(self, window: Window) -> tuple[float, float, float, float]:
+        """Return west, south, east, north bounds of a grid window."""
+        west = self.west + window.col_off * self.resolution
+        north = self.north - window.row_off * self.resolution
+        return (
+            west,
+            north - window.height * self.resolution,
+            west + window.width * self.resolution,
+            north,
+        )
+
+
+def get_grid(mins: np.ndarray, maxs: np.ndarray, resolution: float) -> Grid:
+    """Return grid covering the XY extent of a point cloud.
+
+    Args:
+        mins (np.ndarray): Minimum XYZ of point cloud.
+        maxs (np.ndarray): Maximum XYZ of point cloud.
+        resolution (float): Cell size in point cloud units.
+
+    Returns:
+        Grid: Grid origin (upper left), resolution, and size in cells.
+    """
+    width = max(1, math.ceil((maxs[0] - mins[0]) / resolution))
+    height = max(1, math.ceil((maxs[1] - mins[1]) / resolution))
+    return Grid(float(mins[0]), float(maxs[1]), resolution, width, height)
+
+
+def get_default_resolution(header: lp.LasHeader) -> float:
+    """Return cell size that holds POINTS_PER_CELL points on average."""
+    area = (header.maxs[0] - header.mins[0]) * (header.maxs[1] - header.mins[1])
+    return float(math.sqrt(area * POINTS_PER_CELL / max(header.point_count, 1)))
+
+
+def get_chunk_windows(width: int, height: int) -> list[Window]:
+    """Return windows for each chunk of the grid in row-major order."""
+    return [
+        Window(col, row, min(CHUNK_SIZE, width - col), min(CHUNK_SIZE, height - row))
+        for row in range(0, height, CHUNK_SIZE)
+        for col in range(0, width, CHUNK_SIZE)
+    ]
+
+
+def has_ground_points(reader: lp.CopcReader) -> bool:
+    """Checks the coarsest octree levels of a point cloud for ground points."""
+    points = reader.query(level=GROUND_CHECK_LEVELS)
+    return bool(np.any(np.asarray(points.classification) == GROUND_CLASS))
+
+
+def grid_points(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    classification: np.ndarray,
+    grid: Grid,
+    window: Window,
+    product: str,
+    out: np.ndarray,
+    ground_only: bool = True,
+) -> None:
+    """Bins points into the cells of a grid window and reduces each cell's
+    points to a single value. Noise points are ignored.
+
+    Args:
+        x (np.ndarray): X coordinates.
+        y (np.ndarray): Y coordinates.
+        z (np.ndarray): Z coordinates.
+        classification (np.ndarray): ASPRS classification codes.
+        grid (Grid): Grid the window belongs to.
+        window (Window): Window of grid to calculate.
+        product (str): "dsm" (highest Z), "dtm" (lowest ground Z), "chm" (dsm -
+            dtm), or "density" (points per square unit).
+        out (np.ndarray): Output array with shape (window.height, window.width).
+        ground_only (bool, optional): Only use ground points for the dtm. Defaults
+            to True.
+    """
+    cols = np.minimum(
+        ((x - grid.west) / grid.resolution).astype(np.int64), grid.width - 1
+    )
+    rows = np.minimum(
+        ((grid.north - y) / grid.resolution).astype(np.int64), grid.height - 1
+    )
+    cols -= window.col_off
+    rows -= window.row_off
+    keep = (
+        (cols >= 0)
+        & (cols < window.width)
+        & (rows >= 0)
+        & (rows < window.height)
+        & ~np.isin(classification, NOISE_CLASSES)
+    )
+    cells = rows[keep] * window.width + cols[keep]
+    z = z[keep]
+    classification = classification[keep]
+    flat_out = out.reshape(-1)
+
+    if product == "density":
+        counts = np.bincount(cells, minlength=flat_out.size)
+        np.divide(counts, grid.resolution**2, out=flat_out, casting="unsafe")
+        return
+
+    surface = np.full(flat_out.size, -np.inf)
+    if product in ("dsm", "chm"):
+        np.maximum.at(surface, cells, z)
+    terrain = np.full(flat_out.size, np.inf)
+    if product in ("dtm", "chm"):
+        ground = classification == GROUND_CLASS if ground_only else slice(None)
+        np.minimum.at(terrain, cells[ground], z[ground])
+
+    if product == "dsm":
+        values = surface
+    elif product == "dtm":
+        values = terrain
+    else:
+        values = np.maximum(surface - terrain, 0)
+        values[~np.isfinite(surface) | ~np.isfinite(terrain)] = np.inf
+    flat_out[:] = np.where(np.isfinite(values), values, NODATA)
+
+
+def run(in_point_cloud: str, out_raster: str, params: dict) -> str:
+    """Main function for gridding a COPC point cloud into a DSM, DTM, CHM, or point
+    density raster. The grid is split into chunks that are each read from the
+    point cloud with a spatial query and gridded on a pool of threads, so memory
+    use does not depend on the size of the point cloud.
+
+    The DTM uses ground classified points. Point clouds without ground
+    classification use the lowest point in each cell instead.
+
+    Args:
+        in_point_cloud (str): Filepath for input COPC point cloud.
+        out_raster (str): Filepath for output raster.
+        params (dict): Product and, optionally, resolution (cell size in point
+            cloud units) and num_threads.
+
+    Returns:
+        out_raster (str): Filepath for output raster.
+    """
+    validate_params(params)
+    product = params["product"]
+    num_threads = params.get("num_threads") or max(
+        1, int(multiprocessing.cpu_count() / 2)
+    )
+
+    with lp.CopcReader.open(str(in_point_cloud)) as reader:
+        header = reader.header
+        resolution = params.get("resolution") or get_default_resolution(header)
+        ground_only = product in ("dtm", "chm") and has_ground_points(reader)
+
+    grid = get_grid(header.mins, header.maxs, resolution)
+    profile = {
+        "driver": "GTiff",
+        "dtype": rasterio.float32,
+        "count": 1,
+        "width": grid.width,
+        "height": grid.height,
+        "crs": header.parse_crs(),
+        "transform": from_origin(grid.west, grid.north, resolution, resolution),
+        "nodata": NODATA,
+        "tiled": True,
+        "blockxsize": TILE_SIZE,
+        "blockysize": TILE_SIZE,
+        "compress": "deflate",
+        "BIGTIFF": "YES",
+        "NUM_THREADS": num_threads,
+    }
+
+    # point cloud readers are not thread-safe, so each thread opens its own
+    local = threading.local()
+    readers = ExitStack()
+    readers_lock = threading.Lock()
+    output_buffers = BufferPool()
+
+    def process_window(window: Window) -> tuple[Window, np.ndarray]:
+        if not hasattr(local, "reader"):
+            reader = lp.CopcReader.open(
+                str(in_point_cloud),
+                decompression_selection=lp.DecompressionSelection.XY_RETURNS_CHANNEL
+                | lp.DecompressionSelection.Z
+                | lp.DecompressionSelection.CLASSIFICATION,
+            )
+            with readers_lock:
+                local.reader = readers.enter_context(reader)
+        west, south, east, north = grid.window_bounds(window)
+        points = local.reader.query(
+            bounds=lp.copc.Bounds(
+                mins=np.array([west, south]), maxs=np.array([east, north])
+            )
+        )
+        out = output_buffers.get((window.height, window.width))
+        grid_points(
+            np.asarray(points.x),
+            np.asarray(points.y),
+            np.asarray(points.z),
+            np.asarray(points.classification),
+            grid,
+            window,
+            product,
+            out,
+            ground_only=ground_only,
+        )
+        return window, out
+
+    with readers:
+        write_windows(
+            out_raster,
+            profile,
+            get_chunk_windows(grid.width, grid.height),
+            process_window,
+            output_buffers,
+            num_threads,
+        )
+
+    return out_raster
+
+
+def create_grid_tool(product: str) -> Callable[[str, str, dict], str]:
+    """Return a toolbox function that grids a point cloud into one of PRODUCTS.
+
+    Args:
+        product (str): Name of product in PRODUCTS.
+
+    Returns:
+        Callable[[str, str, dict], str]: Tool function with same signature as run.
+    """
+
+    def run_grid(in_point_cloud: str, out_raster: str, params: dict) -> str:
+        return run(in_point_cloud, out_raster, {**params, "product": product})
+
+    return run_grid
+
+
+def validate_params(params: dict) -> None:
+    """Validate parameters for point cloud grid tool.
+
+    Args:
+        params (dict): Input parameters.
+
+    Raises:
+        ValueError: Raise if product is missing or not in PRODUCTS.
+        TypeError: Raise if resolution is not a number.
+        ValueError: Raise if resolution is not positive.
+    """
+    if params.get("product") not in PRODUCTS:
+        raise ValueError(f"Product param (product) must be one of {PRODUCTS}")
+    resolution = params.get("resolution")
+    if resolution is not None:
+        if isinstance(resolution, bool) or not isinstance(resolution, (int, float)):
+            raise TypeError("Resolution must be a number")
+        if resolution <= 0:
+            raise ValueError("Resolution must be greater than zero")
@@ -0,0 +1,400 @@
+import argparse
+import os
+import time
+from typing import Iterator
+
+import geopandas as gpd
+import numpy as np
+import rasterio
+import shapely
+from rasterio.features import geometry_mask, rasterize
+from rasterio.windows import Window
+
+
+# "mask" summarizes each zone separately, "label" summarizes every zone in a window
+# at once from a label raster
+ENGINES = ["mask", "label"]
+
+# Max pixels (per band) read for a group of zones. Zones close to each other are
+# grouped until their combined window reaches this size. A single zone larger than
+# this is still read with one window.
+MAX_WINDOW_PIXELS = 2048 * 2048
+
+# Size (pixels) of the grid cells used to sort zones so that nearby zones end up
+# in the same group
+CLUSTER_CELL_SIZE = 512
+
+
+def get_zone_windows(
+    src: rasterio.DatasetReader, zones: gpd.GeoDataFrame
+) -> np.ndarray:
+    """Return pixel window (col_start, row_start, col_stop, row_stop) covering each
+    zone, clipped to the raster extent. Zones outside of the raster have a window
+    with zero width or height.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        zones (gpd.GeoDataFrame): Zones in the raster's CRS.
+
+    Returns:
+        np.ndarray: Array of windows with shape (zones, 4).
+    """
+    bounds = zones.bounds.to_numpy()
+    inverse = ~src.transform
+    cols = []
+    rows = []
+    for x, y in ((bounds[:, 0], bounds[:, 3]), (bounds[:, 2], bounds[:, 1])):
+        cols.append(inverse.a * x + inverse.b * y + inverse.c)
+        rows.append(inverse.d * x + inverse.e * y + inverse.f)
+    col_start = np.floor(np.minimum(*cols)).clip(0, src.width)
+    col_stop = np.ceil(np.maximum(*cols)).clip(0, src.width)
+    row_start = np.floor(np.minimum(*rows)).clip(0, src.height)
+    row_stop = np.ceil(np.maximum(*rows)).clip(0, src.height)
+
+    return np.column_stack([col_start, row_start, col_stop, row_stop]).astype(int)
+
+
+def cluster_zone_windows(
+    zone_windows: np.ndarray, max_window_pixels: int = MAX_WINDOW_PIXELS
+) -> list[tuple[Window, list[int]]]:
+    """Groups zones into windows of nearby zones. Zones are sorted by the grid cell
+    containing their upper left corner and added to the current group until the
+    window covering the group would exceed max_window_pixels.
+
+    Args:
+        zone_windows (np.ndarray): Zone windows from get_zone_windows.
+        max_window_pixels (int, optional): Max pixels in a group window.
+
+    Returns:
+        list[tuple[Window, list[int]]]: Window and zone indexes for each group.
+    """
+    not_empty = np.flatnonzero(
+        (zone_windows[:, 2] > zone_windows[:, 0])
+        & (zone_windows[:, 3] > zone_windows[:, 1])
+    )
+    cells = zone_windows[not_empty, :2] // CLUSTER_CELL_SIZE
+    # sort by cell row, then cell column
+    order = not_empty[np.lexsort((cells[:, 0], cells[:, 1]))]
+
+    clusters: list[tuple[Window, list[int]]] = []
+    members: list[int] = []
+    extent = np.zeros(4, dtype=int)
+    for idx in order:
+        if members:
+            combined = np.concatenate(
+                [
+                    np.minimum(extent[:2], zone_windows[idx, :2]),
+                    np.maximum(extent[2:], zone_windows[idx, 2:]),
+                ]
+            )
+            pixels = (combined[2] - combined[0]) * (combined[3] - combined[1])
+            if pixels <= max_window_pixels:
+                extent = combined
+                members.append(idx)
+                continue
+            clusters.append((window_from_extent(extent), members))
+        extent = zone_windows[idx].copy()
+        members = [idx]
+    if members:
+        clusters.append((window_from_extent(extent), members))
+
+    return clusters
+
+
+def window_from_extent(extent: np.ndarray) -> Window:
+    col_start, row_start, col_stop, row_stop = (int(value) for value in extent)
+    return Window(col_start, row_start, col_stop - col_start, row_stop - row_start)
+
+
+def iter_cluster_windows(
+    src: rasterio.DatasetReader,
+    zone_windows: np.ndarray,
+    band_indexes: list[int],
+    max_window_pixels: int = MAX_WINDOW_PIXELS,
+) -> Iterator[tuple[Window, list[int], np.ma.MaskedArray]]:
+    """Yields the window, zone indexes, and masked band values for each group of
+    nearby zones. All requested bands are read with a single call per group, and
+    only one group is held in memory at a time.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        zone_windows (np.ndarray): Zone windows from get_zone_windows.
+        band_indexes (list[int]): Band indexes (1-based) to read.
+        max_window_pixels (int, optional): Max pixels in a group window.
+
+    Yields:
+        Iterator[tuple[Window, list[int], np.ma.MaskedArray]]: Group window, zone
+        indexes in the group, and band values with shape (bands, rows, cols).
+    """
+    for window, members in cluster_zone_windows(zone_windows, max_window_pixels):
+        data = src.read(band_indexes, window=window, masked=True)
+        yield window, members, data
+
+
+def get_zonal_statistics(
+    src: rasterio.DatasetReader,
+    zones: gpd.GeoDataFrame,
+    band_indexes: list[int] | None = None,
+    max_window_pixels: int = MAX_WINDOW_PIXELS,
+    engine: str = "mask",
+) -> list[list[dict]]:
+    """Calculates count, min, max, mean, median, and std for each zone and band.
+    Zones are rasterized once (pixel centers inside the zone) and applied to every
+    band. Nodata pixels are excluded.
+
+    The "mask" engine summarizes one zone at a time. The "label" engine burns every
+    zone in a group window into a label raster and summarizes all zones at once,
+    which is much faster for layers with thousands of small zones.
+
+    Args:
+        src (rasterio.DatasetReader): Open raster dataset.
+        zones (gpd.GeoDataFrame): Zones in the raster's CRS.
+        band_indexes (list[int] | None, optional): Band indexes (1-based). Defaults
+        to all bands.
+        max_window_pixels (int, optional): Max pixels in a group window.
+        engine (str, optional): Zonal stats engine. Defaults to "mask".
+
+    Raises:
+        ValueError: Raise if engine is not one of ENGINES.
+
+    Returns:
+        list[list[dict]]: ZonalStatisticsProps for each band of each zone, in the
+        order of the zones.
+    """
+    if engine not in ENGINES:
+        raise ValueError("Invalid zonal statistics engine")
+
+    if not band_indexes:
+        band_indexes = list(src.indexes)
+
+    results = [
+        [summarize(np.empty(0)) for _ in band_indexes] for _ in range(len(zones))
+    ]
+
+    zone_windows = get_zone_windows(src, zones)
+    geometries = zones.geometry.to_numpy()
+    # zones overlapping other zones are burned into separate label rasters
+    layers = get_non_overlapping_layers(geometries) if engine == "label" else None
+    for window, members, data in iter_cluster_windows(
+        src, zone_windows, band_indexes, max_window_pixels
+    ):
+        transform = rasterio.windows.transform(window, src.transform)
+        if engine == "label":
+            for layer in np.unique(layers[members]):
+                layer_members = [idx for idx in members if layers[idx] == layer]
+                labels = rasterize(
+                    [
+                        (geometries[idx], position + 1)
+                        for position, idx in enumerate(layer_members)
+                    ],
+                    out_shape=(window.height, window.width),
+                    transform=transform,
+                    fill=0,
+                    dtype="int32",
+                )
+                band_stats = [
+                    summarize_labels(labels, band, len(layer_members)) for band in data
+                ]
+                for position, idx in enumerate(layer_members):
+                    results[idx] = [stats[position] for stats in band_stats]
+            continue
+
+        for idx in members:
+            zone_window = window_from_extent(zone_windows[idx])
+            # position of zone window within the group window
+            row_start = int(zone_window.row_off - window.row_off)
+            col_start = int(zone_window.col_off - window.col_off)
+            rows = slice(row_start, row_start + zone_window.height)
+            cols = slice(col_start, col_start + zone_window.width)
+            outside = geometry_mask(
+                [geometries[idx]],
+                out_shape=(zone_window.height, zone_window.width),
+                transform=rasterio.windows.transform(zone_window, src.transform),
+            )
+            band_stats = []
+            for band in data[:, rows, cols]:
+                valid = ~(outside | np.ma.getmaskarray(band))
+                band_stats.append(summarize(band.data[valid]))
+            results[idx] = band_stats
+
+    return results
+
+
+def get_non_overlapping_layers(geometries: np.ndarray) -> np.ndarray:
+    """Assigns each zone to a layer so zones in the same layer do not overlap
+    (touching edges are allowed). Most zone layers (e.g., plots) have no overlaps
+    and every zone is assigned to layer 0.
+
+    Args:
+        geometries (np.ndarray): Zone geometries.
+
+    Returns:
+        np.ndarray: Layer for each zone.
+    """
+    layers = np.zeros(len(geometries), dtype=int)
+    tree = shapely.STRtree(geometries)
+    left, right = tree.query(geometries, predicate="intersects")
+    pairs = left < right
+    left, right = left[pairs], right[pairs]
+    overlaps = (
+        shapely.area(shapely.intersection(geometries[left], geometries[right])) > 0
+    )
+    neighbors: dict[int, list[int]] = {}
+    for a, b in zip(left[overlaps], right[overlaps]):
+        neighbors.setdefault(b, []).append(a)
+    # greedy coloring in zone order, neighbors with a lower index are assigned first
+    for idx in sorted(neighbors):
+        taken = {layers[neighbor] for neighbor in neighbors[idx]}
+        layer = 0
+        while layer in taken:
+            layer += 1
+        layers[idx] = layer
+
+    return layers
+
+
+def summarize_labels(
+    labels: np.ndarray, band: np.ma.MaskedArray, num_zones: int
+) -> list[dict]:
+    """Return zonal stats for every zone in a label raster at once. Count, mean, and
+    std are reduced with np.bincount. Min, max, and median are taken from the band
+    values sorted by label and value.
+
+    Args:
+        labels (np.ndarray): Label raster, zone n has label n + 1 and 0 is no zone.
+        band (np.ma.MaskedArray): Band values for the label raster window.
+        num_zones (int): No. of zones in the label raster.
+
+    Returns:
+        list[dict]: Zonal stats matching ZonalStatisticsProps for each zone.
+    """
+    valid = (labels > 0) & ~np.ma.getmaskarray(band)
+    zone_labels = labels[valid]
+    values = band.data[valid].astype(np.float64)
+
+    counts = np.bincount(zone_labels, minlength=num_zones + 1)[1:]
+    sums = np.bincount(zone_labels, weights=values, minlength=num_zones + 1)[1:]
+    means = sums / np.maximum(counts, 1)
+    deviations = (values - means[zone_labels - 1]) ** 2
+    stds = np.sqrt(
+        np.bincount(zone_labels, weights=deviations, minlength=num_zones + 1)[1:]
+        / np.maximum(counts, 1)
+    )
+
+    # values sorted by zone, then value - each zone is a contiguous segment. A
+    # stable sort on the (integer) labels after sorting the values is faster than
+    # np.lexsort
+    order = np.argsort(values)
+    order = order[np.argsort(zone_labels[order], kind="stable")]
+    sorted_values = values[order]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    # clamp indexes for zones without values, their stats are replaced below
+    last = max(sorted_values.size - 1, 0)
+    sorted_values = sorted_values if sorted_values.size else np.zeros(1)
+    minimums = sorted_values[np.clip(starts, 0, last)]
+    maximums = sorted_values[np.clip(starts + counts - 1, 0, last)]
+    medians = (
+        sorted_values[np.clip(starts + (counts - 1) // 2, 0, last)]
+        + sorted_values[np.clip(starts + counts // 2, 0, last)]
+    ) / 2
+
+    return [
+        (
+            {
+                "min": float(minimums[idx]),
+                "max": float(maximums[idx]),
+                "mean": float(means[idx]),
+                "count": int(counts[idx]),
+                "std": float(stds[idx]),
+                "median": float(medians[idx]),
+            }
+            if counts[idx] > 0
+            else summarize(np.empty(0))
+        )
+        for idx in range(num_zones)
+    ]
+
+
+def summarize(values: np.ndarray) -> dict:
+    """Return zonal stats for the valid values in a zone. Stats other than count
+    are None for zones without valid values.
+
+    Args:
+        values (np.ndarray): Valid values in a zone.
+
+    Returns:
+        dict: Zonal stats matching ZonalStatisticsProps.
+    """
+    if values.size == 0:
+        return {
+            "min": None,
+            "max": None,
+            "mean": None,
+            "count": 0,
+            "std": None,
+            "median": None,
+        }
+    values = values.astype(np.float64)
+    return {
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "count": int(values.size),
+        "std": float(values.std()),
+        "median": float(np.median(values)),
+    }
+
+
+def benchmark(in_raster: str, zones_path: str, band_indexes: list[int]) -> None:
+    """Prints the time taken by rasterstats (one zone at a time over a single read
+    of the bounds of all zones) and by each engine for the same zones.
+
+    Args:
+        in_raster (str): Path to raster.
+        zones_path (str): Path to vector file with zones.
+        band_indexes (list[int]): Band indexes (1-based).
+    """
+    from rasterstats import zonal_stats
+
+    with rasterio.open(in_raster) as src:
+        zones = gpd.read_file(zones_path).to_crs(src.crs)
+        print(f"{len(zones)} zones, {len(band_indexes)} band(s)")
+
+        start = time.perf_counter()
+        window = rasterio.windows.from_bounds(*zones.total_bounds, src.transform)
+        window_transform = rasterio.windows.transform(window, src.transform)
+        for band_idx in band_indexes:
+            zonal_stats(
+                zones,
+                src.read(band_idx, window=window),
+                affine=window_transform,
+                nodata=src.nodata,
+                stats="count min max mean median std",
+            )
+        print(f"rasterstats: {time.perf_counter() - start:.2f}s")
+
+        for engine in ENGINES:
+            start = time.perf_counter()
+            get_zonal_statistics(src, zones, band_indexes, engine=engine)
+            print(f"{engine}: {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks zonal statistics engines for a raster and zones."
+    )
+    parser.add_argument("in_raster", type=str, help="Path to raster file")
+    parser.add_argument("zones", type=str, help="Path to vector file with zones")
+    parser.add_argument(
+        "--bands", type=int, nargs="+", default=[1], help="Band indexes"
+    )
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.in_raster):
+        raise FileNotFoundError("Input raster not found")
+
+    if not os.path.exists(args.zones):
+        raise FileNotFoundError("Zones not found")
+
+    benchmark(args.in_raster, args.zones, args.bands)
@@ -0,0 +1,161 @@
+import errno
+import json
+import logging
+import os
+from typing import NamedTuple, Optional, Tuple
+
+
+logger = logging.getLogger("__name__")
+
+# Transfer methods tried in order until one succeeds
+TRANSFER_METHODS = ("link", "copy_file_range", "copy")
+# Bytes read and written per chunk by the copy method
+TRANSFER_CHUNK_SIZE = 8 * 1024 * 1024
+# copy_file_range errors that mean the kernel or filesystem cannot copy the file
+COPY_FILE_RANGE_UNSUPPORTED = {
+    errno.EXDEV,
+    errno.ENOSYS,
+    errno.EOPNOTSUPP,
+    errno.EINVAL,
+    errno.EBADF,
+    errno.EPERM,
+}
+
+
+class TransferResult(NamedTuple):
+    method: str
+    size: int
+
+
+def get_expected_size(storage_path: str) -> Optional[int]:
+    """Return size of an upload recorded by tusd in the .info file next to it."""
+    try:
+        with open(f"{storage_path}.info") as info_file:
+            size = json.load(info_file).get("Size")
+    except (OSError, ValueError, AttributeError):
+        return None
+    return size if isinstance(size, int) else None
+
+
+def link_file(src: str, dst: str) -> Optional[int]:
+    """Hard links dst to src. Only possible when both are on the same filesystem,
+    in which case no data is read or written.
+
+    Returns:
+        Optional[int]: Size of linked file, or None if a link cannot be created.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        return None
+    return os.stat(dst).st_size
+
+
+def copy_file_range(src: str, dst: str) -> Optional[int]:
+    """Copies src to dst with copy_file_range, which copies inside the kernel
+    and shares blocks (reflinks) or copies on the server on filesystems that
+    support it (e.g., Btrfs, XFS, NFS 4.2).
+
+    Returns:
+        Optional[int]: Bytes copied, or None if copy_file_range is unsupported.
+    """
+    if not hasattr(os, "copy_file_range"):
+        return None
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        copied = 0
+        while copied < size:
+            try:
+                count = os.copy_file_range(fsrc.fileno(), fdst.fileno(), size - copied)
+            except OSError as e:
+                if copied == 0 and e.errno in COPY_FILE_RANGE_UNSUPPORTED:
+                    return None
+                raise
+            if count == 0:
+                break
+            copied += count
+    return copied
+
+
+def copy_file(src: str, dst: str, chunk_size: int = TRANSFER_CHUNK_SIZE) -> int:
+    """Copies src to dst in chunks through a single reused buffer.
+
+    Returns:
+        int: Bytes copied.
+    """
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    copied = 0
+    with open(src, "rb", buffering=0) as fsrc, open(dst, "wb", buffering=0) as fdst:
+        while True:
+            count = fsrc.readinto(buffer)
+            if not count:
+                break
+            written = 0
+            while written < count:
+                written += fdst.write(view[written:count])
+            copied += count
+    return copied
+
+
+def transfer_upload(
+    storage_path: str,
+    destination: str,
+    methods: Tuple[str, ...] = TRANSFER_METHODS,
+) -> TransferResult:
+    """Transfers an upload from tusd storage to the static files directory. The
+    upload is hard linked when tusd storage is on the same filesystem, so it does
+    not take up disk space twice before the original is removed from tusd
+    storage. Otherwise it is copied with copy_file_range, or with a chunked copy.
+    The transferred size is checked against the size of the upload recorded by
+    tusd.
+
+    Args:
+        storage_path (str): Filepath for upload in tusd storage.
+        destination (str): Filepath for upload in static files directory.
+        methods (Tuple[str, ...], optional): Transfer methods to try, in order.
+            Defaults to TRANSFER_METHODS.
+
+    Raises:
+        ValueError: Raised if the transferred file does not match the size of the
+        upload recorded by tusd.
+
+    Returns:
+        TransferResult: Transfer method and bytes transferred.
+    """
+    storage_path, destination = str(storage_path), str(destination)
+    if os.path.lexists(destination):
+        os.remove(destination)
+
+    result: Optional[TransferResult] = None
+    for method in methods:
+        if method == "link":
+            size = link_file(storage_path, destination)
+            if size is not None:
+                result = TransferResult(method, size)
+        elif method == "copy_file_range":
+            size = copy_file_range(storage_path, destination)
+            if size is not None:
+                result = TransferResult(method, size)
+        elif method == "copy":
+            result = TransferResult(method, copy_file(storage_path, destination))
+        else:
+            raise ValueError(f"Unknown transfer method: {method}")
+        if result:
+            break
+
+    if result is None:
+        raise ValueError(f"Unable to transfer {storage_path} to {destination}")
+
+    expected_size = get_expected_size(storage_path)
+    if expected_size is not None and result.size != expected_size:
+        os.remove(destination)
+        raise ValueError(
+            f"Transferred {result.size} bytes of {storage_path}, "
+            f"expected {expected_size} bytes"
+        )
+
+    logger.info(
+        f"Transferred {result.size} bytes to {destination} with {result.method}"
+    )
+    return result
@@ -0,0 +1,128 @@
+import json
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+import fiona
+from sqlalchemy.orm import Session
+
+from app import crud
+
+
+# OGR driver and file extension for each vector layer download format
+EXPORT_FORMATS = {
+    "fgb": ("FlatGeobuf", ".fgb"),
+    "gpkg": ("GPKG", ".gpkg"),
+    "shp": ("ESRI Shapefile", ".shp"),
+}
+
+# Fiona field types for JSON property value types, other types are written as text
+FIELD_TYPES = {"boolean": "bool", "integer": "int", "number": "float", "string": "str"}
+
+
+def get_field_types(property_types: List[Tuple[str, str]]) -> Dict[str, str]:
+    """Return a fiona field type for each property. Properties with values of
+    more than one type are written as text, integers mixed with other numbers are
+    written as floats.
+
+    Args:
+        property_types (List[Tuple[str, str]]): (property name, JSON type) pairs.
+
+    Returns:
+        Dict[str, str]: Field type for each property name.
+    """
+    value_types: Dict[str, set] = {}
+    for key, value_type in property_types:
+        value_types.setdefault(key, set())
+        if value_type != "null":
+            value_types[key].add(value_type)
+
+    field_types = {}
+    for key, types in value_types.items():
+        if types == {"integer", "number"}:
+            types = {"number"}
+        if len(types) == 1 and next(iter(types)) in FIELD_TYPES:
+            field_types[key] = FIELD_TYPES[next(iter(types))]
+        else:
+            field_types[key] = "str"
+    return field_types
+
+
+def get_schema_geometry_type(geometry_types: List[str], driver: str) -> str:
+    """Return geometry type for the layer schema. Shapefiles require a single
+    geometry type, other formats accept mixed geometry types.
+
+    Args:
+        geometry_types (List[str]): PostGIS geometry types (e.g., MULTIPOLYGON).
+        driver (str): OGR driver name.
+
+    Returns:
+        str: Fiona geometry type.
+    """
+    if driver != "ESRI Shapefile":
+        return "Unknown"
+    types = {geometry_type.upper() for geometry_type in geometry_types}
+    if "MULTIPOINT" in types:
+        return "MultiPoint"
+    if types & {"LINESTRING", "MULTILINESTRING"}:
+        return "LineString"
+    if types & {"POLYGON", "MULTIPOLYGON"}:
+        return "Polygon"
+    return "Point"
+
+
+def to_record(
+    geometry: Dict[str, Any],
+    properties: Dict[str, Any],
+    schema: Dict[str, Any],
+) -> fiona.Feature:
+    """Return a fiona feature with properties matching the layer schema."""
+    if schema["geometry"] == "MultiPoint" and geometry["type"] == "Point":
+        geometry = {"type": "MultiPoint", "coordinates": [geometry["coordinates"]]}
+    record_properties = {}
+    for key, field_type in schema["properties"].items():
+        value = properties.get(key)
+        if field_type == "str" and value is not None and not isinstance(value, str):
+            value = json.dumps(value)
+        record_properties[key] = value
+    return fiona.Feature.from_dict(
+        {"geometry": geometry, "properties": record_properties}
+    )
+
+
+def write_vector_layer(
+    db: Session, project_id: UUID, layer_id: str, out_path: str, format: str
+) -> None:
+    """Writes a feature collection to a FlatGeobuf, GeoPackage, or Shapefile.
+    Features are read from the database and written in batches, so memory use
+    does not grow with the size of the layer.
+
+    Args:
+        db (Session): Database session.
+        project_id (UUID): Project ID for feature collection.
+        layer_id (str): Layer ID for feature collection.
+        out_path (str): Path for output file.
+        format (str): Output format ("fgb", "gpkg", or "shp").
+    """
+    driver, _ = EXPORT_FORMATS[format]
+    geometry_types, property_types = crud.vector_layer.get_vector_layer_schema(
+        db, project_id=project_id, layer_id=layer_id
+    )
+    schema = {
+        "geometry": get_schema_geometry_type(geometry_types, driver),
+        "properties": get_field_types(property_types),
+    }
+    # FlatGeobuf spatial index requires every feature before it can be written
+    options = {"SPATIAL_INDEX": "NO"} if driver == "FlatGeobuf" else {}
+
+    with fiona.open(
+        out_path, "w", driver=driver, crs="EPSG:4326", schema=schema, **options
+    ) as dst:
+        for features in crud.vector_layer.iter_vector_layer_features(
+            db, project_id=project_id, layer_id=layer_id
+        ):
+            dst.writerecords(
+                [
+                    to_record(geometry, properties, schema)
+                    for geometry, properties in features
+                ]
+            )